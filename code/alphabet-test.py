@@ -17,7 +17,7 @@
 #  SPDX-License-Identifier: MIT
 #
 
-from alphabet import Alphabet
+from alphabet import Alphabet, deBruijnDigits, lyndonWords
 
 # Various n-ary alphabets
 a2 = Alphabet(["0","1"], "w")
@@ -135,4 +135,110 @@ assert(a.isUniversalPartialCycle("0010110000301120021013000230132020103100203031
 assert(a.isUniversalPartialCycle("0010110000301120021013000230132020103100203031202210330022303320001211020032112202121302023213222012310220323122221233022232332200111101003111210211130102311321201131012031312122113301223133210013110300331123021313030233132320133103203331232213330322333323", 4))
 
 # Lift of the upcycle 001w110w003w112w021w130w023w132w201w310w203w312w221w330w223w332w
-assert(a.isUniversalPartialCycle("0010110000301120021013000230132020103100203031202210330022303320001211020032112202121302023213222012310220323122221233022232332200111101003111210211130102311321201131012031312122113301223133210013110300331123021313030233132320133103203331232213330322333323", 4))
\ No newline at end of file
+assert(a.isUniversalPartialCycle("0010110000301120021013000230132020103100203031202210330022303320001211020032112202121302023213222012310220323122221233022232332200111101003111210211130102311321201131012031312122113301223133210013110300331123021313030233132320133103203331232213330322333323", 4))
+
+# Test Symbol Codes
+
+a = Alphabet(["0","1"], "w")
+assert(list(a.encode("01w")) == [0, 1, Alphabet.WILDCARD_CODE])
+assert(list(a.encode("0s")) == [0, Alphabet.UNKNOWN_CODE])
+assert(a.decode(a.encode("001w110w")) == "001w110w")
+
+# Test Coverage Reports
+
+c = a.coverage("00110", 2)
+assert(c.isExactCover())
+
+c = a.coverage("0011", 3, cyclic=True, stopEarly=False)
+assert(c.missingWords() == ["000", "010", "101", "111"])
+assert(c.doubledWords() == [])
+
+c = a.coverage("000101110", 3, cyclic=True)
+assert(c.doubledWords() == ["000"])
+
+assert(a.codeOf("1") == 1)
+assert(a.codeOf("w") == Alphabet.WILDCARD_CODE)
+assert(a.symbolOf(Alphabet.WILDCARD_CODE) == "w")
+assert(a.symbolOf(0) == "0")
+
+# Characters outside the alphabet are kept as unknown codes, which cover no
+# word and decode to blanks.
+assert(a.codeOf("s") == Alphabet.UNKNOWN_CODE)
+assert(a.decode(a.encode("0s1")) == "0 1")
+c = a.coverage("0s110", 2, stopEarly=False)
+assert(c.covered == 2 and c.missingWords() == ["00", "01"])
+assert(a.isUniversalPartialCycle("001w110w", 4))
+assert(not a.isUniversalPartialCycle("001w1s0w", 4))
+
+# Test Covering Sets
+
+assert(list(a2.coveringSet("0110")) == ["0110"])
+assert(list(a2.coveringSet("0w1")) == ["001", "011"])
+assert(list(a2.coveringSet("w1w")) == ["010", "011", "110", "111"])
+assert(len(list(a3.coveringSet("ww1ww"))) == 81)
+assert(list(Alphabet(["0","1"]).coveringSet("01")) == ["01"])
+
+assert(a2.wordCode("1w0") == (4, 0b010))
+assert(a3.coveringCodes("12") == range(5, 6))
+assert(a3.coveringCodes("1ww") == range(9, 18))
+assert(sorted(a2.coveringCodes("w1w")) == [2, 3, 6, 7])
+
+# Test Word Universes
+
+u = a3.universe(3)
+assert(u is a3.universe(3))
+assert(len(u) == 27)
+assert(u[0] == "000" and u[5] == "012" and u[26] == "222")
+assert(u.codeOf("012") == 5)
+assert(list(u)[:4] == ["000", "001", "002", "010"])
+assert("120" in u and "12" not in u and "1w0" not in u)
+assert(len(a4.universe(10)) == 4 ** 10) # nothing is materialized
+
+# Test the de Bruijn cycle generators
+
+assert(list(lyndonWords(2, 3)) == [(0,), (0, 0, 1), (0, 1), (0, 1, 1), (1,)])
+assert(list(deBruijnDigits(3, 2)) == [0, 0, 1, 0, 2, 1, 1, 2, 2])
+assert(list(deBruijnDigits(5, 1)) == [0, 1, 2, 3, 4])
+
+a = Alphabet(["0","1"], "w")
+assert(str(a.deBruijnCycle(3)) == "00010111")
+assert(str(a.deBruijnCycle(5)) == "00000100011001010011101011011111")
+assert(bytes(a.deBruijnCodes(4)) == bytes(a.deBruijnCycle(4).codes()))
+assert(b"".join(a.deBruijnChunks(10, 100)) == b"".join(a.deBruijnChunks(10)))
+for n in range(1, 9):
+    assert(a.isDeBruijnCycle(str(a.deBruijnCycle(n)), n))
+
+a = Alphabet(["0","1","2","3","4"])
+for n in range(1, 5):
+    assert(a.isDeBruijnCycle(str(a.deBruijnCycle(n)), n))
+
+# Test the upcycles lifted from 001w110w
+
+a = Alphabet(["0","1"], "w")
+assert(str(a.upcycle()) == "001w110w")
+
+a = Alphabet(["0","1","2","3"], "w")
+u = a.upcycle()
+assert(str(u) == "001w110w003w112w021w130w023w132w201w310w203w312w221w330w223w332w")
+assert(b"".join(a.upcycleChunks(4, 10)) == u.codes())
+assert(a.isUniversalPartialCycle(str(a.upcycle()), 4))
+
+a = Alphabet(["0","1","2","3","4","5"], "w")
+assert(a.upcycle().length == 6 ** 3)
+assert(a.isUniversalPartialCycle(str(a.upcycle()), 4))
+
+# Lifts can be lifted again.
+b = Alphabet(["0","1","2","3","4","5","6","7","8","9","A","B"], "w")
+assert(b.isUniversalPartialCycle(b.decode(b"".join(b.liftChunks(str(u), 4))), 4))
+
+try:
+    list(a.liftChunks("00w011w1", 4))
+    assert(False)
+except ValueError:
+    pass
+
+try:
+    Alphabet(["0","1","2"], "w").upcycle()
+    assert(False)
+except ValueError:
+    pass
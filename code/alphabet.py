@@ -17,7 +17,87 @@
 #  SPDX-License-Identifier: MIT
 #
 
-from itertools import product
+from itertools import chain, product
+from coverage import WindowCoverage, coverBound, wildcardOffsets
+from matcher import WildcardMatcher
+
+class _SymbolTable(dict):
+    """Translation table for str.translate that sends every character
+       outside the alphabet to the unknown symbol code.
+    """
+    def __missing__(self, key):
+        return Alphabet.UNKNOWN_CODE
+
+def lyndonWords(base, maxLength):
+    """Yields the Lyndon words of length at most @maxLength over the digits
+       0..@base-1 as tuples, in lexicographic order, by the algorithm of
+       Fredricksen, Kessler and Maiorana (in Duval's form): extend the last
+       word periodically to length @maxLength, drop its trailing maximal
+       digits and increment the last digit left.
+    """
+    word = [0] if base > 0 and maxLength > 0 else []
+    while word:
+        yield tuple(word)
+        word = (word * (maxLength // len(word) + 1))[:maxLength]
+        while word and word[-1] == base - 1:
+            word.pop()
+        if word:
+            word[-1] += 1
+
+def deBruijnDigits(base, order):
+    """Yields the digits of the lexicographically least de Bruijn cycle of
+       order @order over 0..@base-1: the concatenation of the Lyndon words
+       whose length divides @order."""
+    for word in lyndonWords(base, order):
+        if order % len(word) == 0:
+            yield from word
+
+class WordUniverse(object):
+    """A WordUniverse stands for the a^n words of length @wordLength over 
+       an alphabet without materializing them. Words are identified by their 
+       integer codes 0..a^n-1 (the word read as a number in base a) and are 
+       only converted to strings on demand. Use Alphabet.universe() to get 
+       the cached universe for a given length.
+    """
+
+    def __init__(self, alphabet, wordLength):
+        self.alphabet = alphabet
+        self.wordLength = wordLength
+        self.symbols = tuple(map(str, alphabet.symbols))
+        self.base = len(self.symbols)
+        self.size = self.base ** wordLength
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """Yields the words as strings, in order of their codes."""
+        return map("".join, product(self.symbols, repeat=self.wordLength))
+
+    def __getitem__(self, code):
+        """Returns the word whose code is @code."""
+        if not 0 <= code < self.size:
+            raise IndexError("word code out of range")
+        digits = []
+        for _ in range(self.wordLength):
+            code, digit = divmod(code, self.base)
+            digits.append(self.symbols[digit])
+        return "".join(reversed(digits))
+
+    def __contains__(self, word):
+        return len(word) == self.wordLength and \
+               all(c in self.symbols for c in word)
+
+    def codes(self):
+        return range(self.size)
+
+    def codeOf(self, word):
+        """Returns the code of the word @word, which must not contain 
+           wildcards."""
+        code = 0
+        for c in word:
+            code = code * self.base + self.symbols.index(c)
+        return code
 
 class Alphabet(object):
     """An Alphabet represents a collection of combinatorial objects possibly 
@@ -25,10 +105,22 @@ class Alphabet(object):
        defined (in great part) by the alphabet they represent, the logic for 
        detecting those is included here.
     """
+
+    # Symbol codes reserved for the wildcard and for characters that are not
+    # in the alphabet. Symbols themselves are coded by their position.
+    WILDCARD_CODE = 255
+    UNKNOWN_CODE = 254
+
+    # Upcycles that the alphabet multiplier theorem lifts to every alphabet
+    # whose size is a multiple of theirs, keyed by (alphabet size, subword
+    # length), with "*" for the wildcard. 001*110* is the upcycle of Chen,
+    # Kitaev, Mutze and Sun.
+    BASE_UPCYCLES = {(2, 4): "001*110*"}
     
     def __init__(self, symbols, wildcard=""):
         self.symbols = symbols
         self.wildcard = wildcard
+        self._universes = {}
         
     def __str__(self):
         return str(self.symbols) + " with " + str(self.wildcard) + " wild."
@@ -41,11 +133,60 @@ class Alphabet(object):
            where n is the number of symbols in the alphabet and a is the 
            length of each word.
         """
-        words = []
-        for w in product(self.symbols, repeat=wordLength):
-            words.append(''.join(map(str, w)))
-        return words
+        return list(self.universe(wordLength))
+
+    def universe(self, wordLength):
+        """Returns the WordUniverse of words of length @wordLength. It is 
+           created once per length (and per set of symbols) and reused."""
+        key = (tuple(self.symbols), wordLength)
+        universe = self._universes.get(key)
+        if universe is None:
+            universe = self._universes[key] = WordUniverse(self, wordLength)
+        return universe
         
+# Symbol Codes -------------------------------------------------------------- #
+
+    def encode(self, word):
+        """Returns a bytearray holding the symbol code of each character of 
+           @word: the position of the symbol in the alphabet, WILDCARD_CODE 
+           for the wildcard and UNKNOWN_CODE for anything else, such as the
+           blanks of unset CyclicString cells. Unknown characters are not
+           rejected here, but a window containing one covers no word, so a
+           typo makes the coverage checks fail with missing words rather
+           than pass, and decode() renders it as a blank.
+        """
+        table = _SymbolTable()
+        for i, c in enumerate(self.symbols):
+            table[ord(c)] = i
+        if self.wildcard != "":
+            table[ord(self.wildcard)] = self.WILDCARD_CODE
+        return bytearray(word.translate(table), "latin-1")
+
+    def codeOf(self, symbol):
+        """Returns the symbol code of the single character @symbol."""
+        if symbol in self.symbols:
+            return self.symbols.index(symbol)
+        if symbol == self.wildcard and symbol != "":
+            return self.WILDCARD_CODE
+        return self.UNKNOWN_CODE
+
+    def symbolOf(self, code):
+        """Returns the character whose symbol code is @code."""
+        if code < len(self.symbols):
+            return self.symbols[code]
+        if code == self.WILDCARD_CODE:
+            return self.wildcard
+        return " "
+
+    def decode(self, codes):
+        """Returns the string spelled by the symbol codes @codes. Unknown 
+           codes are rendered as blanks.
+        """
+        table = [" "] * 256
+        table[:len(self.symbols)] = self.symbols
+        table[self.WILDCARD_CODE] = self.wildcard
+        return "".join(map(table.__getitem__, codes))
+
 # Symbol Equality ----------------------------------------------------------- #
  
     def areEqualSymbols(self, a, b):
@@ -73,23 +214,29 @@ class Alphabet(object):
            the built in count() function"""
         if len(substring) > len(word):
             return False
-        count = 0
-        for j in range(len(word)):
-            if self.areEqualWords(substring, word[j:j+len(substring)]):
-                count += 1
-        return count == 1
+        matcher = WildcardMatcher(self, [substring])
+        return matcher.count(self.encode(word)) == 1
 
 # Covering Structures ------------------------------------------------------- #
  
+    def coverage(self, candidate, length, cyclic=False, stopEarly=True):
+        """Returns the WindowCoverage of the subwords of length @length of 
+           @candidate, computed in a single pass. The result reports which 
+           words are doubled or missing.
+        """
+        codes = self.encode(candidate)
+        windows = len(codes) if cyclic else max(0, len(codes) - length + 1)
+        coverage = WindowCoverage(self, length, stopEarly, expected=coverBound(
+            self, codes, length, windows))
+        coverage.scan(codes, cyclic)
+        return coverage
+ 
     def isUniversalWord(self, candidate, length):
         """Returns true if @candidate is a universal word for subwords of 
            length @length. @candidate should be a string rather than a
            dict.
         """
-        for w in self.wordsOfLength(length):
-            if not self.isPresentExactlyOnce(candidate, ''.join(map(str, w))):
-                return False
-        return True
+        return self.coverage(candidate, length).isExactCover()
     
     def isDeBruijnCycle(self, candidate, subwordLength):
         """Returns true if @candidate is a de Bruijn cycle for subwords of 
@@ -106,22 +253,149 @@ class Alphabet(object):
             return False
         return self.isDeBruijnCycle(candidate, subwordLength)
 
+# Generators ---------------------------------------------------------------- #
+
+    def deBruijnChunks(self, subwordLength, chunkSize=65536):
+        """Yields the symbol codes of the lexicographically least de Bruijn
+           cycle for subwords of length @subwordLength, in bytearrays of
+           about @chunkSize codes. The Lyndon words are generated in place
+           as in lyndonWords(), which takes constant amortized time per
+           symbol, so cycles of any length stream in constant memory.
+        """
+        a = len(self.symbols)
+        n = subwordLength
+        top = bytes([a - 1])
+        chunk = bytearray()
+        word = bytearray([0]) if a > 0 and n > 0 else bytearray()
+        while word:
+            if n % len(word) == 0:
+                chunk += word
+                if len(chunk) >= chunkSize:
+                    yield chunk
+                    chunk = bytearray()
+            word = (word * (n // len(word) + 1))[:n].rstrip(top)
+            if word:
+                word[-1] += 1
+        if chunk:
+            yield chunk
+
+    def deBruijnCodes(self, subwordLength):
+        """Yields the symbol codes of the de Bruijn cycle of deBruijnChunks()
+           one at a time."""
+        return chain.from_iterable(self.deBruijnChunks(subwordLength))
+
+    def deBruijnCycle(self, subwordLength):
+        """Returns the de Bruijn cycle of deBruijnChunks() as a
+           CyclicString."""
+        return self._cyclicString(self.deBruijnChunks(subwordLength))
+
+    def liftChunks(self, upcycle, subwordLength, chunkSize=65536):
+        """Yields, in bytearrays of about @chunkSize codes, the lift of the
+           upcycle @upcycle to this alphabet by the alphabet multiplier
+           theorem. @upcycle is a string over the first b symbols of this
+           alphabet, where b divides the alphabet size a = b·k, with a
+           wildcard in every position that is n - 1 modulo n (n being
+           @subwordLength). If it has m symbols other than the wildcard and
+           n - 1 divides m, the lift is u^(k^(n-1)) + b·v, where v is the
+           (n - 1, m)-perfect necklace over k symbols with a wildcard
+           inserted every n positions. Its length is a^(n-1).
+        """
+        from perfectnecklace import PerfectNecklace
+        import multiplier
+
+        u = bytes(self.encode(upcycle))
+        n = subwordLength
+        wildcards = bytes([self.WILDCARD_CODE])
+        if not u or len(u) % n or \
+           any(u[i] != self.WILDCARD_CODE for i in range(n - 1, len(u), n)) or \
+           any(u[i] == self.WILDCARD_CODE for i in range(len(u))
+               if i % n != n - 1):
+            raise ValueError("%s does not have a wildcard every %s symbols"
+                             % (upcycle, n))
+        b = max(u.translate(None, wildcards)) + 1
+        m = len(u) // n * (n - 1)
+        if len(self.symbols) % b or m % (n - 1):
+            raise ValueError("%s cannot be lifted to %s" % (upcycle, self))
+        k = len(self.symbols) // b
+
+        necklace = PerfectNecklace(Alphabet(self.symbols[:k], self.wildcard),
+                                   n - 1, m)
+        necklace.addDiamondicity(n)
+        size = max(1, chunkSize // len(u)) * len(u)
+        for v in necklace.chunks(size):
+            yield multiplier.lift(u * (len(v) // len(u)), v, b,
+                                  len(self.symbols))
+
+    def upcycleChunks(self, subwordLength=4, chunkSize=65536):
+        """Yields the codes of a known upcycle over this alphabet for
+           subwords of length @subwordLength, lifted from one of
+           BASE_UPCYCLES, in bytearrays of about @chunkSize codes. Raises a
+           ValueError if none applies.
+        """
+        a = len(self.symbols)
+        for (b, n), base in sorted(self.BASE_UPCYCLES.items()):
+            if n == subwordLength and a % b == 0 and self.wildcard != "":
+                upcycle = "".join(self.symbols[int(c)] if c != "*" else
+                                  self.wildcard for c in base)
+                return self.liftChunks(upcycle, n, chunkSize)
+        raise ValueError("no known upcycle for subwords of length %s over %s"
+                         % (subwordLength, self))
+
+    def upcycle(self, subwordLength=4):
+        """Returns the upcycle of upcycleChunks() as a CyclicString."""
+        return self._cyclicString(self.upcycleChunks(subwordLength))
+
+    def _cyclicString(self, chunks):
+        # CyclicString imports this module, so it is imported on first use.
+        from cyclicstring import CyclicString
+        codes = bytearray().join(chunks)
+        cycle = CyclicString(self, len(codes))
+        cycle.setCodes(codes)
+        return cycle
+
 # Covering Sets ------------------------------------------------------------- #
 
+    def wordCode(self, s):
+        """Returns the pair (code, wildcardMask) describing the word @s: its 
+           integer code in base a with each wildcard read as the first 
+           symbol, and the mask whose bit t marks a wildcard in the digit of 
+           weight a^t.
+        """
+        a = len(self.symbols)
+        code = 0
+        wildcardMask = 0
+        for c in self.encode(s):
+            wildcardMask <<= 1
+            if c == self.WILDCARD_CODE:
+                wildcardMask |= 1
+                c = 0
+            elif c >= a:
+                raise ValueError("%r is not a word of %s" % (s, self))
+            code = code * a + c
+        return code, wildcardMask
+
+    def coveringCodes(self, s):
+        """Returns the codes of all the words @s covers. The codes are a 
+           range when the wildcards of @s are all at its end."""
+        code, wildcardMask = self.wordCode(s)
+        offsets = wildcardOffsets(len(self.symbols), wildcardMask)
+        if isinstance(offsets, range):
+            return range(code, code + len(offsets))
+        return tuple(code + o for o in offsets)
+
     def coveringSet(self, s):
-        """Returns a dict containing all the words that @s covers in this
-           alphabet. If @s has no wildcards, the dictionary will contain
-           @s. Currently fails and assertion if @s has more than one wildcard.
+        """Yields all the words that @s covers in this alphabet, one at a 
+           time. If @s has no wildcards, that is just @s. Any number of 
+           wildcards is allowed.
         """
-        #TODO: Improve this to recursively parse @s to produce the full 
-        #      covering set.
-        assert(s.count(self.wildcard) < 2)
-
-        coveringSet = []
-        if self.wildcard == "":
-            return [s]
-
-        for c in self.symbols:
-            equivalenceElement = s
-            coveringSet.append(equivalenceElement.replace(self.wildcard, c))
-        return coveringSet
\ No newline at end of file
+        if self.wildcard == "" or self.wildcard not in s:
+            yield s
+            return
+
+        pieces = s.split(self.wildcard)
+        for fill in product(self.symbols, repeat=len(pieces) - 1):
+            word = [pieces[0]]
+            for c, piece in zip(fill, pieces[1:]):
+                word.append(c)
+                word.append(piece)
+            yield "".join(word)
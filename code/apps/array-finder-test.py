@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+import importlib.util
+import os
+import sys
+
+directory = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(directory, ".."))
+from cyclicarray import CyclicArray
+
+spec = importlib.util.spec_from_file_location(
+    "arrayfinder", os.path.join(directory, "array-finder.py"))
+finder = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(finder)
+
+# Every candidate that is an uptorus (or a de Bruijn torus), found by 
+# checking each one from scratch, as exhaustiveUpmatrices does for 
+# upmatrices.
+def exhaustiveUptori(l, w, a, submatrixLength, submatrixWidth):
+    symbols = finder.symbolsOf("0123456789"[0 : a], "⋄")
+    for i in range((a + 1) ** (l * w)):
+        m = finder.generateUpmatrix(i, l, w, a)
+        array = CyclicArray(symbols, w, l)
+        array.setValues(m)
+        if array.isDeBruijnTorus(submatrixLength, submatrixWidth):
+            yield i, m
+
+# The spaces searched below: (l, w, a, submatrix) and whether the 
+# submatrices wrap around.
+cases = [(4, 2, 2, (2, 2), False), (4, 2, 2, (2, 1), False),
+         (4, 2, 2, (1, 3), False), (4, 2, 2, (1, 3), True),
+         (8, 1, 2, (1, 3), True)]
+expected = {}
+for l, w, a, submatrix, torus in cases:
+    if torus:
+        found = exhaustiveUptori(l, w, a, *submatrix)
+    else:
+        found = finder.exhaustiveUpmatrices(l, w, a, *submatrix, 0,
+                                            (a + 1) ** (l * w))
+    expected[l, w, a, submatrix, torus] = list(found)
+assert([len(found) for found in expected.values()] == [8, 24, 8, 32, 16])
+
+# Test the depth-first search
+
+for (l, w, a, submatrix, torus), found in expected.items():
+    assert(list(finder.backtrackUpmatrices(l, w, a, *submatrix, torus)) == found)
+
+# A fixed prefix only keeps the upmatrices that start with it.
+found = expected[4, 2, 2, (2, 2), False]
+prefix = finder.matrixValues(found[0][1], 2)[:3]
+assert(list(finder.backtrackUpmatrices(4, 2, 2, 2, 2, prefix=prefix)) ==
+       [(i, m) for i, m in found if finder.matrixValues(m, 2)[:3] == prefix])
+
+# Test the checkers
+
+from itertools import product
+
+# The words covered by the windows of the rows of @m, listed one by one.
+def coveredWords(m, alphabet, submatrixLength, submatrixWidth):
+    words = []
+    for i in range(len(m) - submatrixLength + 1):
+        for j in range(len(m[0]) - submatrixWidth + 1):
+            cells = [m[i + k][j + t] for k in range(submatrixLength)
+                     for t in range(submatrixWidth)]
+            choices = [alphabet if x == "⋄" else x for x in cells]
+            words += ["".join(word) for word in product(*choices)]
+    return sorted(words)
+
+def isExactCover(words, alphabet, size):
+    return words == ["".join(word) for word in product(alphabet, repeat=size)]
+
+for a, subwordLength, l in [(2, 2, 4), (2, 3, 8), (3, 2, 5)]:
+    alphabet = "012"[0 : a]
+    for i in range((a + 1) ** l):
+        u = finder.generateUpword(i, l, a)
+        assert(finder.isUpword(u, alphabet, subwordLength) ==
+               isExactCover(coveredWords([u], alphabet, 1, subwordLength),
+                            alphabet, subwordLength))
+
+assert(finder.isUpword("0011022120", "012", 2))
+assert(not finder.isUpword("0011022121", "012", 2))
+assert(finder.isUpword("w011", "01", 2, wildcard="w"))
+assert(not finder.isUpword("0", "01", 2))
+
+for l, w, a, r, c in [(4, 2, 2, 2, 1), (3, 3, 2, 2, 2), (3, 2, 3, 1, 2)]:
+    alphabet = "012"[0 : a]
+    for i in range((a + 1) ** (l * w)):
+        m = finder.generateUpmatrix(i, l, w, a)
+        assert(finder.isUpmatrix(m, alphabet, r, c) ==
+               isExactCover(coveredWords(m, alphabet, r, c), alphabet, r * c))
+
+m = ["00110", "0w1w0", "10011"]
+assert(finder.isUpmatrix(m, "01", 2, 2, wildcard="w"))
+assert(not finder.isUpmatrix(m, "01", 2, 2))
+
+# Test the Gray code search
+
+for (l, w, a, submatrix, torus), found in expected.items():
+    n = (a + 1) ** (l * w)
+    gray = list(finder.grayUpmatrices(l, w, a, *submatrix, 0, n, torus))
+    assert(sorted(gray) == found)
+
+    # Searching the ranks in pieces visits the same candidates.
+    pieces = []
+    for start in range(0, n, 1000):
+        pieces += finder.grayUpmatrices(l, w, a, *submatrix, start,
+                                        min(start + 1000, n), torus)
+    assert(pieces == gray)
+
+# Test the exact cover search
+
+for (l, w, a, submatrix, torus), found in expected.items():
+    assert(sorted(finder.exactCoverUpmatrices(l, w, a, *submatrix, torus)) ==
+           found)
+    first = list(finder.exactCoverUpmatrices(l, w, a, *submatrix, torus,
+                                             first=True))
+    assert(len(first) == 1 and first[0] in found)
+    for seed in range(3):
+        random = list(finder.exactCoverUpmatrices(l, w, a, *submatrix, torus,
+                                                  seed=seed))
+        assert(len(random) == 1 and random[0] in found)
+
+# A space without upmatrices.
+assert(list(finder.exactCoverUpmatrices(3, 2, 2, 2, 2)) == [])
+assert(list(finder.exactCoverUpmatrices(3, 2, 2, 2, 2, seed=1)) == [])
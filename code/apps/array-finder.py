@@ -30,60 +30,81 @@ will iterate over all of the possible 5-by-3 matrices for the binary alphabet an
 create a file called `output.txt` with all of the upmatrices found. In the paper, 
 the only upmatrices found computationall have 2-by-2 submatrices and are over the 
 binary alphabet.
+
+`--submatrix R C` searches for upmatrices with R-by-C submatrices instead of 2-by-2 ones, and
+`--wildcard W` writes W instead of "⋄" for the wildcards (the files in /data use "w").
+
+Adding `--backtrack` searches the same space depth-first, pruning partial matrices as soon as they
+cannot be completed to an upmatrix. It finds the same upmatrices in the same order. With
+`--torus` it searches for uptori instead. `--symmetry` only outputs the least member of each class
+of upmatrices related by reversing or transposing the matrix, permuting the alphabet and (for
+tori) shifting rows and columns, together with the size of the class. With `--backtrack` it also
+abandons every partial matrix that cannot be completed to the least member of its class, which
+skips most of each class during the search; the other modes still visit every candidate and only
+leave the rest of each class out of the output.
+
+`--gray` also iterates over every candidate, but in Gray code order, so that each candidate differs
+from the previous one in a single cell and only the submatrices containing that cell have to be
+checked again. It finds the same upmatrices (in a different order) many times faster, and can
+search for uptori with `--torus` as well.
+
+`--dlx` hands the search to an exact cover solver (Dancing Links) instead. `--first` stops it at
+the first upmatrix it finds, and `--seed S` looks for a single one with randomized restarts, for
+spaces that are too large to search completely. `--anneal` looks for one upmatrix by local search
+(simulated annealing), also with `--seed S`, running one walk per process with `--jobs N`.
+
+`--jobs N` splits the search into shards that run on N processes. Completed shards are saved to
+`output.state.json` (see `--state`) as the run goes, and `--resume` picks an interrupted run up
+where it stopped. The output is the same as for a run on a single process.
 """
+import argparse
+import json
+import math
+import os
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from itertools import product
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from alphabet import Alphabet
+from coverage import coverageTable, wildcardOffsets
+from cyclicarray import CyclicArray
+from datafile import writeObject
+from exactcover import ExactCover
+from localsearch import findArray
+
+"""
+This function returns the Alphabet for the symbols of the string `alphabet` and the given wildcard.
+It is cached because the checkers below are called once for every candidate.
+"""
+@lru_cache(maxsize=16)
+def symbolsOf(alphabet, wildcard):
+    return Alphabet(list(alphabet), wildcard)
 
 """
 This function tests for whether a candidate is a universal partial word (upword) for a particular
-alphabet and subword length. It is not used anywhere else in the code.
-"""
-def isUpword(candidate, alphabet, subwordLength):
-    words = []
-    for i in range(len(candidate) - subwordLength + 1):
-        word = [""]
-        for j in range(subwordLength):
-            newCharacter = candidate[i + j]
-            if newCharacter == "⋄":
-                word *= len(alphabet)
-                for k in range(len(word)):
-                    word[k] += alphabet[k * len(alphabet) // len(word)]
-            else:
-                for k in range(len(word)):
-                    word[k] += newCharacter
-        for j in range(len(word)):
-            if word[j] in words:
-                return False
-            words.append(word[j])
-    if len(words) == len(alphabet) ** subwordLength:
-        return True
-    return False
-
-"""
-This function tests for whether a candidate is an upmatrix for a particular alphabet and a
-particular sub-matrix size. In the paper, all upmatrices shown have a 2-by-2 submatrix size.
-"""
-def isUpmatrix(candidate, alphabet, submatrixLength, submatrixWidth):
-    matrices = []
-    for i in range(len(candidate) - submatrixLength + 1):
-        for j in range(len(candidate[0]) - submatrixWidth + 1):
-            matrix = [""]
-            for k in range(submatrixLength):
-                for l in range(submatrixWidth):
-                    newCharacter = candidate[i + k][j + l]
-                    if newCharacter == "⋄":
-                        matrix *= len(alphabet)
-                        for m in range(len(matrix)):
-                            matrix[m] += alphabet[m * len(alphabet) // len(matrix)]
-                    else:
-                        for m in range(len(matrix)):
-                            matrix[m] += newCharacter
-            for k in range(len(matrix)):
-                if matrix[k] in matrices:
-                    return False
-                matrices.append(matrix[k])
-    if len(matrices) == len(alphabet) ** (submatrixLength * submatrixWidth):
-        return True
-    return False
+alphabet and subword length. Each window is turned into an integer code and the words it covers
+are ticked off in a table with one byte per word, so the check is linear in the number of covered
+words and stops at the first word that is covered twice. It is not used anywhere else in the code.
+"""
+def isUpword(candidate, alphabet, subwordLength, wildcard="⋄"):
+    symbols = symbolsOf(alphabet, wildcard)
+    if len(candidate) < subwordLength:
+        return False
+    return symbols.coverage(candidate, subwordLength).isExactCover()
+
+"""
+This function tests for whether a candidate, given as a list of rows, is an upmatrix for a
+particular alphabet and a particular sub-matrix size, in the same way as `isUpword()`. In the
+paper, all upmatrices shown have a 2-by-2 submatrix size.
+"""
+def isUpmatrix(candidate, alphabet, submatrixLength, submatrixWidth, wildcard="⋄"):
+    symbols = symbolsOf(alphabet, wildcard)
+    matrix = CyclicArray(symbols, len(candidate), len(candidate[0]))
+    matrix.setValues(candidate)
+    return matrix.isUpmatrix(submatrixLength, submatrixWidth)
 
 """
 This function generates a particular upword, which will be brute-forced later. This function is
@@ -121,34 +142,601 @@ def generateUpmatrix(n, l, w, a):
     
     return m
 
+"""
+This function lists the symmetries of an l-by-w matrix that map the set of its submatrices onto
+itself, as permutations of its cells in row-major order: image[k] = matrix[p[k]] for each p. These
+are the reversals of the rows and of the columns, the transposition if both the matrix and the
+submatrices are square, and, for tori, the cyclic shifts of the rows and columns.
+"""
+def matrixSymmetries(l, w, submatrixLength, submatrixWidth, torus=False):
+    def cell(r, c):
+        return r * l + c
+    maps = [lambda r, c: (r, c),
+            lambda r, c: (w - 1 - r, c),
+            lambda r, c: (r, l - 1 - c),
+            lambda r, c: (w - 1 - r, l - 1 - c)]
+    if l == w and submatrixLength == submatrixWidth:
+        maps += [lambda r, c, f=f: f(c, r) for f in maps]
+    shifts = [(i, j) for i in range(w) for j in range(l)] if torus else [(0, 0)]
+    symmetries = set()
+    for f in maps:
+        for i, j in shifts:
+            symmetries.add(tuple(cell(*f((r + i) % w, (c + j) % l))
+                                 for r in range(w) for c in range(l)))
+    return sorted(symmetries)
+
+"""
+This function renames the symbols of a matrix (given as a row-major list of symbol numbers, with a
+for "⋄") in order of first appearance. The result is the least matrix obtainable by permuting the
+alphabet.
+"""
+def relabel(values, a):
+    names = {a: a}
+    return [names.setdefault(v, len(names) - 1) for v in values]
+
+"""
+This function decides whether a matrix (as above) is the canonical representative of its symmetry
+class, i.e. whether it is least among all its images under the symmetries and permutations of the
+alphabet. It returns the size of the class if so and 0 otherwise.
+"""
+def canonicalOrbitSize(values, a, symmetries):
+    if relabel(values, a) != values:
+        return 0
+    stabilizer = 0
+    for p in symmetries:
+        image = relabel([values[k] for k in p], a)
+        if image < values:
+            return 0
+        if image == values:
+            stabilizer += 1
+    # A symmetry fixing the matrix up to renaming leaves the unused symbols free.
+    unused = a - len(set(values) - {a})
+    stabilizer *= math.factorial(unused)
+    return len(symmetries) * math.factorial(a) // stabilizer
+
+"""
+This function converts a matrix given as a list of strings into a row-major list of symbol numbers.
+"""
+def matrixValues(m, a):
+    return [a if c == "⋄" else int(c) for row in m for c in row]
+
+"""
+This function searches for upmatrices depth-first instead of iterating over every candidate. Cells
+are filled in row-major order (symbols first, then "⋄"), so the upmatrices are yielded in the same
+order as the main loop finds them, each together with its candidate number. A table of the
+submatrices covered so far (from `coverageTable()`, so a bitset once a byte per submatrix would not
+fit) is updated as each cell is placed and removed again when backtracking.
+A branch is abandoned as soon as a completed submatrix covers an already covered one, or when the
+submatrices that are not complete yet cannot cover all the remaining ones even if every unplaced
+cell became a wildcard.
+If `torus` is true the submatrices wrap around the edges, i.e. it searches for uptori. If
+`symmetric` is true only the canonical representative of each symmetry class is yielded. The
+alphabet symmetry is broken by never using a symbol before the smaller ones, and a branch is also
+abandoned once a reversal, transposition or shift (see `matrixSymmetries()`) maps the cells placed
+so far onto a smaller prefix, since then no completion is canonical.
+If `prefix` is given, the first cells are fixed to those symbol numbers (a for "⋄").
+l = The length of the rows.
+w = The number of rows.
+a = The length of the alphabet.
+"""
+def backtrackUpmatrices(l, w, a, submatrixLength, submatrixWidth, torus=False,
+                        symmetric=False, prefix=()):
+    cells = l * w
+    size = submatrixLength * submatrixWidth
+    total = a ** size
+    windows = []
+    rows = range(w) if torus else range(w - submatrixLength + 1)
+    columns = range(l) if torus else range(l - submatrixWidth + 1)
+    for i in rows:
+        for j in columns:
+            windows.append([(i + k) % w * l + (j + m) % l
+                            for k in range(submatrixLength)
+                            for m in range(submatrixWidth)])
+    if not windows:
+        return
+    symmetries = matrixSymmetries(l, w, submatrixLength, submatrixWidth, torus)
+
+    # For each cell, the windows it belongs to and the windows it completes.
+    containing = [[] for _ in range(cells)]
+    completedAt = [[] for _ in range(cells)]
+    for x, window in enumerate(windows):
+        for cell in window:
+            containing[cell].append(x)
+        completedAt[max(window)].append(x)
+    powers = [a ** f for f in range(size + 1)]
+
+    values = [0] * cells
+    counts = coverageTable(total)
+    # free[x] counts the cells of window x that are unplaced or wildcards, so
+    # window x can cover at most a^free[x] submatrices. potential is the sum
+    # of that bound over the windows that are not complete yet.
+    free = [size] * len(windows)
+    state = {"covered": 0, "potential": len(windows) * total,
+             "incomplete": len(windows)}
+
+    def cover(x):
+        code = 0
+        wildcardMask = 0
+        for cell in windows[x]:
+            v = values[cell]
+            wildcardMask <<= 1
+            if v == a:
+                wildcardMask |= 1
+                v = 0
+            code = code * a + v
+        codes = [code + o for o in wildcardOffsets(a, wildcardMask)]
+        for c in codes:
+            if counts[c]:
+                return None
+        for c in codes:
+            counts[c] = 1
+        return codes
+
+    def couldBeCanonical(k):
+        # No completion of the cells up to k is canonical if a symmetry maps
+        # them onto a smaller prefix once the alphabet is renamed.
+        for p in symmetries:
+            names = {a: a}
+            for j in range(k + 1):
+                if p[j] > k:
+                    break
+                v = names.setdefault(values[p[j]], len(names) - 1)
+                if v != values[j]:
+                    if v < values[j]:
+                        return False
+                    break
+        return True
+
+    def place(k, used):
+        if k == cells:
+            if state["covered"] == total and \
+               (not symmetric or canonicalOrbitSize(values, a, symmetries)):
+                index = 0
+                for v in values:
+                    index = index * (a + 1) + v
+                yield index, ["".join("⋄" if v == a else str(v)
+                                      for v in values[r * l:(r + 1) * l])
+                              for r in range(w)]
+            return
+        for v in (prefix[k],) if k < len(prefix) else range(a + 1):
+            if symmetric and used < v < a:
+                continue
+            values[k] = v
+            if v != a:
+                for x in containing[k]:
+                    state["potential"] -= powers[free[x]] - powers[free[x] - 1]
+                    free[x] -= 1
+            placed = []
+            for x in completedAt[k]:
+                codes = cover(x)
+                if codes is None:
+                    break
+                placed.append(codes)
+                state["covered"] += len(codes)
+                state["potential"] -= len(codes)
+                state["incomplete"] -= 1
+            else:
+                if state["covered"] + state["potential"] >= total and \
+                   state["covered"] + state["incomplete"] <= total and \
+                   (not symmetric or couldBeCanonical(k)):
+                    yield from place(k + 1, max(used, v + 1) if v < a else used)
+            for codes in placed:
+                for c in codes:
+                    counts[c] = 0
+                state["covered"] -= len(codes)
+                state["potential"] += len(codes)
+                state["incomplete"] += 1
+            if v != a:
+                for x in containing[k]:
+                    free[x] += 1
+                    state["potential"] += powers[free[x]] - powers[free[x] - 1]
+
+    yield from place(0, 0)
+
+"""
+This function iterates over the candidates numbered start to stop - 1, as the main loop does, and
+yields the upmatrices among them.
+"""
+def exhaustiveUpmatrices(l, w, a, submatrixLength, submatrixWidth, start, stop):
+    for i in range(start, stop):
+        m = generateUpmatrix(i, l, w, a)
+        if isUpmatrix(m, "0123456789"[0 : a], submatrixLength, submatrixWidth):
+            yield i, m
+
+"""
+This function iterates over the candidates in the order of the reflected (a+1)-ary Gray code, in
+which consecutive candidates differ in exactly one cell, and yields the upmatrices among them
+together with their candidate numbers. Only the candidates with Gray code ranks start to stop - 1
+are visited; ranks 0 to (a+1)^(l*w) - 1 cover the whole solution space. Instead of checking each
+candidate from scratch, a table counts how often each submatrix is covered, and after each step
+only the windows containing the changed cell are taken out of the table and put back in. A
+candidate is an upmatrix when no submatrix is covered twice and none is missing.
+If `torus` is true the submatrices wrap around the edges, i.e. it searches for uptori.
+"""
+def grayUpmatrices(l, w, a, submatrixLength, submatrixWidth, start, stop, torus=False):
+    cells = l * w
+    size = submatrixLength * submatrixWidth
+    total = a ** size
+    radix = a + 1
+    windows = []
+    rows = range(w) if torus else range(w - submatrixLength + 1)
+    columns = range(l) if torus else range(l - submatrixWidth + 1)
+    for i in rows:
+        for j in columns:
+            windows.append([(i + k) % w * l + (j + m) % l
+                            for k in range(submatrixLength)
+                            for m in range(submatrixWidth)])
+    if not windows or start >= stop:
+        return
+
+    # For each cell, the (window, digit) pairs it appears in. The digit of
+    # weight a^t of a window code is its cell number size - 1 - t.
+    containing = [[] for _ in range(cells)]
+    for x, window in enumerate(windows):
+        for t, cell in enumerate(reversed(window)):
+            containing[cell].append((x, t))
+    powers = [a ** t for t in range(size)]
+
+    # Cell k is the digit of weight (a+1)^(cells - 1 - k) of the rank and of
+    # the candidate number. Digit d of the Gray code of rank g is digit d of
+    # g itself, reflected if g // (a+1)^(d+1) is odd.
+    values = [0] * cells
+    for k in range(cells):
+        d = cells - 1 - k
+        digit = start // radix ** d % radix
+        values[k] = radix - 1 - digit if start // radix ** (d + 1) % 2 else digit
+    index = 0
+    for v in values:
+        index = index * radix + v
+
+    codes = [0] * len(windows)
+    masks = [0] * len(windows)
+    for x, window in enumerate(windows):
+        for cell in window:
+            codes[x] = codes[x] * a + (0 if values[cell] == a else values[cell])
+            masks[x] = masks[x] << 1 | (values[cell] == a)
+    counts = [0] * total
+    state = {"covered": 0, "conflicts": 0}
+
+    def tally(x, change):
+        for o in wildcardOffsets(a, masks[x]):
+            c = codes[x] + o
+            if change > 0:
+                counts[c] += 1
+                if counts[c] == 1:
+                    state["covered"] += 1
+                else:
+                    state["conflicts"] += 1
+            else:
+                counts[c] -= 1
+                if counts[c] == 0:
+                    state["covered"] -= 1
+                else:
+                    state["conflicts"] -= 1
+
+    for x in range(len(windows)):
+        tally(x, 1)
+
+    for rank in range(start, stop):
+        if state["covered"] == total and not state["conflicts"]:
+            yield index, ["".join("⋄" if v == a else str(v)
+                                  for v in values[r * l:(r + 1) * l])
+                          for r in range(w)]
+        if rank + 1 == stop:
+            break
+        # The next rank changes the lowest digit d that does not wrap around,
+        # by one in the direction given by the reflections above it.
+        d = 0
+        next = rank + 1
+        while next % radix == 0:
+            next //= radix
+            d += 1
+        step = -1 if next // radix % 2 else 1
+        k = cells - 1 - d
+        old, new = values[k], values[k] + step
+        for x, t in containing[k]:
+            tally(x, -1)
+            codes[x] += ((0 if new == a else new) - (0 if old == a else old)) * powers[t]
+            masks[x] ^= ((old == a) ^ (new == a)) << t
+            tally(x, 1)
+        values[k] = new
+        index += step * radix ** d
+
+"""
+This function settles the search as an exact cover problem and solves it with the Dancing Links
+solver in exactcover.py instead of looking at candidates. There is one option for every window
+position and every way of filling it with symbols and wildcards. An option covers its window
+position, every submatrix it covers and, with the symbol as color, its cells, so that overlapping
+windows have to agree on the cells they share. The solutions are then exactly the upmatrices. It
+yields them as the other searches do, but in the order the solver finds them. If `first` is true
+it stops after the first one, and if `seed` is given it only looks for one with randomized
+restarts, which can find upmatrices in spaces far too large to search completely.
+"""
+def exactCoverUpmatrices(l, w, a, submatrixLength, submatrixWidth, torus=False, first=False,
+                         seed=None):
+    size = submatrixLength * submatrixWidth
+    windows = []
+    rows = range(w) if torus else range(w - submatrixLength + 1)
+    columns = range(l) if torus else range(l - submatrixWidth + 1)
+    for i in rows:
+        for j in columns:
+            windows.append([(i + k) % w * l + (j + m) % l
+                            for k in range(submatrixLength)
+                            for m in range(submatrixWidth)])
+    if not windows:
+        return
+
+    problem = ExactCover([("window", x) for x in range(len(windows))] +
+                         [("word", c) for c in range(a ** size)],
+                         [("cell", k) for k in range(l * w)])
+    patterns = []
+    for x, window in enumerate(windows):
+        for pattern in product(range(a + 1), repeat=size):
+            code = 0
+            wildcardMask = 0
+            for v in pattern:
+                code = code * a + (0 if v == a else v)
+                wildcardMask = wildcardMask << 1 | (v == a)
+            problem.addOption([("window", x)] +
+                              [("word", code + o) for o in wildcardOffsets(a, wildcardMask)] +
+                              [(("cell", cell), v) for cell, v in zip(window, pattern)])
+            patterns.append((window, pattern))
+
+    if seed is not None:
+        solution = problem.randomSolution(seed)
+        solutions = [solution] if solution is not None else []
+    else:
+        solutions = problem.solutions(1 if first else None)
+    for solution in solutions:
+        values = [0] * (l * w)
+        for option in solution:
+            for cell, v in zip(*patterns[option]):
+                values[cell] = v
+        index = 0
+        for v in values:
+            index = index * (a + 1) + v
+        yield index, ["".join("⋄" if v == a else str(v) for v in values[r * l:(r + 1) * l])
+                      for r in range(w)]
+
+"""
+This function looks for a single upmatrix with the local search in localsearch.py: random
+candidates are improved one cell at a time by simulated annealing until every submatrix is covered
+exactly once. It cannot show that there is none, but it can find upmatrices far beyond the reach of
+the other searches. The walks run on `jobs` processes, and the upmatrix found, if any, is checked
+again before it is yielded.
+"""
+def annealedUpmatrices(l, w, a, submatrixLength, submatrixWidth, torus=False, seed=None, jobs=1):
+    array = findArray(symbolsOf("0123456789"[0 : a], "⋄"), w, l, submatrixLength, submatrixWidth,
+                      torus, seed, walkers=jobs, processes=jobs if jobs > 1 else None)
+    if array is None:
+        return
+    m = [array.rowValues(r) for r in range(w)]
+    index = 0
+    for v in matrixValues(m, a):
+        index = index * (a + 1) + v
+    yield index, m
+
+"""
+This function writes one upmatrix to the output file in the format of the files in /data, with
+`wildcard` in place of "⋄".
+"""
+def writeUpmatrix(file, i, m, orbitSize=None, wildcard="⋄"):
+    if orbitSize is None:
+        title = f"Matrix #{i}"
+    else:
+        title = f"Matrix #{i} (class of {orbitSize})"
+    writeObject(file, [row.replace("⋄", wildcard) for row in m], title)
+    file.flush()
+
+"""
+For parallel runs the solution space is cut into shards, many more than there are processes so
+that shards that are pruned quickly are made up for by the others. A shard is a range of candidate
+numbers when iterating over every candidate, and a fixed choice of the first cells for the
+depth-first search. This function returns the number of shards and the size of each.
+"""
+def shardLayout(l, w, a, backtrack, jobs):
+    if backtrack:
+        cells = 0
+        while cells < l * w and (a + 1) ** cells < 64 * jobs:
+            cells += 1
+        return (a + 1) ** cells, cells
+    n = (a + 1) ** (l * w)
+    size = max(1, -(-n // (256 * jobs)))
+    return -(-n // size), size
+
+"""
+This function searches one shard (see above) and returns the list of [number, rows, class size]
+of the upmatrices it contains. It runs in the worker processes.
+"""
+def searchShard(l, w, a, submatrix, backtrack, gray, torus, symmetric, shardSize, shard):
+    if backtrack:
+        prefix = [shard // (a + 1) ** (shardSize - 1 - k) % (a + 1) for k in range(shardSize)]
+        found = backtrackUpmatrices(l, w, a, *submatrix, torus, symmetric, prefix)
+    elif gray:
+        found = grayUpmatrices(l, w, a, *submatrix, shard * shardSize,
+                               min((shard + 1) * shardSize, (a + 1) ** (l * w)), torus)
+    else:
+        found = exhaustiveUpmatrices(l, w, a, *submatrix, shard * shardSize,
+                                     min((shard + 1) * shardSize, (a + 1) ** (l * w)))
+    symmetries = matrixSymmetries(l, w, *submatrix, torus)
+    results = []
+    for i, m in found:
+        orbitSize = None
+        if symmetric:
+            orbitSize = canonicalOrbitSize(matrixValues(m, a), a, symmetries)
+            if not orbitSize:
+                continue
+        results.append([i, m, orbitSize])
+    return results
+
+"""
+This function saves the shard layout and the results of the completed shards so that an
+interrupted run can be resumed. The file is replaced atomically so that it is never left
+half-written.
+"""
+CHECKPOINT_SECONDS = 60
+
+def saveCheckpoint(path, parameters, shards, shardSize, completed):
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump({"parameters": parameters, "shards": shards, "shard-size": shardSize,
+                   "completed": completed}, file)
+    os.replace(path + ".tmp", path)
+
+"""
+This function runs the shards on a pool of `jobs` processes, checkpointing the completed shards
+every `CHECKPOINT_SECONDS` and at the end. A resumed run keeps the shards of the run it resumes,
+so it can use a different number of processes. The upmatrices found are returned shard by shard,
+each shard in the order its search finds them (by candidate number, or by Gray code rank with
+`--gray`), regardless of the order in which the shards finished.
+"""
+def searchInParallel(args, jobs):
+    l, w, a = args.length, args.width, args.alphabet_size
+    shards, shardSize = shardLayout(l, w, a, args.backtrack, jobs)
+    parameters = {"length": l, "width": w, "alphabet-size": a, "submatrix": args.submatrix,
+                  "backtrack": args.backtrack, "gray": args.gray,
+                  "torus": args.torus, "symmetry": args.symmetry}
+    completed = {}
+    if args.resume and os.path.exists(args.state):
+        with open(args.state, encoding="utf-8") as file:
+            state = json.load(file)
+        if state["parameters"] != parameters:
+            sys.exit(f"{args.state} belongs to a different search; not resuming.")
+        shards, shardSize = state["shards"], state["shard-size"]
+        completed = state["completed"]
+
+    pending = [k for k in range(shards) if str(k) not in completed]
+    print(f"Searching {shards} shards on {jobs} processes, {shards - len(pending)} already done...")
+    lastCheckpoint = time.monotonic()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        running = {}
+        while pending or running:
+            while pending and len(running) < 2 * jobs:
+                k = pending.pop(0)
+                running[executor.submit(searchShard, l, w, a, args.submatrix, args.backtrack,
+                                        args.gray, args.torus, args.symmetry, shardSize,
+                                        k)] = k
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                completed[str(running.pop(future))] = future.result()
+            if time.monotonic() - lastCheckpoint > CHECKPOINT_SECONDS:
+                saveCheckpoint(args.state, parameters, shards, shardSize, completed)
+                lastCheckpoint = time.monotonic()
+            print(f"\r{len(completed)} / {shards} shards complete.", end="", flush=True)
+    saveCheckpoint(args.state, parameters, shards, shardSize, completed)
+    print()
+    return [result for k in range(shards) for result in completed[str(k)]]
+
 """
 This is the main loop of the code that actually executes everything. It will iterate over the
 entire solution space and store the found upmatrices in a file called `output.txt`.
 """
 if __name__ == "__main__":
     
-    if len(sys.argv) != 4:
-        print("Usage: python3 array-finder.py <length> <width> <alphabet-size>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        usage="python3 array-finder.py <length> <width> <alphabet-size> [--submatrix R C] [--wildcard W] [--backtrack | --gray | --dlx [--first] | --anneal] [--seed S] [--torus] [--symmetry] [--jobs N] [--resume]")
+    parser.add_argument("length", type=int)
+    parser.add_argument("width", type=int)
+    parser.add_argument("alphabet_size", type=int)
+    parser.add_argument("--submatrix", type=int, nargs=2, default=[2, 2], metavar=("R", "C"),
+                        help="the number of rows and columns of the submatrices (default: 2 2)")
+    parser.add_argument("--wildcard", default="⋄",
+                        help="the symbol written to output.txt for wildcards (default: ⋄)")
+    parser.add_argument("--backtrack", action="store_true",
+                        help="search depth-first with pruning instead of iterating over every candidate")
+    parser.add_argument("--gray", action="store_true",
+                        help="iterate over every candidate in Gray code order, checking only the changed submatrices")
+    parser.add_argument("--dlx", action="store_true",
+                        help="solve the search as an exact cover problem with Dancing Links")
+    parser.add_argument("--anneal", action="store_true",
+                        help="look for one upmatrix by local search (simulated annealing)")
+    parser.add_argument("--first", action="store_true",
+                        help="stop at the first upmatrix found (needs --dlx)")
+    parser.add_argument("--seed", type=int,
+                        help="look for one upmatrix with randomized restarts from this seed (needs --dlx or --anneal)")
+    parser.add_argument("--torus", action="store_true",
+                        help="search for uptori, whose submatrices wrap around (not without a search mode)")
+    parser.add_argument("--symmetry", action="store_true",
+                        help="only output one representative of each symmetry class, with the class size")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="split the search into shards and run them on this many processes")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip the shards completed by an earlier run with the same parameters")
+    parser.add_argument("--state", default="output.state.json",
+                        help="checkpoint file for --jobs and --resume (default: output.state.json)")
+    args = parser.parse_args()
+    if args.backtrack + args.gray + args.dlx + args.anneal > 1:
+        parser.error("only one of --backtrack, --gray, --dlx and --anneal can be given")
+    if args.torus and not (args.backtrack or args.gray or args.dlx or args.anneal):
+        parser.error("--torus needs --backtrack, --gray, --dlx or --anneal")
+    if args.first and not args.dlx:
+        parser.error("--first needs --dlx")
+    if args.seed is not None and not (args.dlx or args.anneal):
+        parser.error("--seed needs --dlx or --anneal")
+    if args.dlx and (args.jobs > 1 or args.resume):
+        parser.error("--dlx runs on a single process")
+    if args.anneal and (args.resume or args.symmetry):
+        parser.error("--anneal cannot be resumed or combined with --symmetry")
+    if not 1 <= args.alphabet_size <= 10:
+        parser.error("the alphabet size must be between 1 and 10")
     
-    l = int(sys.argv[1])
-    w = int(sys.argv[2])
-    a = int(sys.argv[3])
+    l = args.length
+    w = args.width
+    a = args.alphabet_size
     
     n = (a + 1) ** (l * w)
     
+    if (args.jobs > 1 or args.resume) and not args.anneal:
+        results = searchInParallel(args, args.jobs)
+        with open("output.txt", "w", encoding="utf-8") as outfile:
+            for i, m, orbitSize in results:
+                writeUpmatrix(outfile, i, m, orbitSize, args.wildcard)
+        print(f"{len(results)} found.")
+        sys.exit(0)
+    
     outfile = open("output.txt", "w", encoding="utf-8")
-    outfile.close()
+    symmetries = matrixSymmetries(l, w, *args.submatrix, args.torus)
+    
+    if args.backtrack or args.gray or args.dlx or args.anneal:
+        if args.backtrack:
+            print(f"Searching {n} possible candidates depth-first...")
+            upmatrices = backtrackUpmatrices(l, w, a, *args.submatrix, args.torus, args.symmetry)
+        elif args.anneal:
+            print(f"Looking for one of {n} possible candidates by local search...")
+            upmatrices = annealedUpmatrices(l, w, a, *args.submatrix, args.torus, args.seed,
+                                            args.jobs)
+        elif args.dlx:
+            print(f"Solving for {n} possible candidates as an exact cover problem...")
+            upmatrices = exactCoverUpmatrices(l, w, a, *args.submatrix, args.torus, args.first,
+                                              args.seed)
+        else:
+            print(f"Iterating over {n} possible candidates in Gray code order...")
+            upmatrices = grayUpmatrices(l, w, a, *args.submatrix, 0, n, args.torus)
+        found = 0
+        for i, m in upmatrices:
+            if not args.symmetry:
+                writeUpmatrix(outfile, i, m, wildcard=args.wildcard)
+            else:
+                orbitSize = canonicalOrbitSize(matrixValues(m, a), a, symmetries)
+                if not orbitSize:
+                    continue
+                writeUpmatrix(outfile, i, m, orbitSize, args.wildcard)
+            found += 1
+            print(f"\r{found} found, latest is #{i}.", end="", flush=True)
+        outfile.close()
+        print()
+        sys.exit(0)
     
     print(f"Iterating over {n} possible candidates...")
     
     for i in range(n):
-        m = generateUpmatrix(i, l, w, 2)
+        m = generateUpmatrix(i, l, w, a)
         print(f"\r{i + 1} / {n} complete.", end="", flush=True)
         
-        if isUpmatrix(m, "0123456789"[0 : a], 2, 2):
-            with open("output.txt", "a", encoding="utf-8") as file:
-                file.write(f"Matrix #{i}\n")
-                for j in range(w):
-                    file.write(f"{m[j]}\n")
-                file.write("\n")
+        if isUpmatrix(m, "0123456789"[0 : a], *args.submatrix):
+            if not args.symmetry:
+                writeUpmatrix(outfile, i, m, wildcard=args.wildcard)
+                continue
+            orbitSize = canonicalOrbitSize(matrixValues(m, a), a, symmetries)
+            if orbitSize:
+                writeUpmatrix(outfile, i, m, orbitSize, args.wildcard)
+    outfile.close()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+"""
+The code in this module catalogues the universal partial cycles (upcycles) and universal partial
+families (upfamilies) for small alphabets and subword lengths, as `array-finder.py` does for
+upmatrices.
+
+To execute the code, run `python3 cycle-finder.py <alphabet-size> <subword-length> <max-length>`.
+For example, `python3 cycle-finder.py 2 4 16` lists every binary upcycle for subwords of length 4
+with at most 16 symbols in a file called `output.txt`. Each cycle is listed once, as its least
+rotation (the wildcard coming after every symbol), followed by a blank line as in the files in
+/data.
+
+`--families` lists the upfamilies whose members have at most <max-length> symbols instead, one
+member per line. `--symmetry` only lists the first cycle or family of each class related by
+reversing the cycles and permuting the alphabet, and `--wildcard W` writes W instead of "⋄" for
+the wildcards (the files in /data use "w").
+
+`--jobs N` splits the search on the first few symbols of each cycle and runs the parts on N
+processes. The output is the same as for a run on a single process.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from alphabet import Alphabet
+from datafile import writeObject
+from necklacesearch import findCycles, findUpfamilies, symmetryKey
+
+"""
+This function writes one cycle or family (a list of cycles) to the output file in the format of the
+files in /data, with `wildcard` in place of "⋄".
+"""
+def writeCycles(file, cycles, wildcard="⋄"):
+    writeObject(file, [cycle.replace("⋄", wildcard) for cycle in cycles])
+    file.flush()
+
+"""
+This function drops every cycle or family that is related to an earlier one by a symmetry (see
+`symmetryKey()`), keeping the order of the others.
+"""
+def distinctClasses(alphabet, catalogue):
+    seen = set()
+    for cycles in catalogue:
+        key = symmetryKey(alphabet, cycles)
+        if key not in seen:
+            seen.add(key)
+            yield cycles
+
+"""
+This is the main loop of the code. It searches for every upcycle (or upfamily) and stores them in a
+file called `output.txt`.
+"""
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        usage="python3 cycle-finder.py <alphabet-size> <subword-length> <max-length> [--families] [--symmetry] [--wildcard W] [--jobs N]")
+    parser.add_argument("alphabet_size", type=int)
+    parser.add_argument("subword_length", type=int)
+    parser.add_argument("max_length", type=int)
+    parser.add_argument("--families", action="store_true",
+                        help="list upfamilies instead of upcycles")
+    parser.add_argument("--symmetry", action="store_true",
+                        help="only output one representative of each symmetry class")
+    parser.add_argument("--wildcard", default="⋄",
+                        help="the symbol written to output.txt for wildcards (default: ⋄)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="split the search on prefixes and run them on this many processes")
+    args = parser.parse_args()
+    if not 1 <= args.alphabet_size <= 10:
+        parser.error("the alphabet size must be between 1 and 10")
+    if args.subword_length < 1 or args.max_length < 1:
+        parser.error("the subword length and the maximum length must be positive")
+
+    a = args.alphabet_size
+    n = args.subword_length
+    alphabet = Alphabet(list("0123456789"[0:a]), "⋄")
+    processes = args.jobs if args.jobs > 1 else None
+
+    if args.families:
+        print(f"Searching for upfamilies with members of up to {args.max_length} symbols...")
+        catalogue = findUpfamilies(alphabet, n, args.max_length, processes)
+    else:
+        print(f"Searching for upcycles of up to {args.max_length} symbols...")
+        catalogue = ([c] for c in findCycles(alphabet, n, range(1, args.max_length + 1),
+                                             processes=processes))
+    if args.symmetry:
+        catalogue = distinctClasses(alphabet, catalogue)
+
+    found = 0
+    with open("output.txt", "w", encoding="utf-8") as outfile:
+        for cycles in catalogue:
+            writeCycles(outfile, cycles, args.wildcard)
+            found += 1
+            print(f"\r{found} found.", end="", flush=True)
+    print()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+from alphabet import Alphabet
+from coverage import WindowCoverage
+
+a2 = Alphabet(["0","1"], "w")
+a3 = Alphabet(["0","1","2"], "w")
+
+# Test Word Codes
+
+c = WindowCoverage(a3, 3)
+assert(c.wordOf(0) == "000")
+assert(c.wordOf(5) == "012")
+assert(c.wordOf(26) == "222")
+
+assert(list(c.offsetsOf(0b001)) == [0, 1, 2])
+assert(c.offsetsOf(0b100) == (0, 9, 18))
+assert(sorted(c.offsetsOf(0b101)) == [0, 1, 2, 9, 10, 11, 18, 19, 20])
+
+# Test Linear Scans
+
+c = WindowCoverage(a2, 2)
+assert(c.scan(a2.encode("00110")))
+assert(c.isExactCover())
+
+c = WindowCoverage(a2, 2)
+assert(c.scan(a2.encode("w01")))
+assert(not c.isExactCover())
+assert(c.missingWords() == ["11"])
+
+# Test Cyclic Scans
+
+c = WindowCoverage(a2, 4)
+assert(c.scan(a2.encode("001w110w"), cyclic=True))
+assert(c.isExactCover())
+
+# The scan stops on the first doubled word...
+c = WindowCoverage(a2, 3)
+assert(not c.scan(a2.encode("000101110"), cyclic=True))
+assert(c.stopped)
+assert(c.doubledWords() == ["000"])
+
+# ...unless asked to keep going, in which case it reports every violation.
+c = WindowCoverage(a2, 3, stopEarly=False)
+assert(c.scan(a2.encode("0w0101110"), cyclic=True, member=7))
+assert(c.doubledWords() == ["010", "101", "000", "001"])
+assert(c.doubled[0] == (2, 7, 2)) # 010 again at offset 2 of member 7.
+assert(c.missingWords() == [])
+
+# Windows containing symbols outside the alphabet cover nothing.
+c = WindowCoverage(a2, 2)
+assert(c.scan(a2.encode("0s11")))
+assert(c.covered == 1)
+
+# Test bitsets
+
+c = WindowCoverage(a2, 2)
+c.scan(a2.encode("011"))
+assert(c.coveredBits() == 0b1010)
+d = WindowCoverage(a2, 2)
+d.mergeBits(0b0001)
+d.mergeBits(0b0100)
+assert(d.coveredBits() == 0b0101)
+assert(d.covered == 2)
+assert(list(d.counts) == [1, 0, 1, 0])
+
+# Test wildcard offset tables
+
+from coverage import wildcardOffsets
+
+assert(wildcardOffsets(3, 0) == range(1))
+assert(wildcardOffsets(3, 0b011) == range(9))
+assert(wildcardOffsets(2, 0b101) == (0, 4, 1, 5))
+assert(wildcardOffsets(2, 0b101) is wildcardOffsets(2, 0b101))
+
+# Test disk-backed bitsets
+
+from coverage import DiskBitset
+
+bits = DiskBitset(21)
+assert(len(bits) == 21 and bits.count() == 0)
+bits[0] = 1
+bits[13] = 2 # Any nonzero value sets the bit.
+bits[20] = 1
+assert(bits[13] == 1 and bits[12] == 0)
+assert(bits.count() == 3)
+bits[0] = 0
+assert(list(bits) == [0] * 13 + [1] + [0] * 6 + [1])
+assert(bytes(bits) == bytes(bits.flags(0, 21)))
+assert(bits.flags(8, 16) == bytes([0, 0, 0, 0, 0, 1, 0, 0]))
+try:
+    bits[21] = 1
+    assert(False)
+except IndexError:
+    pass
+bits.close()
+
+# A WindowCoverage tallying in a DiskBitset reports the same.
+for cycle, n in [("0w0101110", 3), ("0011101w", 4), ("01201221w", 2)]:
+    alphabet = a3 if "2" in cycle else a2
+    c = WindowCoverage(alphabet, n, stopEarly=False)
+    c.scan(alphabet.encode(cycle), cyclic=True)
+    d = WindowCoverage(alphabet, n, stopEarly=False,
+                       counts=DiskBitset(len(alphabet.symbols) ** n))
+    d.scan(alphabet.encode(cycle), cyclic=True)
+    assert(d.covered == c.covered and d.doubled == c.doubled)
+    assert(d.missingWords() == c.missingWords())
+    assert(d.coveredBits() == c.coveredBits())
+    assert(d.isExactCover() == c.isExactCover())
+
+d = WindowCoverage(a2, 2, counts=DiskBitset(4))
+d.mergeBits(0b0001)
+d.mergeBits(0b0100)
+assert(d.coveredBits() == 0b0101)
+assert(d.covered == 2)
+assert(list(d.counts) == [1, 0, 1, 0])
+
+# Chunks overlapping by n - 1 codes, scanned from their positions, give the
+# windows and offsets of one scan.
+c = WindowCoverage(a2, 3, stopEarly=False)
+c.scan(a2.encode("0w0101110"))
+d = WindowCoverage(a2, 3, stopEarly=False)
+for position in range(0, 7, 3):
+    d.scan(a2.encode("0w0101110")[position:position + 5], position=position)
+assert(d.doubled == c.doubled and d.counts == c.counts)
+
+# Test coverage tables
+
+import random
+from coverage import (DenseBitset, HashTable, RoaringBitset, coverBound,
+                      coverageTable, tableMemory)
+
+random.seed(11)
+size = 5 * (1 << 16) + 123
+for table in (DenseBitset(size), DiskBitset(size), RoaringBitset(size),
+              HashTable(size)):
+    model = set()
+    for _ in range(3000):
+        i = random.randrange(size)
+        value = random.randrange(3)
+        table[i] = value
+        if value:
+            model.add(i)
+        else:
+            model.discard(i)
+        j = random.randrange(size)
+        assert(table[j] == (j in model))
+    assert(table.count() == len(model))
+    assert(bytes(table) == bytes(int(i in model) for i in range(size)))
+    assert(list(table)[:1000] == [int(i in model) for i in range(1000)])
+    assert(tableMemory(table) >= 0)
+    table.close()
+
+# Roaring chunks turn into bitmaps when full and back into arrays.
+table = RoaringBitset(1 << 20)
+empty = tableMemory(table)
+for i in range(0, 2 * 5000, 2):
+    table[(1 << 16) + i] = 1
+assert(isinstance(table._chunks[1], bytearray))
+assert(table.count() == 5000 and table[(1 << 16) + 2] and not table[3])
+for i in range(0, 2 * 3000, 2):
+    table[(1 << 16) + i] = 0
+assert(not isinstance(table._chunks[1], bytearray))
+assert(table.count() == 2000 and table[(1 << 16) + 6000])
+assert(tableMemory(table) > empty)
+for i in range(6000, 2 * 5000, 2):
+    table[(1 << 16) + i] = 0
+assert(table.count() == 0 and not table._chunks)
+
+# The backend follows the universe size, the expected fill and the limit.
+assert(isinstance(coverageTable(4 ** 8), bytearray))
+assert(isinstance(coverageTable(4 ** 9, 36), HashTable))
+assert(isinstance(coverageTable(4 ** 9, memoryLimit=4 ** 8), DenseBitset))
+assert(isinstance(coverageTable(4 ** 16, 2 * 10 ** 6, 5 * 10 ** 7),
+                  RoaringBitset))
+assert(isinstance(coverageTable(4 ** 16, 10 ** 8, 10 ** 7), DiskBitset))
+assert(isinstance(coverageTable(2 ** 40, 10 ** 5), HashTable))
+assert(len(coverageTable(4 ** 16, 10 ** 8, 10 ** 7)) == 4 ** 16)
+# A hash set is only picked while it is smaller than a DenseBitset, here
+# 2^29 bytes against 64 bytes per word.
+assert(isinstance(coverageTable(4 ** 16, 2 ** 23 - 1), HashTable))
+assert(isinstance(coverageTable(4 ** 16, 2 ** 23), RoaringBitset))
+assert(isinstance(coverageTable(4 ** 16, 10 ** 7), RoaringBitset))
+assert(isinstance(coverageTable(4 ** 12, 2 ** 15 - 1), HashTable))
+assert(isinstance(coverageTable(4 ** 12, 2 ** 15), bytearray))
+
+assert(coverBound(a2, a2.encode("0110"), 3, 4) == 4)
+assert(coverBound(a2, a2.encode("0w10"), 3, 4) == 8)
+assert(coverBound(a3, a3.encode("ww10"), 2, 2) == 9)
+
+# Every backend gives the same report.
+for cycle, n in [("0w0101110", 3), ("0011101w", 4), ("01201221w", 2)]:
+    alphabet = a3 if "2" in cycle else a2
+    size = len(alphabet.symbols) ** n
+    c = WindowCoverage(alphabet, n, stopEarly=False)
+    c.scan(alphabet.encode(cycle), cyclic=True)
+    for table in (DenseBitset(size), RoaringBitset(size), HashTable(size)):
+        d = WindowCoverage(alphabet, n, stopEarly=False, counts=table)
+        d.scan(alphabet.encode(cycle), cyclic=True)
+        assert(d.covered == c.covered and d.doubled == c.doubled)
+        assert(d.missingWords() == c.missingWords())
+        assert(d.coveredBits() == c.coveredBits())
+        assert(d.memoryUsage() > 0)
+
+# A few windows over a huge universe are tallied sparsely.
+c = a2.coverage("0110100110010110" * 2, 40)
+assert(isinstance(c.counts, HashTable))
+assert(c.covered == 0)
+c = a2.coverage("0110100110010110" * 3, 40)
+assert(c.covered == 9 and not c.doubled)
+assert(c.memoryUsage() < 10 ** 4)
+
+# Merged bitsets are marked in the table once it is read, and scans see
+# the merged words.
+d = WindowCoverage(a2, 3)
+d.mergeBits(0b00000011)
+d.mergeBits(0b00110000)
+assert(d.covered == 4)
+assert(d.coveredBits() == 0b00110011)
+assert(list(d.counts) == [1, 1, 0, 0, 1, 1, 0, 0])
+d.mergeBits(0b01000000)
+assert(not d.scan(a2.encode("0110")))
+assert(d.doubledWords() == ["110"])
+assert(d.coveredBits() == 0b01111011 and d.covered == 6)
+assert(d.missingWords() == ["010", "111"])
@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+import mmap
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import product
+
+# Translation tables between a counter array and the binary digits of a
+# bitset ("0"/"1" characters) or its bytes (0/1 per word).
+_ASCII_FLAGS = b"0" + b"1" * 255
+
+# Bit k of each byte as 0/1, and the number of bits set in each byte.
+_BIT_FLAGS = [bytes(i >> k & 1 for i in range(256)) for k in range(8)]
+_POPCOUNTS = bytes(bin(i).count("1") for i in range(256))
+
+@lru_cache(maxsize=4096)
+def wildcardOffsets(base, wildcardMask):
+    """Returns the offsets to add to the code of a word whose wildcards are 
+       read as the first symbol (code 0) to obtain each code the word 
+       covers, where bit t of @wildcardMask marks a wildcard in the digit of 
+       weight @base^t. Windows with the same wildcard layout share one table.
+       When the wildcards are exactly the last k digits the offsets are the 
+       range 0..@base^k-1.
+    """
+    if wildcardMask & (wildcardMask + 1) == 0:
+        return range(base ** wildcardMask.bit_length())
+    weights = [base ** t for t in range(wildcardMask.bit_length())
+               if wildcardMask >> t & 1]
+    return tuple(sum(d * w for d, w in zip(digits, weights))
+                 for digits in product(range(base), repeat=len(weights)))
+
+def windowCodes(alphabet, cells, width, cyclic):
+    """Returns the (code, wildcardMask) of each window of @width cells of
+       the sequence of symbol codes @cells, or None for windows containing
+       a symbol outside the alphabet. Bit t of the mask marks a wildcard in
+       the digit of weight a^t. If @cyclic is true there is one window per
+       cell and the windows wrap around.
+    """
+    cells = bytearray(cells)
+    a = len(alphabet.symbols)
+    wildcard = alphabet.WILDCARD_CODE
+    columns = len(cells)
+    count = columns if cyclic else columns - width + 1
+    if cyclic:
+        while len(cells) < count + width - 1:
+            cells += cells[:count + width - 1 - len(cells)]
+    modulus = a ** width
+    allWildcards = (1 << width) - 1
+    windows = []
+    code = 0
+    wildcardMask = 0
+    lastUnknown = -1
+    for i, s in enumerate(cells[:count + width - 1]):
+        if s < a:
+            code = (code * a + s) % modulus
+            wildcardMask = (wildcardMask << 1) & allWildcards
+        else:
+            code = (code * a) % modulus
+            wildcardMask = ((wildcardMask << 1) | 1) & allWildcards
+            if s != wildcard:
+                lastUnknown = i
+        if i >= width - 1:
+            windows.append(None if lastUnknown > i - width else
+                           (code, wildcardMask))
+    return windows
+
+# Coverage Tables ----------------------------------------------------------- #
+
+# The memory a coverage table may take unless told otherwise, and rough
+# costs of the sparse backends: a set entry with its int object, and the
+# fixed part of a container of a RoaringBitset.
+MEMORY_LIMIT = 1 << 30
+HASH_BYTES_PER_WORD = 64
+ROARING_BYTES_PER_CONTAINER = 128
+
+def coverBound(alphabet, codes, width, windows):
+    """Returns an upper bound on the number of words covered by @windows
+       windows of @width cells of the sequence of symbol codes @codes: each
+       covers at most a^k words, where k is the number of wildcards in
+       @codes (and at most @width)."""
+    a = len(alphabet.symbols)
+    wildcards = min(width, bytes(codes).count(alphabet.WILDCARD_CODE))
+    return min(a ** width, windows * a ** wildcards)
+
+class DenseBitset(object):
+    """A DenseBitset is a table of @size bits in one bytearray, an eighth of
+       a counter array. It can stand in for the counter array of a
+       WindowCoverage, as can every table below: reading an entry gives 0
+       or 1 and writing any nonzero value sets the bit.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._bits = bytearray(-(-size // 8))
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.size:
+            raise IndexError("bit index out of range")
+        return self._bits[i >> 3] >> (i & 7) & 1
+
+    def __setitem__(self, i, value):
+        if not 0 <= i < self.size:
+            raise IndexError("bit index out of range")
+        if value:
+            self._bits[i >> 3] |= 1 << (i & 7)
+        else:
+            self._bits[i >> 3] &= ~(1 << (i & 7)) & 255
+
+    def __iter__(self):
+        for start in range(0, self.size, 1 << 20):
+            yield from self.flags(start, min(self.size, start + (1 << 20)))
+
+    def __bytes__(self):
+        return self.flags(0, self.size)
+
+    def flags(self, start, stop):
+        """Returns bits @start..@stop-1 as bytes of 0/1, @start being a
+           multiple of 8."""
+        assert(start % 8 == 0)
+        data = bytes(self._bits[start >> 3:-(-stop // 8)])
+        flags = bytearray(8 * len(data))
+        for k in range(8):
+            flags[k::8] = data.translate(_BIT_FLAGS[k])
+        return bytes(flags[:stop - start])
+
+    def count(self):
+        """Returns the number of bits set, counted a megabyte at a time."""
+        return sum(sum(bytes(self._bits[i:i + (1 << 20)]).translate(
+                       _POPCOUNTS))
+                   for i in range(0, len(self._bits), 1 << 20))
+
+    def memoryUsage(self):
+        return sys.getsizeof(self._bits)
+
+    def close(self):
+        pass
+
+class DiskBitset(DenseBitset):
+    """A DiskBitset is a DenseBitset kept in a memory-mapped file, a
+       temporary one unless @path is given, so that the operating system
+       pages it in and out as needed. Its pages are cache rather than
+       memory of the process, so memoryUsage() is 0.
+    """
+
+    def __init__(self, size, path=None):
+        self.size = size
+        if path is None:
+            self._file = tempfile.TemporaryFile()
+        else:
+            self._file = open(path, "w+b")
+        self._file.truncate(max(1, -(-size // 8)))
+        self._bits = mmap.mmap(self._file.fileno(), 0)
+
+    def memoryUsage(self):
+        return 0
+
+    def close(self):
+        self._bits.close()
+        self._file.close()
+
+class RoaringBitset(object):
+    """A RoaringBitset is a compressed table of @size bits. The bits are
+       split into chunks of 2^16 and only chunks with a bit set are stored,
+       as in Roaring bitmaps: as a sorted array of 16-bit positions while
+       it holds at most 4096 bits, and as a bitmap of 8 KiB once the array
+       would be larger. A table whose bits are sparse or clustered takes
+       about 2 bytes per bit set, and never much more than a DenseBitset.
+    """
+
+    ARRAY_LIMIT = 4096
+
+    def __init__(self, size):
+        self.size = size
+        self._chunks = {}
+        self._counts = {}
+        self._count = 0
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.size:
+            raise IndexError("bit index out of range")
+        chunk = self._chunks.get(i >> 16)
+        if chunk is None:
+            return 0
+        low = i & 0xFFFF
+        if isinstance(chunk, bytearray):
+            return chunk[low >> 3] >> (low & 7) & 1
+        k = bisect_left(chunk, low)
+        return int(k < len(chunk) and chunk[k] == low)
+
+    def __setitem__(self, i, value):
+        if not 0 <= i < self.size:
+            raise IndexError("bit index out of range")
+        high, low = i >> 16, i & 0xFFFF
+        chunk = self._chunks.get(high)
+        if value:
+            if chunk is None:
+                chunk = self._chunks[high] = array("H")
+                self._counts[high] = 0
+            if self._setBit(chunk, low):
+                self._changed(high, 1)
+        elif chunk is not None and self._clearBit(chunk, low):
+            self._changed(high, -1)
+
+    def _setBit(self, chunk, low):
+        # Sets the bit and returns true if it was clear.
+        if isinstance(chunk, bytearray):
+            if chunk[low >> 3] >> (low & 7) & 1:
+                return False
+            chunk[low >> 3] |= 1 << (low & 7)
+            return True
+        k = bisect_left(chunk, low)
+        if k < len(chunk) and chunk[k] == low:
+            return False
+        chunk.insert(k, low)
+        return True
+
+    def _clearBit(self, chunk, low):
+        # Clears the bit and returns true if it was set.
+        if isinstance(chunk, bytearray):
+            if not chunk[low >> 3] >> (low & 7) & 1:
+                return False
+            chunk[low >> 3] &= ~(1 << (low & 7)) & 255
+            return True
+        k = bisect_left(chunk, low)
+        if k == len(chunk) or chunk[k] != low:
+            return False
+        del chunk[k]
+        return True
+
+    def _changed(self, high, delta):
+        # Counts a bit set or cleared in chunk @high and converts the chunk
+        # to a bitmap when its array grows past ARRAY_LIMIT, back to an
+        # array when it falls to half of that, and drops it when empty.
+        self._count += delta
+        count = self._counts[high] + delta
+        self._counts[high] = count
+        chunk = self._chunks[high]
+        if count == 0:
+            del self._chunks[high]
+            del self._counts[high]
+        elif delta > 0 and count > self.ARRAY_LIMIT and \
+             not isinstance(chunk, bytearray):
+            bitmap = bytearray(8192)
+            for position in chunk:
+                bitmap[position >> 3] |= 1 << (position & 7)
+            self._chunks[high] = bitmap
+        elif delta < 0 and count <= self.ARRAY_LIMIT // 2 and \
+             isinstance(chunk, bytearray):
+            flags = _flagsOf(chunk)
+            position = flags.find(1)
+            positions = array("H")
+            while position >= 0:
+                positions.append(position)
+                position = flags.find(1, position + 1)
+            self._chunks[high] = positions
+
+    def __iter__(self):
+        for start in range(0, self.size, 1 << 16):
+            yield from self.flags(start, min(self.size, start + (1 << 16)))
+
+    def __bytes__(self):
+        return b"".join(self.flags(start, min(self.size, start + (1 << 16)))
+                        for start in range(0, self.size, 1 << 16))
+
+    def flags(self, start, stop):
+        """Returns bits @start..@stop-1 of one chunk as bytes of 0/1,
+           @start being a multiple of 2^16."""
+        assert(start % (1 << 16) == 0 and stop - start <= 1 << 16)
+        chunk = self._chunks.get(start >> 16)
+        if chunk is None:
+            return bytes(stop - start)
+        if isinstance(chunk, bytearray):
+            return _flagsOf(chunk)[:stop - start]
+        flags = bytearray(stop - start)
+        for position in chunk:
+            flags[position] = 1
+        return bytes(flags)
+
+    def count(self):
+        return self._count
+
+    def memoryUsage(self):
+        return sys.getsizeof(self._chunks) + \
+               sum(sys.getsizeof(c) for c in self._chunks.values())
+
+    def close(self):
+        pass
+
+class HashTable(object):
+    """A HashTable is a table of @size bits kept as the set of the positions
+       of the bits set. Lookups are as fast as in a DenseBitset but every bit
+       set takes tens of bytes, so it suits tables with few bits set in a
+       huge universe, e.g. the windows of one candidate of a search.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._members = set()
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.size:
+            raise IndexError("bit index out of range")
+        return int(i in self._members)
+
+    def __setitem__(self, i, value):
+        if not 0 <= i < self.size:
+            raise IndexError("bit index out of range")
+        if value:
+            self._members.add(i)
+        else:
+            self._members.discard(i)
+
+    def __iter__(self):
+        for start in range(0, self.size, 1 << 20):
+            yield from self.flags(start, min(self.size, start + (1 << 20)))
+
+    def __bytes__(self):
+        return self.flags(0, self.size)
+
+    def flags(self, start, stop):
+        """Returns bits @start..@stop-1 as bytes of 0/1."""
+        flags = bytearray(stop - start)
+        for i in self._members:
+            if start <= i < stop:
+                flags[i - start] = 1
+        return bytes(flags)
+
+    def count(self):
+        return len(self._members)
+
+    def memoryUsage(self):
+        return sys.getsizeof(self._members) + \
+               sum(sys.getsizeof(i) for i in self._members)
+
+    def close(self):
+        pass
+
+def _flagsOf(bitmap):
+    # The bits of the bytes @bitmap as bytes of 0/1.
+    bitmap = bytes(bitmap)
+    flags = bytearray(8 * len(bitmap))
+    for k in range(8):
+        flags[k::8] = bitmap.translate(_BIT_FLAGS[k])
+    return bytes(flags)
+
+def tableMemory(table):
+    """Returns the bytes of memory taken by the coverage table @table."""
+    if isinstance(table, bytearray):
+        return sys.getsizeof(table)
+    return table.memoryUsage()
+
+def coverageTable(size, expected=None, memoryLimit=MEMORY_LIMIT):
+    """Returns an empty coverage table for @size words of which at most
+       about @expected (by default all) will be covered, picking the
+       fastest backend whose estimated memory fits in @memoryLimit bytes:
+         - a HashTable, if it would be smaller than a DenseBitset;
+         - a counter array (a bytearray, one byte per word);
+         - a DenseBitset (size / 8 bytes), or a RoaringBitset if it would
+           take under a quarter of that;
+         - a RoaringBitset;
+         - a DiskBitset, which only takes disk space.
+    """
+    if expected is None or expected > size:
+        expected = size
+    hashBytes = expected * HASH_BYTES_PER_WORD
+    chunks = min(expected, -(-size >> 16))
+    roaringBytes = min(2 * expected, 8192 * chunks) + \
+                   ROARING_BYTES_PER_CONTAINER * chunks
+    denseBytes = -(-size // 8)
+    if hashBytes < denseBytes and hashBytes <= memoryLimit:
+        return HashTable(size)
+    if size <= memoryLimit:
+        return bytearray(size)
+    if denseBytes <= memoryLimit and 4 * roaringBytes >= denseBytes:
+        return DenseBitset(size)
+    if roaringBytes <= memoryLimit:
+        return RoaringBitset(size)
+    return DiskBitset(size)
+
+class WindowCoverage(object):
+    """A WindowCoverage tallies which words of length @subwordLength are
+       covered by the windows of one or more sequences of symbol codes (see
+       Alphabet.encode). Each word is identified by its integer code in base
+       a, so the tally is a single counter array of a^n entries and each
+       sequence only has to be walked once.
+
+       The same object doubles as the report of the check: after scanning,
+       @doubled holds (code, member, offset) for every window that covered an
+       already covered word, and missingWords() lists the words that no
+       window covered.
+
+       The tally is kept in @counts if given, and otherwise in the table
+       coverageTable() picks for the @expected words (see coverBound()):
+       a counter array unless the universe is too large or the windows too
+       few for one. Every other table only records 0 or 1 per word, which
+       is all the report needs.
+    """
+
+    def __init__(self, alphabet, subwordLength, stopEarly=True, counts=None,
+                 expected=None):
+        self.alphabet = alphabet
+        self.subwordLength = subwordLength
+        self.stopEarly = stopEarly
+        self.base = len(alphabet.symbols)
+        if counts is None:
+            counts = coverageTable(self.base ** subwordLength, expected)
+        assert(len(counts) == self.base ** subwordLength)
+        self._counts = counts
+        self.covered = 0
+        self.doubled = []
+        self.stopped = False
+        # The covered words as a bitset, kept up to date by mergeBits() and
+        # dropped (None) when cover() marks a new word.
+        self._coveredBits = 0
+        # Words merged by mergeBits() but not yet marked in the table.
+        self._merged = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __str__(self):
+        return "%s of %s words covered, %s doubled, %s missing." % (
+            self.covered, len(self.counts), len(self.doubled),
+            len(self.counts) - self.covered)
+
+# Words and Codes ----------------------------------------------------------- #
+
+    def wordOf(self, code):
+        """Returns the word (as a string) whose integer code is @code."""
+        return self.alphabet.universe(self.subwordLength)[code]
+
+    def offsetsOf(self, wildcardMask):
+        """Returns the values that must be added to the code of a window 
+           (with its wildcards read as the first symbol) to obtain every code 
+           it covers. Bit t of @wildcardMask marks a wildcard in the digit of 
+           weight a^t.
+        """
+        return wildcardOffsets(self.base, wildcardMask)
+
+# Tallying ------------------------------------------------------------------ #
+
+    def cover(self, code, wildcardMask=0, member=None, offset=None):
+        """Records one window whose code is @code and whose wildcards are
+           marked by @wildcardMask. Returns false if the window covered a
+           word that was already covered and the check stops early.
+        """
+        if self._merged:
+            self._markMerged()
+        counts = self._counts
+        for o in self.offsetsOf(wildcardMask) if wildcardMask else (0,):
+            c = code + o
+            if counts[c]:
+                self.doubled.append((c, member, offset))
+                if counts[c] < 255:
+                    counts[c] += 1
+                if self.stopEarly:
+                    self.stopped = True
+                    return False
+            else:
+                counts[c] = 1
+                self.covered += 1
+                self._coveredBits = None
+        return True
+
+    def scan(self, codes, cyclic=False, member=None, position=0):
+        """Walks the windows of the sequence of symbol codes @codes once,
+           recording every word each window covers. If @cyclic is true the
+           windows wrap around the end of @codes. Windows containing a
+           symbol outside the alphabet cover nothing. Returns false if the
+           scan stopped early on a doubled word.
+
+           Offsets are reported from @position, so a long sequence can be
+           scanned in chunks that overlap by n - 1 codes, each chunk
+           starting at @position.
+        """
+        n = self.subwordLength
+        length = len(codes)
+        if cyclic and length > 0 and n > 1:
+            extended = bytes(codes)
+            while len(extended) < length + n - 1:
+                extended += bytes(codes)
+            codes = extended[:length + n - 1]
+
+        a = self.base
+        wildcard = self.alphabet.WILDCARD_CODE
+        modulus = len(self.counts)
+        allWildcards = (1 << n) - 1
+        code = 0
+        wildcardMask = 0
+        lastUnknown = -1
+        for i, s in enumerate(codes):
+            if s < a:
+                code = (code * a + s) % modulus
+                wildcardMask = (wildcardMask << 1) & allWildcards
+            else:
+                code = (code * a) % modulus
+                wildcardMask = ((wildcardMask << 1) | 1) & allWildcards
+                if s != wildcard:
+                    lastUnknown = i
+            start = i - n + 1
+            if start < 0 or lastUnknown >= start:
+                continue
+            if not self.cover(code, wildcardMask, member, position + start):
+                return False
+        return True
+
+# Bitsets ------------------------------------------------------------------- #
+
+    @property
+    def counts(self):
+        """The coverage table, with every word merged so far marked."""
+        if self._merged:
+            self._markMerged()
+        return self._counts
+
+    def coveredBits(self):
+        """Returns the covered words as an integer bitset (bit c is set iff 
+           the word with code c was covered). The bitset is kept between
+           calls, so it is only rebuilt from the table after a scan."""
+        if self._coveredBits is None:
+            flags = bytes(self.counts).translate(_ASCII_FLAGS)
+            self._coveredBits = int(flags[::-1], 2) if flags else 0
+        return self._coveredBits
+
+    def mergeBits(self, bits):
+        """Marks every word in the bitset @bits (e.g. from coveredBits() of
+           another WindowCoverage) as covered once. The bitset must not 
+           overlap the words covered so far. Merged bitsets are only ORed
+           together; the table is brought up to date once, the next time
+           it is read, so a run of merges (as in CyclicFamily.coverage)
+           costs one pass over the table rather than one per merge."""
+        covered = self.coveredBits()
+        assert(not bits & covered)
+        self._coveredBits = covered | bits
+        self._merged |= bits
+        self.covered += bin(bits).count("1")
+
+    def _markMerged(self):
+        # Marks the words of the pending merged bitset in the table.
+        size = len(self._counts)
+        bits, self._merged = self._merged, 0
+        ones = _flagsOf(bits.to_bytes(-(-size // 8), "little"))[:size]
+        if isinstance(self._counts, bytearray):
+            self._counts = bytearray((int.from_bytes(self._counts, "little") |
+                                      int.from_bytes(ones, "little"))
+                                     .to_bytes(size, "little"))
+            return
+        c = ones.find(1)
+        while c >= 0:
+            self._counts[c] = 1
+            c = ones.find(1, c + 1)
+
+# Report -------------------------------------------------------------------- #
+
+    def memoryUsage(self):
+        """Returns the bytes of memory taken by the tally."""
+        return tableMemory(self.counts)
+
+    def isExactCover(self):
+        """Returns true iff every word was covered by exactly one window."""
+        return not self.doubled and self.covered == len(self.counts)
+
+    def doubledWords(self):
+        """Returns the list of distinct words covered more than once."""
+        words = []
+        for c, _, _ in self.doubled:
+            w = self.wordOf(c)
+            if w not in words:
+                words.append(w)
+        return words
+
+    def missingWords(self):
+        """Returns the list of words no window covered. This is only the
+           final answer if the scan was not stopped early.
+        """
+        return [self.wordOf(c) for c, count in enumerate(self.counts)
+                if count == 0]
+
+    def close(self):
+        """Releases the table of the tally, e.g. the mapped file of a
+           DiskBitset. The report cannot be read afterwards."""
+        if not isinstance(self._counts, bytearray):
+            self._counts.close()
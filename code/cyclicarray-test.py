@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+import os
+from alphabet import Alphabet
+from cyclicarray import CyclicArray
+
+a2 = Alphabet(["0","1"], "w")
+a4 = Alphabet(["0","1","2","3"], "w")
+
+data = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+def readArrays(alphabet, name):
+    with open(os.path.join(data, name)) as f:
+        blocks = f.read().split("\n\n")
+    arrays = []
+    for block in blocks:
+        rows = block.split()
+        if rows:
+            t = CyclicArray(alphabet, len(rows), len(rows[0]))
+            t.setValues(rows)
+            arrays.append(t)
+    return arrays
+
+# Test Value Setters/Getters
+
+t = CyclicArray(a2, 3, 4)
+t.setValues(["w001", "1100", "1100"])
+assert(t.valueAt(0, 0) == "w")
+assert(t.valueAt(-1, 5) == "1")
+assert(t.rowValues(1) == "1100")
+t.setValueAt(3, 4, "1")
+assert(str(t) == "1001\n1100\n1100")
+t.setValueAt(0, 0, "w")
+
+# Test Subarray Codes
+
+codes = list(t.subarrayCodes(2, 2))
+assert(len(codes) == 12)
+assert(codes[0] == (0, 0, 0b0011, 0b1000)) # w0/11
+assert((2, 3, 0b0110, 0b0001) in codes) # 01/1w, wrapping both ways
+
+assert(len(list(t.subarrayCodes(2, 2, cyclic=False))) == 6)
+
+# Test Covering Structures
+
+assert(t.isUptorus(2, 2))
+assert(not t.isUpmatrix(2, 2))
+
+c = t.coverage(2, 3, stopEarly=False)
+assert(not c.isExactCover())
+
+t.setValueAt(0, 0, "0")
+assert(not t.isUptorus(2, 2))
+c = t.coverage(2, 2, stopEarly=False)
+assert(c.missingWords() == ["0111", "1011", "1101", "1110"])
+
+t.setValues(["ww01", "1100", "1100"])
+assert(not t.isUptorus(2, 2))
+assert(t.coverage(2, 2).doubled == [(15, None, (1, 0))])
+assert(t.coverage(2, 2).doubledWords() == ["1111"])
+
+# The uptori in /data
+
+for name, alphabet, r, c in [("uptorus-2-2-2.txt", a2, 2, 2),
+                             ("uptorus-2-3-4.txt", a2, 3, 4),
+                             ("uptorus-4-2-4.txt", a4, 2, 4)]:
+    for t in readArrays(alphabet, name):
+        assert(t.isUptorus(r, c))
+
+# The upmatrices in /data
+
+upmatrices = readArrays(a2, "upmatrices-2-2-2.txt")
+assert(len(upmatrices) > 100)
+for m in upmatrices:
+    assert(m.isUpmatrix(2, 2))
+
+# Test Streaming Verification
+
+from cyclicarray import StreamingCoverage
+
+for name, alphabet, r, c in [("uptorus-2-3-4.txt", a2, 3, 4),
+                             ("uptorus-4-2-4.txt", a4, 2, 4)]:
+    t = readArrays(alphabet, name)[0]
+    stream = StreamingCoverage(alphabet, t.columns, r, c)
+    for i in range(t.rows):
+        assert(stream.addRow(alphabet.encode(t.rowValues(i))))
+    assert(stream.finish().isExactCover())
+
+stream = StreamingCoverage(a2, 4, 2, 2, stopEarly=False)
+for row in ["ww01", "1100", "1100"]:
+    stream.addRow(a2.encode(row))
+c = stream.finish()
+assert(not c.isExactCover())
+assert(sorted(c.doubledWords()) == ["0111", "1010", "1101", "1111"])
+
+m = upmatrices[0]
+stream = StreamingCoverage(a2, m.columns, 2, 2, cyclic=False)
+for i in range(m.rows):
+    stream.addRow(m.codes()[i * m.columns:(i + 1) * m.columns])
+assert(stream.finish().isExactCover())
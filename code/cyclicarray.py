@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+from collections import deque
+from coverage import WindowCoverage, coverBound, windowCodes
+
+class CyclicArray(object):
+    """A CyclicArray is the two-dimensional analogue of a CyclicString: a
+       @rows by @columns array of symbols whose rows and columns wrap
+       around, i.e. a torus. Cells are stored as symbol codes (see
+       Alphabet.encode) in one row-major bytearray.
+
+       The words of an r by c subarray are read row by row, so the subarray
+           ab
+           cd
+       covers the word "abcd".
+    """
+    __slots__ = ("alphabet", "rows", "columns", "_codes")
+
+    def __init__(self, alphabet, rows, columns):
+        self.alphabet = alphabet
+        self.rows = rows
+        self.columns = columns
+        self._codes = bytearray([alphabet.UNKNOWN_CODE]) * (rows * columns)
+
+# Value Setters/Getters ----------------------------------------------------- #
+
+    def __str__(self):
+        return "\n".join(self.rowValues(i) for i in range(self.rows))
+
+    def setValues(self, values):
+        """Sets the cells from the list of strings @values, one per row."""
+        assert(len(values) == self.rows)
+        assert(all(len(row) == self.columns for row in values))
+        self._codes = self.alphabet.encode("".join(values))
+
+    def setCodes(self, codes):
+        """Sets the cells from the row-major sequence of symbol codes
+           @codes."""
+        assert(len(codes) == self.rows * self.columns)
+        self._codes = bytearray(codes)
+
+    def setValueAt(self, row, column, value):
+        self._codes[self._cell(row, column)] = self.alphabet.codeOf(value)
+
+    def codes(self):
+        """Returns a copy of the row-major bytearray of symbol codes."""
+        return bytearray(self._codes)
+
+    def codeAt(self, row, column):
+        return self._codes[self._cell(row, column)]
+
+    def valueAt(self, row, column):
+        return self.alphabet.symbolOf(self.codeAt(row, column))
+
+    def rowValues(self, row):
+        start = (row % self.rows) * self.columns
+        return self.alphabet.decode(self._codes[start:start + self.columns])
+
+    def containsWildcard(self):
+        return self.alphabet.WILDCARD_CODE in self._codes
+
+    def _cell(self, row, column):
+        return (row % self.rows) * self.columns + column % self.columns
+
+# Subarray Codes ------------------------------------------------------------ #
+
+    def _rowWindows(self, row, width, cyclic):
+        start = row * self.columns
+        return windowCodes(self.alphabet, self._codes[start:start + self.columns],
+                           width, cyclic)
+
+    def subarrayCodes(self, subarrayRows, subarrayColumns, cyclic=True):
+        """Yields (row, column, code, wildcardMask) for every @subarrayRows
+           by @subarrayColumns subarray, where (row, column) is its top left
+           cell. The code is computed from the codes of the row windows
+           above it, so each subarray costs O(1) rather than O(r·c). If
+           @cyclic is false only the subarrays that do not wrap around are
+           considered. Subarrays containing symbols outside the alphabet are
+           skipped.
+        """
+        r, c = subarrayRows, subarrayColumns
+        if not cyclic and (r > self.rows or c > self.columns):
+            return
+        a = len(self.alphabet.symbols)
+        rowWindows = [self._rowWindows(i, c, cyclic) for i in range(self.rows)]
+        rowModulus = a ** c
+        modulus = a ** (r * c)
+        allWildcards = (1 << (r * c)) - 1
+        startRows = self.rows if cyclic else self.rows - r + 1
+        for j in range(len(rowWindows[0])):
+            # Roll down column j, shifting a row window in at the bottom of
+            # the subarray and out at the top.
+            code = 0
+            wildcardMask = 0
+            lastUnknown = -r
+            for i in range(startRows + r - 1):
+                window = rowWindows[i % self.rows][j]
+                if window is None:
+                    lastUnknown = i
+                    window = (0, 0)
+                code = (code * rowModulus + window[0]) % modulus
+                wildcardMask = ((wildcardMask << c) | window[1]) & allWildcards
+                if i >= r - 1 and lastUnknown <= i - r:
+                    yield (i - r + 1, j, code, wildcardMask)
+
+    def coverage(self, subarrayRows, subarrayColumns, cyclic=True,
+                 stopEarly=True):
+        """Returns the WindowCoverage of the words of length r·c covered by
+           the subarrays, computed in one pass. Doubled words are reported
+           with the (row, column) of the offending subarray as offset."""
+        size = subarrayRows * subarrayColumns
+        if cyclic:
+            windows = self.rows * self.columns
+        else:
+            windows = max(0, self.rows - subarrayRows + 1) * \
+                      max(0, self.columns - subarrayColumns + 1)
+        coverage = WindowCoverage(self.alphabet, size, stopEarly,
+                                  expected=coverBound(self.alphabet,
+                                                      self._codes, size,
+                                                      windows))
+        for i, j, code, wildcardMask in self.subarrayCodes(
+                subarrayRows, subarrayColumns, cyclic):
+            if not coverage.cover(code, wildcardMask, None, (i, j)):
+                break
+        return coverage
+
+# Covering Structures ------------------------------------------------------- #
+
+    def isDeBruijnTorus(self, subarrayRows, subarrayColumns):
+        """Returns true if every r by c array over the alphabet is covered
+           by exactly one (wrapped) subarray."""
+        return self.coverage(subarrayRows, subarrayColumns).isExactCover()
+
+    def isUptorus(self, subarrayRows, subarrayColumns):
+        """Returns true if this is an uptorus (i.e. a de Bruijn torus with at
+           least one wildcard) for r by c subarrays."""
+        if not self.containsWildcard():
+            return False
+        return self.isDeBruijnTorus(subarrayRows, subarrayColumns)
+
+    def isUpmatrix(self, subarrayRows, subarrayColumns):
+        """Returns true if, ignoring wraparound, every r by c array over the
+           alphabet is covered by exactly one subarray."""
+        return self.coverage(subarrayRows, subarrayColumns,
+                             cyclic=False).isExactCover()
+
+class StreamingCoverage(object):
+    """A StreamingCoverage checks the @subarrayRows by @subarrayColumns
+       subarrays of an array with @columns columns that is given one row at
+       a time, e.g. as it is generated, so that the array never has to be
+       held in memory. Only the row windows of the last r rows are kept,
+       and, if @cyclic is true, those of the first r - 1 rows, which the
+       subarrays wrapping around the bottom need at the end.
+
+       Feed the rows with addRow(); finish() returns the WindowCoverage,
+       whose doubled words carry the (row, column) of their subarray.
+    """
+
+    def __init__(self, alphabet, columns, subarrayRows, subarrayColumns,
+                 cyclic=True, stopEarly=True):
+        self.alphabet = alphabet
+        self.columns = columns
+        self.subarrayRows = subarrayRows
+        self.subarrayColumns = subarrayColumns
+        self.cyclic = cyclic
+        self.coverage = WindowCoverage(alphabet, subarrayRows * subarrayColumns,
+                                       stopEarly)
+        self.rows = 0
+        self._recent = deque(maxlen=subarrayRows)
+        self._first = []
+        self._appended = 0
+
+    def addRow(self, codes):
+        """Adds the next row, given as a sequence of @columns symbol codes.
+           Returns false once the check has stopped early."""
+        assert(len(codes) == self.columns)
+        windows = windowCodes(self.alphabet, codes, self.subarrayColumns,
+                               self.cyclic)
+        if self.cyclic and len(self._first) < self.subarrayRows - 1:
+            self._first.append(windows)
+        self.rows += 1
+        return self._append(windows)
+
+    def _append(self, windows):
+        self._recent.append(windows)
+        self._appended += 1
+        if len(self._recent) < self.subarrayRows or self.coverage.stopped:
+            return not self.coverage.stopped
+        rowModulus = len(self.alphabet.symbols) ** self.subarrayColumns
+        top = self._appended - self.subarrayRows
+        for j in range(len(windows)):
+            code = 0
+            wildcardMask = 0
+            for row in self._recent:
+                if row[j] is None:
+                    break
+                code = code * rowModulus + row[j][0]
+                wildcardMask = wildcardMask << self.subarrayColumns | row[j][1]
+            else:
+                if not self.coverage.cover(code, wildcardMask, None, (top, j)):
+                    return False
+        return True
+
+    def finish(self):
+        """Covers the subarrays that wrap around the bottom (if @cyclic) and
+           returns the WindowCoverage."""
+        if self.cyclic and self.rows:
+            for k in range(self.subarrayRows - 1):
+                if not self._append(self._first[k % self.rows]):
+                    break
+        return self.coverage
@@ -37,6 +37,25 @@ family.addCyclicString("22303320223133212232332222333323")
 
 assert(family.isUniversalPartialFamily(4))
 
+# Test the coverage report of a family with a repeated member
+
+broken = CyclicFamily(a2)
+broken.addCyclicString("01")
+broken.addCyclicString("0011")
+broken.addCyclicString("1")
+c = broken.coverage(2, stopEarly=False)
+assert(c.doubledWords() == ["01", "10", "11"])
+assert(c.doubled[0] == (1, 1, 1)) # 01 again at offset 1 of member 1.
+assert(c.missingWords() == [])
+assert(not broken.isDeBruijnFamily(2))
+
+if __name__ == "__main__":
+    # Members can also be scanned by a pool of worker processes.
+    assert(family.isUniversalPartialFamily(4, processes=2))
+    c = broken.coverage(2, stopEarly=False, processes=2)
+    assert(c.doubled == broken.coverage(2, stopEarly=False).doubled)
+    assert(not broken.isDeBruijnFamily(2, processes=2))
+
 # Test using the alphabet multiplier theorem to produce an upfamily:
 
 a = 2
@@ -17,9 +17,19 @@
 #  SPDX-License-Identifier: MIT
 #
 
+from concurrent.futures import ProcessPoolExecutor
 from alphabet import Alphabet
+from coverage import WindowCoverage, coverBound
 from cyclicstring import CyclicString
 
+def _memberBits(alphabet, subwordLength, codes):
+    # Worker for CyclicFamily.coverage: the words covered by one member as 
+    # a bitset, and whether the member covers some word twice on its own.
+    coverage = WindowCoverage(alphabet, subwordLength, expected=coverBound(
+        alphabet, codes, subwordLength, len(codes)))
+    coverage.scan(codes, cyclic=True)
+    return coverage.coveredBits(), bool(coverage.doubled)
+
 class CyclicFamily(object):
     def __init__(self, alphabet):
         self.alphabet = alphabet
@@ -36,20 +46,52 @@ class CyclicFamily(object):
         c.setValues(chars)
         self.values.append(c)
     
-    def isDeBruijnFamily(self, subwordLength):
+    def coverage(self, subwordLength, stopEarly=True, processes=None):
+        """Returns the WindowCoverage of the cyclic windows of length 
+           @subwordLength of every member, tallied in one shared coverage
+           table. Each doubled word is reported with the index of the 
+           member and the offset of the window that covered it again. If 
+           @processes is given, members are scanned in parallel by that 
+           many worker processes and their bitsets merged in order.
+        """
+        expected = sum(coverBound(self.alphabet, c.codes(), subwordLength,
+                                  c.length) for c in self.values)
+        coverage = WindowCoverage(self.alphabet, subwordLength, stopEarly,
+                                  expected=expected)
+        if processes is None:
+            for i, c in enumerate(self.values):
+                if not coverage.scan(c.codes(), cyclic=True, member=i):
+                    break
+            return coverage
+
+        covered = 0
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = executor.map(_memberBits,
+                                   [self.alphabet] * len(self.values),
+                                   [subwordLength] * len(self.values),
+                                   [c.codes() for c in self.values])
+            for i, (bits, doubled) in enumerate(results):
+                if doubled or bits & covered:
+                    # Rescan the offending member against the shared 
+                    # counters to find out where the violations are.
+                    if not coverage.scan(self.values[i].codes(), cyclic=True,
+                                         member=i):
+                        executor.shutdown(cancel_futures=True)
+                        break
+                    covered = coverage.coveredBits()
+                else:
+                    coverage.mergeBits(bits)
+                    covered |= bits
+        return coverage
+    
+    def isDeBruijnFamily(self, subwordLength, processes=None):
         """Returns true if @candidate is a de Bruijn family (i.e. a 
            collection of strings that cover all subwords of length 
            @subwordLength exactly once in one member).
         """
-        for w in self.alphabet.wordsOfLength(subwordLength):
-            totalCount = 0
-            for s in self.values:
-                totalCount += s.substringCount(w)
-            if totalCount != 1:
-                return False
-        return True
+        return self.coverage(subwordLength, True, processes).isExactCover()
         
-    def isUniversalPartialFamily(self, subwordLength):
+    def isUniversalPartialFamily(self, subwordLength, processes=None):
         """Returns true if @candidate is an upfamily (i.e. a de Bruijn family with 
            at least one wildcard) for subwords of length @subwordLength.
         """
@@ -59,5 +101,5 @@ class CyclicFamily(object):
                 wildcardPresent = True
         if not wildcardPresent:
             return False
-        return self.isDeBruijnFamily(subwordLength)
+        return self.isDeBruijnFamily(subwordLength, processes)
         
\ No newline at end of file
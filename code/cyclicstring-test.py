@@ -42,6 +42,10 @@ assert(s.isPresentExactlyOnce("11"))
 
 assert(not s.isDeBruijnCycle(2))
 
+assert(s.substringCount("w") == 3)
+assert(s.substringCount("0w10w1") == 1) # Wraps around once.
+assert(s.substringCounts(["00", "01", "10", "11", "1w", ""]) == [1, 2, 1, 1, 2, 3])
+
 a4 = Alphabet(["a","b","c","d"])
 s = CyclicString(a4, 8)
 s.setValues("abcdaaaa")
@@ -70,4 +74,115 @@ assert(p.values == "1w2")
 
 p.stripWildcards()
 assert(p.length == 2)
-assert(p.values == "12")
\ No newline at end of file
+assert(p.values == "12")
+
+# Test Coverage Reports
+
+s = CyclicString(a2, 9)
+s.setValues("000101110")
+c = s.coverage(3, stopEarly=False)
+assert(c.doubledWords() == ["000"])
+assert(c.missingWords() == [])
+
+# Test the symbol-code backend
+
+s = CyclicString(a4, 4)
+assert(s.values == "    ")
+s.setValueAt(2, "c")
+s.setValueAt(0, "a")
+assert(s.values == "a c ")
+
+s.setValues("abcd")
+w = s.window(3, 3)
+assert(len(w) == 3)
+assert(list(w) == [3, 0, 1])
+assert(w[-1] == 1)
+assert(w.tobytes() == bytes([3, 0, 1]))
+assert(s.valuesAt(-1, 6) == "dabcda")
+
+# The window is a view: it sees later writes.
+s.setValueAt(0, "d")
+assert(list(w) == [3, 3, 1])
+
+# Moving to a bigger alphabet keeps the symbols.
+s = CyclicString(a2, 4)
+s.setValues("01w1")
+s.alphabet = Alphabet(["0","1","2","3"], "w")
+assert(s.values == "01w1")
+assert(s.valueAt(2) == "w")
+
+# Test rotation
+
+s = CyclicString(a4, 5)
+s.setValues("abcdb")
+s.rotateRightBy(0)
+assert(s.values == "abcdb")
+s.rotateLeftBy(7)
+assert(s.values == "cdbab")
+s.setValueAt(0, "a")
+assert(s.values == "adbab")
+s.rotateRightBy(2)
+assert(s.values == "abadb")
+s.concatenate(2)
+assert(s.values == "abadbabadb")
+
+# Test canonical rotations
+
+s = CyclicString(a2, 8)
+s.setValues("10w11000")
+assert(s.canonicalRotation() == 5)
+assert(s.canonicalKey() == a2.encode("00010w11"))
+t = CyclicString(a2, 8)
+t.setValues("0w110001")
+assert(t.canonicalKey() == s.canonicalKey())
+t.canonicalize()
+assert(t.values == "00010w11")
+
+p = CyclicString(a, 4)
+p.setValues("0w12")
+q = CyclicString(a, 4)
+q.setValues("1w2w")
+p.multiply(q)
+assert(p.values == "0w2w")
+
+p.setValues("2w12")
+p.scalarMultiply(2, modulus=3)
+assert(p.values == "1w21")
+
+p.setValues("2w12")
+q.setValues("2122")
+p.rotateLeft()
+p.add(q, modulus=3)
+assert(p.values == "w211")
+
+# Test Window Indexes
+
+s = CyclicString(a2, 8)
+s.setValues("001w110w")
+index = s.attachIndex(4)
+assert(s.attachIndex(4) is index and s.windowIndex(3) is None)
+assert(index.isExactCover() and s.isDeBruijnCycle(4))
+assert(index.countOf("0010") == 1)
+
+s.setValueAt(2, "0") # Only the 4 windows containing cell 2 are recounted.
+assert(s.values == "000w110w")
+assert(index.doubledWords() == ["0000", "0001", "0011", "1000"])
+assert(index.missingWords() == ["0010", "0101", "1001", "1011", "1111"])
+assert(not s.isDeBruijnCycle(4) and not s.isPresentExactlyOnce("0001"))
+assert(index.countOf("0001") == s.substringCount("0001") == 2)
+s.setValueAt(2, "1")
+assert(index.isExactCover())
+
+s.rotateLeftBy(3) # Rotations leave the counts alone.
+s.setValueAt(0, "0")
+assert(s.values == "0110w001")
+assert(index.missingWords() == ["0011", "0111", "1110", "1111"])
+s.setValueAt(0, "w")
+assert(index.isExactCover())
+
+s.stripWildcards() # Edits of the whole buffer rebuild the index.
+assert(s.values == "110001" and index.covered == 6)
+s.setValues("011000")
+assert(index.doubledWords() == [] and index.covered == 6)
+s.detachIndex(4)
+assert(s.windowIndex(4) is None)
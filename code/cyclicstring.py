@@ -17,11 +17,227 @@
 #  SPDX-License-Identifier: MIT
 #
 
+import multiplier
+from coverage import WindowCoverage, coverBound, wildcardOffsets, windowCodes
+from matcher import WildcardMatcher
+
+def leastRotation(codes):
+    """Returns the offset of the lexicographically least rotation of the
+       sequence @codes, using Booth's linear time algorithm.
+    """
+    doubled = bytes(codes) * 2
+    failure = [-1] * len(doubled)
+    k = 0
+    for j in range(1, len(doubled)):
+        c = doubled[j]
+        i = failure[j - k - 1]
+        while i != -1 and c != doubled[k + i + 1]:
+            if c < doubled[k + i + 1]:
+                k = j - i - 1
+            i = failure[i]
+        if c != doubled[k + i + 1]:
+            if c < doubled[k]:
+                k = j
+            failure[j - k] = -1
+        else:
+            failure[j - k] = i + 1
+    return k
+
+class CyclicWindow(object):
+    """A CyclicWindow is a read-only view of @length consecutive symbol codes
+       of a CyclicString starting at @start, wrapping around the end of the
+       buffer. No codes are copied until tobytes() is called.
+    """
+    __slots__ = ("_codes", "_start", "_length")
+
+    def __init__(self, codes, start, length):
+        self._codes = codes
+        self._start = start
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("window index out of range")
+        return self._codes[(self._start + i) % len(self._codes)]
+
+    def __iter__(self):
+        codes = memoryview(self._codes)
+        size = len(codes)
+        start = self._start
+        remaining = self._length
+        while remaining > 0:
+            end = min(size, start + remaining)
+            for c in codes[start:end]:
+                yield c
+            remaining -= end - start
+            start = 0
+
+    def tobytes(self):
+        return bytes(self)
+
+class WindowIndex(object):
+    """A WindowIndex counts, for every word of length @subwordLength, the
+       cyclic windows of a CyclicString that cover it, so that coverage
+       queries are answered without scanning the cycle. It is attached with
+       CyclicString.attachIndex() and kept up to date by the string: an edit
+       of one cell recounts only the n windows containing it, rotations
+       change nothing, and edits that replace the whole buffer rebuild it.
+
+       Windows are kept by their physical start in the buffer of the
+       string, and @doubled holds the codes of the words covered more than
+       once.
+    """
+
+    def __init__(self, alphabet, subwordLength):
+        self.alphabet = alphabet
+        self.subwordLength = subwordLength
+        self.base = len(alphabet.symbols)
+        self.counts = [0] * self.base ** subwordLength
+        self.covered = 0
+        self.doubled = set()
+        self._windows = []
+
+    def __str__(self):
+        return "%s of %s words covered, %s doubled." % (
+            self.covered, len(self.counts), len(self.doubled))
+
+# Maintenance --------------------------------------------------------------- #
+
+    def _apply(self, window, delta):
+        # Adds @delta to the count of every word @window covers.
+        if window is None:
+            return
+        code, wildcardMask = window
+        counts = self.counts
+        for o in wildcardOffsets(self.base, wildcardMask) if wildcardMask \
+                else (0,):
+            before = counts[code + o]
+            after = counts[code + o] = before + delta
+            self.covered += (after > 0) - (before > 0)
+            if after > 1 and before <= 1:
+                self.doubled.add(code + o)
+            elif before > 1 and after <= 1:
+                self.doubled.discard(code + o)
+
+    def rebuild(self, codes):
+        """Recounts every window of the buffer @codes."""
+        self.counts = [0] * len(self.counts)
+        self.covered = 0
+        self.doubled = set()
+        self._windows = windowCodes(self.alphabet, codes, self.subwordLength,
+                                    cyclic=True) if codes else []
+        for window in self._windows:
+            self._apply(window, 1)
+
+    def update(self, codes, position):
+        """Recounts the windows of the buffer @codes that contain the cell
+           at the physical @position, after it was changed."""
+        n = self.subwordLength
+        length = len(codes)
+        if n >= length:
+            self.rebuild(codes)
+            return
+        first = position - n + 1
+        cells = [codes[(first + j) % length] for j in range(2 * n - 1)]
+        for i, window in enumerate(windowCodes(self.alphabet, cells, n,
+                                               cyclic=False)):
+            start = (first + i) % length
+            self._apply(self._windows[start], -1)
+            self._windows[start] = window
+            self._apply(window, 1)
+
+    def shift(self, offset):
+        """Follows the buffer of the string when it is rotated physically
+           so that the cell at @offset comes first."""
+        self._windows = self._windows[offset:] + self._windows[:offset]
+
+# Queries ------------------------------------------------------------------- #
+
+    def countOf(self, word):
+        """Returns the number of windows covering @word, which must not
+           contain wildcards."""
+        return self.counts[self.alphabet.universe(self.subwordLength)
+                           .codeOf(word)]
+
+    def isPresentExactlyOnce(self, word):
+        return self.countOf(word) == 1
+
+    def doubledWords(self):
+        """Returns the sorted list of the words covered more than once."""
+        universe = self.alphabet.universe(self.subwordLength)
+        return [universe[c] for c in sorted(self.doubled)]
+
+    def missingWords(self):
+        """Returns the list of the words no window covers."""
+        universe = self.alphabet.universe(self.subwordLength)
+        return [universe[c] for c, count in enumerate(self.counts)
+                if count == 0]
+
+    def isExactCover(self):
+        """Returns true iff every word is covered by exactly one window."""
+        return not self.doubled and self.covered == len(self.counts)
+
 class CyclicString(object):
+    """A CyclicString stores one symbol code (see Alphabet.encode) per cell
+       in a bytearray, so reading or writing a cell is O(1) and windows can
+       be viewed without copying. The string-valued methods decode on
+       demand; characters outside the alphabet are stored as blanks.
+
+       Rotations only move @_offset, the physical position of logical cell
+       0, so they are O(1) as well.
+    """
+    __slots__ = ("_alphabet", "_codes", "_offset", "_indexes")
+
     def __init__(self, alphabet, length):
-        self.alphabet = alphabet
-        self.length = length
-        self.values = " " * length
+        self._alphabet = alphabet
+        self._codes = bytearray([alphabet.UNKNOWN_CODE]) * length
+        self._offset = 0
+        self._indexes = {}
+
+    @property
+    def alphabet(self):
+        return self._alphabet
+
+    @alphabet.setter
+    def alphabet(self, alphabet):
+        # Symbol codes are positions in the alphabet, so they are re-encoded
+        # when the string is moved to a different (e.g. embiggened) alphabet.
+        values = self._alphabet.decode(self._codes)
+        self._alphabet = alphabet
+        self._codes = alphabet.encode(values)
+        self._indexes = {n: WindowIndex(alphabet, n) for n in self._indexes}
+        self._rebuildIndexes()
+
+    @property
+    def length(self):
+        return len(self._codes)
+
+    @property
+    def values(self):
+        return self._alphabet.decode(self.codes())
+
+    @values.setter
+    def values(self, values):
+        self._codes = self._alphabet.encode(values)
+        self._offset = 0
+        self._rebuildIndexes()
+
+    def codes(self):
+        """Returns a bytearray of the symbol codes, starting from cell 0."""
+        return self._codes[self._offset:] + self._codes[:self._offset]
+
+    def _normalize(self):
+        # Moves logical cell 0 back to the start of the buffer.
+        if self._offset:
+            for index in self._indexes.values():
+                index.shift(self._offset)
+            self._codes = self.codes()
+            self._offset = 0
 
 # Value Setters/Getters ----------------------------------------------------- #
 
@@ -29,41 +245,47 @@ class CyclicString(object):
         return self.values
     
     def setValueAt(self, position, value):
-        v = list(self.values)
-        v[position] = value
-        self.values = "".join(v)
+        position = (position + self._offset) % self.length
+        self._codes[position] = self._alphabet.codeOf(value)
+        for index in self._indexes.values():
+            index.update(self._codes, position)
         
     def setValues(self, values):
         assert(len(values) == self.length)
         self.values = values
+
+    def setCodes(self, codes):
+        assert(len(codes) == self.length)
+        self._codes = bytearray(codes)
+        self._offset = 0
+        self._rebuildIndexes()
+
+    def codeAt(self, index):
+        return self._codes[(index + self._offset) % self.length]
         
     def valueAt(self, index):
-        s = list(self.values)
-        if (index < 0):
-            index = index + self.length
-        index = index % self.length
-        return self.values[index]
+        return self._alphabet.symbolOf(self.codeAt(index))
+
+    def window(self, index, length):
+        """Returns a CyclicWindow onto the @length codes starting at 
+           @index."""
+        return CyclicWindow(self._codes, (index + self._offset) % self.length,
+                            length)
     
     def valuesAt(self, index, length):
-        s = list(self.values)
-        result =""
-        if (index < 0):
-            index = index + self.length
-        index = index % self.length
-        for offset in range(0, length):
-            result += self.valueAt(index + offset)
-        return result
+        return self._alphabet.decode(self.window(index, length))
     
     def containsWildcard(self):
-        return self.alphabet.wildcard in self.values
+        return self._alphabet.WILDCARD_CODE in self._codes
 
 # Rotation ------------------------------------------------------------------ #
  
     def rotateLeftBy(self, offset):
-        self.values = self.values[offset:] + self.values[:offset]
+        if self.length:
+            self._offset = (self._offset + offset) % self.length
     
     def rotateRightBy(self, offset):
-        self.values = self.values[self.length-offset:] + self.values[:-offset]
+        self.rotateLeftBy(-offset)
     
     def rotateLeft(self):
         self.rotateLeftBy(1)
@@ -71,65 +293,94 @@ class CyclicString(object):
     def rotateRight(self):
         self.rotateRightBy(1)
 
+    def canonicalRotation(self):
+        """Returns the offset k such that rotateLeftBy(k) gives the least 
+           rotation of this cyclic string (ordering symbols as in the 
+           alphabet, wildcard last). Runs in linear time."""
+        return leastRotation(self.codes())
+
+    def canonicalKey(self):
+        """Returns the codes of the least rotation as bytes. Two cyclic 
+           strings are rotations of one another iff their keys are equal, 
+           so the key can be used to hash and deduplicate them."""
+        codes = self.codes()
+        k = leastRotation(codes)
+        return bytes(codes[k:] + codes[:k])
+
+    def canonicalize(self):
+        """Rotates this cyclic string to its least rotation."""
+        self.rotateLeftBy(self.canonicalRotation())
+
 # Alphabet Multiplier Shenanigans ------------------------------------------- #
 
-    def add(self, cyclicString):
+    def add(self, cyclicString, modulus=None):
         """Returns the result of component-wise adding each element of this 
            cyclic string to the corresponding element of @cyclicString. 
-           Treats a + w = w for all a. Alphabet must be embiggened first. 
-           Modifies this CyclicString in place."""
-        assert(len(self.values) == len(cyclicString.values))
-        for x in range(0, len(self.values)):
-            if self.values[x] == self.alphabet.wildcard:
-                continue
-            elif cyclicString.values[x] == self.alphabet.wildcard:
-                self.setValueAt(x, self.alphabet.wildcard)
-            else:
-                newValue = str(int(self.values[x]) + int(cyclicString.values[x]))
-            assert(newValue in self.alphabet.symbols)
-            self.setValueAt(x, newValue)
-
-    def scalarMultiply(self, multiplier):
-        vs = list(self.values)
-        for x in range(0, len(vs)):
-            if vs[x] == self.alphabet.wildcard:
-                vs[x] = self.alphabet.wildcard
-            else:
-                vs[x] =str(int(vs[x]) * multiplier)
-        self.values = "".join(vs)
-
-    def multiply(self, cyclicString):
+           Treats a + w = w for all a. Alphabet must be embiggened first 
+           (or the sum reduced by @modulus). Modifies this CyclicString in 
+           place."""
+        self.setCodes(multiplier.add(self.codes(), cyclicString.codes(),
+                                     len(self.alphabet.symbols), modulus))
+
+    def scalarMultiply(self, factor, modulus=None):
+        self.setCodes(multiplier.scale(self.codes(), factor,
+                                       len(self.alphabet.symbols), modulus))
+
+    def multiply(self, cyclicString, modulus=None):
         """Returns the result of component-wise multplication of each element"""
-        assert(len(self.values) == len(cyclicString.values))
-        for x in range(0, len(self.values)):
-            if self.values[x] == self.alphabet.wildcard:
-                continue
-            elif cyclicString.values[x] == self.alphabet.wildcard:
-                self.setValueAt(x, self.alphabet.wildcard)
-            else:
-                newValue = str(int(self.values[x]) * int(cyclicString.values[x]))
-            assert(newValue in self.alphabet.symbols)
-            self.setValueAt(x, newValue)
+        self.setCodes(multiplier.multiply(self.codes(), cyclicString.codes(),
+                                          len(self.alphabet.symbols), modulus))
 
     def concatenate(self, count):
-        self.length = self.length * count
-        self.values = self.values * count
+        self._normalize()
+        self._codes = self._codes * count
+        self._rebuildIndexes()
         
     def stripWildcards(self):
-        self.values = self.values.replace(self.alphabet.wildcard, "")
-        self.length = len(self.values)
+        self._normalize()
+        self._codes = self._codes.replace(
+            bytes([self._alphabet.WILDCARD_CODE]), b"")
+        self._rebuildIndexes()
+
+# Window Indexes ------------------------------------------------------------ #
+
+    def attachIndex(self, subwordLength):
+        """Attaches (or returns the attached) WindowIndex of the windows of
+           length @subwordLength. While it is attached, edits keep it up to
+           date and isPresentExactlyOnce() and isDeBruijnCycle() use it."""
+        index = self._indexes.get(subwordLength)
+        if index is None:
+            index = self._indexes[subwordLength] = WindowIndex(
+                self._alphabet, subwordLength)
+            index.rebuild(self._codes)
+        return index
+
+    def detachIndex(self, subwordLength):
+        self._indexes.pop(subwordLength, None)
+
+    def windowIndex(self, subwordLength):
+        """Returns the attached WindowIndex for @subwordLength, or None."""
+        return self._indexes.get(subwordLength)
+
+    def _rebuildIndexes(self):
+        for index in self._indexes.values():
+            index.rebuild(self._codes)
 
 # Covering Structures ------------------------------------------------------- #
     
     def substringCount(self, substring):
-        count = 0
-        # Otherwise, we count up how many times it's present. Because the string is
-        # cyclic, any character can be the initial character, so we need to examine
-        # all the possible starting characters.
-        for j in range(self.length):
-            if self.alphabet.areEqualWords(substring, self.valuesAt(j, len(substring))):
-                count += 1
-        return count
+        """Returns the number of starting positions at which @substring
+           matches this cyclic string, wildcards matching every symbol. The
+           occurrences are found in one bit-parallel pass (see
+           WildcardMatcher)."""
+        return WildcardMatcher(self._alphabet, [substring]).count(
+            self._codes, cyclic=True)
+
+    def substringCounts(self, substrings):
+        """Returns the substringCount of each of @substrings, all found in
+           the same pass around the cycle."""
+        return WildcardMatcher(self._alphabet, substrings).counts(
+            self._codes, cyclic=True)
         
     def isPresentExactlyOnce(self, substring):
         """Returns true if @substring appears exactly once as a substring
@@ -140,10 +391,30 @@ class CyclicString(object):
         if len(substring) > self.length:
             return False
 
+        index = self._indexes.get(len(substring))
+        if index is not None and substring in index.alphabet.universe(
+                len(substring)):
+            return index.isPresentExactlyOnce(substring)
         return self.substringCount(substring) == 1
     
+    def coverage(self, subwordLength, stopEarly=True):
+        """Returns the WindowCoverage of the cyclic windows of length 
+           @subwordLength, computed in a single pass around the cycle. The 
+           result reports which words are doubled (and at which offset) or 
+           missing."""
+        coverage = WindowCoverage(self._alphabet, subwordLength, stopEarly,
+                                  expected=coverBound(self._alphabet,
+                                                      self._codes,
+                                                      subwordLength,
+                                                      self.length))
+        coverage.scan(self.codes(), cyclic=True)
+        return coverage
+
     def isDeBruijnCycle(self, subwordLength):
-        for w in self.alphabet.wordsOfLength(subwordLength):
-            if not self.isPresentExactlyOnce(w):
-                return False
-        return True
\ No newline at end of file
+        # A word longer than the cycle can't be a substring of it.
+        if subwordLength > self.length:
+            return False
+        index = self._indexes.get(subwordLength)
+        if index is not None:
+            return index.isExactCover()
+        return self.coverage(subwordLength).isExactCover()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+import os
+import random
+import tempfile
+from alphabet import Alphabet
+from cyclicarray import CyclicArray
+from datafile import (PackedReader, PackedWriter, bitsPerCell, pack,
+                      packTextFile, readArrays, readObjects, unpack,
+                      writeObject, writeObjects)
+
+a1 = Alphabet(["0"], "w")
+a2 = Alphabet(["0","1"], "w")
+a4 = Alphabet(["0","1","2","3"], "w")
+a9 = Alphabet([str(i) for i in range(9)], "w")
+
+data = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+scratchDirectory = tempfile.TemporaryDirectory()
+scratch = scratchDirectory.name
+
+# Test Bit Packing
+
+assert([bitsPerCell(a) for a in (a1, a2, a4, a9)] == [1, 2, 3, 4])
+assert(bitsPerCell(Alphabet([str(i) for i in range(7)], "w")) == 3)
+assert(bitsPerCell(Alphabet([chr(65 + i) for i in range(16)], "w")) == 5)
+
+assert(pack(bytes([1, 2, 0, 3, 2]), 2) == bytes([0b11001001, 0b10]))
+assert(pack(bytes([1, 4, 2]), 3) == bytes([0b10100001, 0b0]))
+assert(pack(b"", 3) == b"")
+
+random.seed(7)
+for bits in range(1, 9):
+    for count in (0, 1, 7, 8, 9, 100):
+        numbers = bytes(random.randrange(1 << bits) for _ in range(count))
+        packed = pack(numbers, bits)
+        assert(len(packed) == -(-count * bits // 8))
+        assert(unpack(packed, bits, count) == numbers)
+
+# Test the Text Format
+
+for name in os.listdir(data):
+    with open(os.path.join(data, name)) as f:
+        blocks = [block.split() for block in f.read().split("\n\n")]
+    objects = list(readObjects(os.path.join(data, name)))
+    assert(objects == [rows for rows in blocks if rows])
+
+    path = os.path.join(scratch, name)
+    writeObjects(path, objects)
+    assert(list(readObjects(path)) == objects)
+
+path = os.path.join(scratch, "titled.txt")
+t = CyclicArray(a2, 2, 3)
+t.setValues(["01w", "110"])
+with open(path, "w") as f:
+    writeObject(f, ["0w", "11"], "Matrix #3")
+    writeObject(f, t, "Matrix #4 (class of 2)")
+with open(path) as f:
+    assert(f.read() == "Matrix #3\n0w\n11\n\nMatrix #4 (class of 2)\n01w\n110\n\n")
+assert(list(readObjects(path)) == [["0w", "11"], ["01w", "110"]])
+assert([str(m) for m in readArrays(a2, path)] == ["0w\n11", "01w\n110"])
+
+# Objects are read lazily.
+with open(os.path.join(data, "upmatrices-2-2-2.txt")) as f:
+    upmatrices = [block.split() for block in f.read().split("\n\n")]
+objects = readObjects(os.path.join(data, "upmatrices-2-2-2.txt"))
+assert(next(objects) == upmatrices[0])
+assert(next(objects) == upmatrices[1])
+
+# Test the Packed Container
+
+for name, alphabet, r, c in [("uptorus-2-2-2.txt", a2, 2, 2),
+                             ("uptorus-2-3-4.txt", a2, 3, 4),
+                             ("uptorus-4-2-4.txt", a4, 2, 4),
+                             ("upmatrices-2-2-2.txt", a2, 2, 2)]:
+    text = os.path.join(data, name)
+    packed = os.path.join(scratch, name + ".uptc")
+    objects = list(readObjects(text))
+    assert(packTextFile(alphabet, text, packed) == len(objects))
+    with PackedReader(packed) as reader:
+        assert(len(reader) == len(objects))
+        assert(reader.bits == bitsPerCell(alphabet))
+        assert(reader.alphabet.symbols == alphabet.symbols)
+        assert(reader.alphabet.wildcard == alphabet.wildcard)
+        assert(list(reader) == objects)
+        assert(reader[-1] == objects[-1])
+        k = len(objects) // 2
+        assert(reader.shape(k) == (len(objects[k]), len(objects[k][0])))
+        if name.startswith("uptorus"):
+            assert(reader.array(0).isUptorus(r, c))
+        else:
+            assert(reader.array(k).isUpmatrix(r, c))
+        try:
+            reader[len(objects)]
+            assert(False)
+        except IndexError:
+            pass
+    cells = sum(len(rows) * len(rows[0]) for rows in objects)
+    assert(os.path.getsize(packed) < cells * bitsPerCell(alphabet) // 8 +
+           25 * len(objects) + 64) # At most one byte of padding each.
+
+# Arrays and cycles of different shapes in one container.
+path = os.path.join(scratch, "mixed.uptc")
+with PackedWriter(path, a9) as writer:
+    assert(writer.add(["012345678w"]) == 0)
+    assert(writer.add(t) == 1)
+    writer.add(["w"])
+    writer.add(["8w", "70", "w6"])
+with PackedReader(path) as reader:
+    assert(reader.bits == 4)
+    assert(list(reader) == [["012345678w"], ["01w", "110"], ["w"],
+                            ["8w", "70", "w6"]])
+    assert(reader.array(1).codes() == t.codes())
+
+# Unknown cells cannot be packed.
+try:
+    with PackedWriter(os.path.join(scratch, "unknown.uptc"), a2) as writer:
+        writer.add(CyclicArray(a2, 1, 2))
+    assert(False)
+except ValueError:
+    pass
+
+try:
+    PackedReader(os.path.join(data, "uptorus-2-2-2.txt"))
+    assert(False)
+except ValueError:
+    pass
+
+# Test Mapped Cycles
+
+from coverage import DiskBitset
+from cyclicstring import CyclicString
+from datafile import MappedCycle, writeCycle
+
+def cyclicString(alphabet, values):
+    s = CyclicString(alphabet, len(values))
+    s.setValues(values)
+    return s
+
+# Chunk boundaries at every multiple of 8 cells, with 3 bits per cell.
+values = "0123w" + "".join(str(d % 4) for d in range(37)) + "w2"
+path = os.path.join(scratch, "cycle.uptc")
+with writeCycle(path, a4, [a4.encode(values[i:i + 5])
+                           for i in range(0, len(values), 5)]) as cycle:
+    assert(cycle.length == len(values))
+    assert(cycle.codes() == a4.encode(values))
+    assert(cycle.toCyclicString().values == values)
+    assert(cycle.valueAt(4) == "w" and cycle.valueAt(-1) == "2")
+    assert(cycle.valuesAt(40, 9) == (values * 2)[40:49])
+    assert(cycle.valuesAt(3, 100) == (values * 3)[3:103])
+    assert(cycle.containsWildcard())
+    cycle.rotateLeftBy(3)
+    assert(cycle.valuesAt(0, len(values)) == values[3:] + values[:3])
+    cycle.rotateRightBy(3)
+
+    for chunkSize in (8, 16, 1024):
+        cycle.chunkSize = chunkSize
+        chunks = list(cycle.chunks(2))
+        assert([i for i, _ in chunks] == list(range(0, len(values), chunkSize)))
+        for i, codes in chunks:
+            assert(a4.decode(codes) == (values * 2)[i:i + len(codes)])
+        assert(b"".join(codes[:-2] for _, codes in chunks) ==
+               a4.encode(values))
+
+        for n in (1, 2, 3):
+            c = cycle.coverage(n, stopEarly=False)
+            d = cyclicString(a4, values).coverage(n, stopEarly=False)
+            assert(c.counts == d.counts and c.doubled == d.doubled)
+            with cycle.coverage(n, stopEarly=False, memoryLimit=8) as c:
+                assert(c.covered == d.covered and c.doubled == d.doubled)
+                assert(c.missingWords() == d.missingWords())
+            with cycle.coverage(n, stopEarly=False, memoryLimit=0) as c:
+                assert(isinstance(c.counts, DiskBitset))
+                assert(c.missingWords() == d.missingWords())
+            try:
+                c.missingWords() # The DiskBitset is closed.
+                assert(False)
+            except ValueError:
+                pass
+
+# Streaming a de Bruijn cycle to disk and verifying it in chunks, with the
+# counters in memory and on disk.
+path = os.path.join(scratch, "debruijn.uptc")
+with writeCycle(path, a2, a2.deBruijnChunks(12, 1000)) as cycle:
+    cycle.chunkSize = 1000
+    assert(cycle.codes() == bytearray(a2.deBruijnCodes(12)))
+    assert(cycle.isDeBruijnCycle(12))
+    assert(cycle.isDeBruijnCycle(12, memoryLimit=1000))
+    assert(not cycle.isDeBruijnCycle(11))
+    assert(not cycle.containsWildcard())
+
+# Transformations write new containers.
+upcycle = a4.upcycle()
+path = os.path.join(scratch, "upcycle.uptc")
+with writeCycle(path, a4, [upcycle.codes()]) as cycle:
+    cycle.chunkSize = 8
+    with cycle.concatenate(3, os.path.join(scratch, "tripled.uptc")) as tripled:
+        assert(tripled.toCyclicString().values == upcycle.values * 3)
+    with cycle.stripWildcards(os.path.join(scratch, "stripped.uptc")) as s:
+        assert(s.toCyclicString().values == upcycle.values.replace("w", ""))
+
+    # Adding a rotation of itself, modulo 4.
+    other = cyclicString(a4, upcycle.values)
+    other.rotateLeftBy(5)
+    expected = cyclicString(a4, upcycle.values)
+    expected.add(other, modulus=4)
+    with cycle.add(other, os.path.join(scratch, "sum.uptc"), 4) as total:
+        assert(total.toCyclicString().values == expected.values)
+        with cycle.add(total, os.path.join(scratch, "sum2.uptc"), 4) as again:
+            expected.add(cyclicString(a4, upcycle.values), modulus=4)
+            assert(again.toCyclicString().values == expected.values)
+
+    expected = cyclicString(a4, upcycle.values)
+    expected.scalarMultiply(3, modulus=4)
+    with cycle.scalarMultiply(3, os.path.join(scratch, "scaled.uptc"),
+                              4) as scaled:
+        assert(scaled.toCyclicString().values == expected.values)
+
+# Arrays with more than one row are not cycles.
+try:
+    MappedCycle(os.path.join(scratch, "mixed.uptc"), 1)
+    assert(False)
+except ValueError:
+    pass
+with MappedCycle(os.path.join(scratch, "mixed.uptc"), 0) as cycle:
+    assert(cycle.valuesAt(0, 10) == "012345678w")
+
+# Results may be written over a larger alphabet, as after embiggening.
+a8 = Alphabet([str(i) for i in range(8)], "w")
+path = os.path.join(scratch, "small.uptc")
+with writeCycle(path, a4, [a4.encode("0w1w2w3w")]) as cycle:
+    expected = cyclicString(a8, "0w1w2w3w")
+    expected.add(cyclicString(a8, "0w2w3w3w"))
+    with cycle.add(cyclicString(a8, "0w2w3w3w"),
+                   os.path.join(scratch, "bigsum.uptc"),
+                   alphabet=a8) as total:
+        assert(total.alphabet.symbols == a8.symbols)
+        assert(total.toCyclicString().values == expected.values == "0w3w5w6w")
+    expected = cyclicString(a8, "0w1w2w3w")
+    expected.scalarMultiply(2)
+    with cycle.scalarMultiply(2, os.path.join(scratch, "bigscaled.uptc"),
+                              alphabet=a8) as scaled:
+        assert(scaled.toCyclicString().values == expected.values == "0w2w4w6w")
+    try:
+        cycle.scalarMultiply(2, os.path.join(scratch, "toobig.uptc"))
+        assert(False)
+    except ValueError:
+        pass
+
+scratchDirectory.cleanup()
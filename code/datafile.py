@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+"""
+Reading and writing collections of arrays (and cycles, which are arrays with
+one row) in the text format of the files in /data, and in a packed binary
+container for large catalogues.
+
+In the text format each object is written one row per line and followed by
+a blank line. Lines containing "#" (e.g. "Matrix #12" in the output of
+array-finder.py) are titles and are skipped when reading.
+
+The packed container stores every cell in ceil(log2(a + 1)) bits: symbol
+numbers 0..a-1 and a for the wildcard, cell i of an object in bits
+b·i..b·i + b - 1 of its bytes read as a little-endian integer. It starts
+with a header, which includes the symbols and wildcard of the alphabet and
+the position of the index, and ends with the index: one (offset, rows,
+columns) entry per object. Readers map the file into memory and read object
+k through its index entry, without parsing anything else.
+
+A cycle stored in a container can be used in place without loading it (see
+MappedCycle): cells are unpacked from the memory map as they are read, and
+verification scans it in chunks overlapping by n - 1 cells, so its size is
+only limited by the disk.
+"""
+
+import mmap
+import struct
+import multiplier
+from alphabet import Alphabet
+from coverage import MEMORY_LIMIT, WindowCoverage, coverageTable
+from cyclicarray import CyclicArray
+from cyclicstring import CyclicString, CyclicWindow
+
+MAGIC = b"UPTC"
+VERSION = 1
+
+# Magic, version, bits per cell, alphabet size, index offset, object count
+# and the length of the encoded symbols, which follow the header.
+_HEADER = struct.Struct("<4sBBBxQQH")
+_ENTRY = struct.Struct("<QQQ")
+
+# Text Format --------------------------------------------------------------- #
+
+def readObjects(path):
+    """Yields the objects of the text file @path one at a time, each as a
+       list of rows. Only the object being read is held in memory."""
+    with open(path, encoding="utf-8") as file:
+        rows = []
+        for line in file:
+            line = line.strip()
+            if "#" in line:
+                continue
+            if line:
+                rows.append(line)
+            elif rows:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+
+def readArrays(alphabet, path):
+    """Yields the objects of the text file @path as CyclicArrays over
+       @alphabet."""
+    for rows in readObjects(path):
+        array = CyclicArray(alphabet, len(rows), len(rows[0]))
+        array.setValues(rows)
+        yield array
+
+def writeObject(file, rows, title=None):
+    """Writes the object whose rows are the strings @rows (or a
+       CyclicArray) to the open text @file, preceded by @title if given."""
+    if isinstance(rows, CyclicArray):
+        rows = [rows.rowValues(i) for i in range(rows.rows)]
+    if title is not None:
+        file.write(title + "\n")
+    for row in rows:
+        file.write(row + "\n")
+    file.write("\n")
+
+def writeObjects(path, objects):
+    """Writes the objects @objects (lists of rows or CyclicArrays) to the
+       text file @path."""
+    with open(path, "w", encoding="utf-8") as file:
+        for rows in objects:
+            writeObject(file, rows)
+
+# Bit Packing --------------------------------------------------------------- #
+
+def bitsPerCell(alphabet):
+    """Returns the number of bits a packed cell takes: enough for the
+       symbols and the wildcard."""
+    return max(1, len(alphabet.symbols).bit_length())
+
+def _numbers(alphabet, codes):
+    # The cell values of the symbol codes @codes: the symbol number, or a
+    # for the wildcard.
+    a = len(alphabet.symbols)
+    table = bytearray([255]) * 256
+    table[:a] = range(a)
+    table[alphabet.WILDCARD_CODE] = a
+    numbers = bytes(codes).translate(table)
+    if 255 in numbers:
+        raise ValueError("cell %s is not a symbol or the wildcard"
+                         % numbers.index(255))
+    return numbers
+
+def pack(numbers, bits):
+    """Returns the cell values @numbers packed @bits bits each."""
+    if 8 % bits == 0:
+        # Lane k of each byte holds every (8/bits)-th cell from cell k.
+        perByte = 8 // bits
+        size = -(-len(numbers) // perByte)
+        packed = 0
+        for k in range(perByte):
+            lane = numbers[k::perByte].ljust(size, b"\0")
+            packed |= int.from_bytes(lane, "little") << (k * bits)
+        return packed.to_bytes(size, "little")
+    table = [format(v, "0%sb" % bits) for v in range(1 << bits)]
+    digits = "".join(map(table.__getitem__, reversed(numbers)))
+    return int(digits or "0", 2).to_bytes(-(-len(numbers) * bits // 8),
+                                          "little")
+
+def unpack(data, bits, count):
+    """Returns the @count cell values packed @bits bits each in @data."""
+    if 8 % bits == 0:
+        perByte = 8 // bits
+        numbers = bytearray(perByte * len(data))
+        for k in range(perByte):
+            table = bytes((x >> (k * bits)) & ((1 << bits) - 1)
+                          for x in range(256))
+            numbers[k::perByte] = bytes(data).translate(table)
+        return bytes(numbers[:count])
+    digits = format(int.from_bytes(data, "little"), "0%sb" % (count * bits))
+    digits = digits[len(digits) - count * bits:]
+    values = {format(v, "0%sb" % bits): v for v in range(1 << bits)}
+    return bytes(values[digits[i:i + bits]]
+                 for i in range(len(digits) - bits, -1, -bits))
+
+# Packed Container ---------------------------------------------------------- #
+
+class PackedWriter(object):
+    """A PackedWriter writes objects over @alphabet to a new packed
+       container at @path, one at a time. The index is written when the
+       writer is closed (or its with block ends).
+    """
+
+    def __init__(self, path, alphabet):
+        if alphabet.wildcard == "":
+            raise ValueError("the alphabet needs a wildcard symbol")
+        self.alphabet = alphabet
+        self.bits = bitsPerCell(alphabet)
+        self._symbols = ("".join(alphabet.symbols) +
+                         alphabet.wildcard).encode("utf-8")
+        self._entries = []
+        self._file = open(path, "wb")
+        self._file.write(self._header(0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _header(self, indexOffset):
+        return _HEADER.pack(MAGIC, VERSION, self.bits,
+                            len(self.alphabet.symbols), indexOffset,
+                            len(self._entries), len(self._symbols)) + \
+               self._symbols
+
+    def add(self, rows):
+        """Appends the object whose rows are the strings @rows (or a
+           CyclicArray). Returns its number."""
+        if isinstance(rows, CyclicArray):
+            shape = (rows.rows, rows.columns)
+            codes = rows.codes()
+        else:
+            shape = (len(rows), len(rows[0]) if rows else 0)
+            assert(all(len(row) == shape[1] for row in rows))
+            codes = self.alphabet.encode("".join(rows))
+        self._entries.append((self._file.tell(),) + shape)
+        self._file.write(pack(_numbers(self.alphabet, codes), self.bits))
+        return len(self._entries) - 1
+
+    def addChunks(self, chunks):
+        """Appends the cycle (an object with one row) whose symbol codes are
+           the concatenation of the sequences @chunks, packing them as they
+           come so that the cycle is never held in memory. Returns its
+           number."""
+        offset = self._file.tell()
+        length = 0
+        pending = b""
+        for chunk in chunks:
+            length += len(chunk)
+            numbers = pending + _numbers(self.alphabet, chunk)
+            # Any 8 cells pack into whole bytes.
+            whole = len(numbers) - len(numbers) % 8
+            self._file.write(pack(numbers[:whole], self.bits))
+            pending = numbers[whole:]
+        self._file.write(pack(pending, self.bits))
+        self._entries.append((offset, 1, length))
+        return len(self._entries) - 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        indexOffset = self._file.tell()
+        for entry in self._entries:
+            self._file.write(_ENTRY.pack(*entry))
+        self._file.seek(0)
+        self._file.write(self._header(indexOffset))
+        self._file.close()
+
+class PackedReader(object):
+    """A PackedReader gives random access to the objects of the packed
+       container at @path through a read-only memory map. Objects are
+       numbered from 0 and read as lists of rows (reader[k]) or as
+       CyclicArrays (array(k)).
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size or \
+           self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError("%s is not a packed container" % path)
+        _, version, self.bits, a, self._indexOffset, self._count, \
+            size = _HEADER.unpack_from(self._map, 0)
+        if version != VERSION:
+            self._map.close()
+            raise ValueError("%s has version %s" % (path, version))
+        symbols = self._map[_HEADER.size:_HEADER.size + size].decode("utf-8")
+        self.alphabet = Alphabet(list(symbols[:a]), symbols[a:])
+        self._table = bytes(range(a)) + bytes([Alphabet.WILDCARD_CODE]) + \
+                      bytes([Alphabet.UNKNOWN_CODE]) * (255 - a)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, k):
+        rows, columns, codes = self._read(k)
+        values = self.alphabet.decode(codes)
+        return [values[i * columns:(i + 1) * columns] for i in range(rows)]
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def shape(self, k):
+        """Returns the (rows, columns) of object @k."""
+        _, rows, columns = self._entry(k)
+        return rows, columns
+
+    def array(self, k):
+        """Returns object @k as a CyclicArray."""
+        rows, columns, codes = self._read(k)
+        array = CyclicArray(self.alphabet, rows, columns)
+        array.setCodes(codes)
+        return array
+
+    def codes(self, k, start=0, stop=None):
+        """Returns the symbol codes of cells @start..@stop-1 of object @k in
+           row-major order, reading only the bytes that hold them."""
+        offset, rows, columns = self._entry(k)
+        if stop is None:
+            stop = rows * columns
+        assert(0 <= start <= stop <= rows * columns)
+        # Cells from a multiple of 8 start at a byte boundary.
+        first = start - start % 8
+        offset += first * self.bits // 8
+        data = self._map[offset:offset + -(-(stop - first) * self.bits // 8)]
+        return unpack(data, self.bits, stop - first)[start - first:] \
+            .translate(self._table)
+
+    def close(self):
+        self._map.close()
+
+    def _entry(self, k):
+        if k < 0:
+            k += self._count
+        if not 0 <= k < self._count:
+            raise IndexError("object index out of range")
+        return _ENTRY.unpack_from(self._map, self._indexOffset +
+                                  k * _ENTRY.size)
+
+    def _read(self, k):
+        rows, columns = self.shape(k)
+        return rows, columns, self.codes(k)
+
+def packTextFile(alphabet, textPath, packedPath):
+    """Converts the text file @textPath to a packed container, streaming
+       one object at a time. Returns the number of objects."""
+    with PackedWriter(packedPath, alphabet) as writer:
+        for rows in readObjects(textPath):
+            writer.add(rows)
+        return len(writer)
+
+def writeCycle(path, alphabet, chunks):
+    """Writes the cycle whose symbol codes are the concatenation of @chunks
+       (e.g. from Alphabet.deBruijnChunks, or [cyclicString.codes()]) to a
+       new packed container at @path and returns it as a MappedCycle."""
+    with PackedWriter(path, alphabet) as writer:
+        writer.addChunks(chunks)
+    return MappedCycle(path)
+
+# Mapped Cycles ------------------------------------------------------------- #
+
+class MappedCycle(object):
+    """A MappedCycle is a read-only CyclicString kept in object @k (a single
+       row) of the packed container at @path, for cycles that do not fit in
+       memory. Cells are unpacked from the memory map as they are read and
+       whole-cycle operations stream over it in chunks of @chunkSize cells;
+       the transformations write their result to a new container.
+
+       As in CyclicString, rotations only move @_offset, the position in
+       the file of logical cell 0.
+    """
+
+    def __init__(self, path, k=0, chunkSize=1 << 20):
+        self._reader = PackedReader(path)
+        self._k = k
+        rows, self.length = self._reader.shape(k)
+        if rows != 1:
+            self._reader.close()
+            raise ValueError("object %s of %s is not a cycle" % (k, path))
+        self.alphabet = self._reader.alphabet
+        self.chunkSize = chunkSize
+        self._offset = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return "Mapped cycle of %s symbols over %s" % (self.length,
+                                                      self.alphabet)
+
+    def close(self):
+        self._reader.close()
+
+# Value Getters ------------------------------------------------------------- #
+
+    def codeAt(self, index):
+        position = (index + self._offset) % self.length
+        return self._reader.codes(self._k, position, position + 1)[0]
+
+    def valueAt(self, index):
+        return self.alphabet.symbolOf(self.codeAt(index))
+
+    def window(self, index, length):
+        """Returns the @length codes from @index, wrapping around the end
+           (more than once if @length exceeds the length)."""
+        window = bytearray()
+        position = (index + self._offset) % self.length
+        while len(window) < length:
+            stop = min(self.length, position + length - len(window))
+            window += self._reader.codes(self._k, position, stop)
+            position = 0
+        return window
+
+    def valuesAt(self, index, length):
+        return self.alphabet.decode(self.window(index, length))
+
+    def chunks(self, overlap=0):
+        """Yields (index, codes) for consecutive chunks of the cycle from
+           cell 0, each extended by the @overlap codes that follow it
+           (wrapping around), so that every window of @overlap + 1 cells
+           lies within one chunk: n - 1 for windows of length n."""
+        for index in range(0, self.length, self.chunkSize):
+            size = min(self.chunkSize, self.length - index)
+            yield index, self.window(index, size + overlap)
+
+    def codes(self):
+        """Returns every code in one bytearray, from cell 0."""
+        return self.window(0, self.length)
+
+    def toCyclicString(self):
+        """Returns the cycle as an in-memory CyclicString."""
+        cyclicString = CyclicString(self.alphabet, self.length)
+        cyclicString.setCodes(self.codes())
+        return cyclicString
+
+    def containsWildcard(self):
+        return any(self.alphabet.WILDCARD_CODE in codes
+                   for _, codes in self.chunks())
+
+# Rotation ------------------------------------------------------------------ #
+
+    def rotateLeftBy(self, offset):
+        if self.length:
+            self._offset = (self._offset + offset) % self.length
+
+    def rotateRightBy(self, offset):
+        self.rotateLeftBy(-offset)
+
+# Covering Structures ------------------------------------------------------- #
+
+    def coverage(self, subwordLength, stopEarly=True,
+                 memoryLimit=MEMORY_LIMIT):
+        """Returns the WindowCoverage of the cyclic windows of length
+           @subwordLength, scanning one chunk (and the n - 1 codes after
+           it) at a time. The tally is the coverageTable() that fits in
+           @memoryLimit bytes, down to a DiskBitset, so the coverage should
+           be closed (e.g. by a with statement) once it has been read."""
+        words = len(self.alphabet.symbols) ** subwordLength
+        expected = self.length
+        if expected < words and self.containsWildcard():
+            expected = words
+        table = coverageTable(words, expected, memoryLimit)
+        coverage = WindowCoverage(self.alphabet, subwordLength, stopEarly,
+                                  table)
+        try:
+            for index, codes in self.chunks(subwordLength - 1):
+                if not coverage.scan(codes, position=index):
+                    break
+        except BaseException:
+            coverage.close()
+            raise
+        return coverage
+
+    def isDeBruijnCycle(self, subwordLength, memoryLimit=MEMORY_LIMIT):
+        if subwordLength > self.length:
+            return False
+        with self.coverage(subwordLength,
+                           memoryLimit=memoryLimit) as coverage:
+            return coverage.isExactCover()
+
+# Transformations ----------------------------------------------------------- #
+
+    def _transformed(self, path, chunks, alphabet=None):
+        return writeCycle(path, alphabet or self.alphabet, chunks)
+
+    def concatenate(self, count, path):
+        """Writes the cycle repeated @count times to @path and returns it as
+           a MappedCycle."""
+        return self._transformed(path, (codes for _ in range(count)
+                                        for _, codes in self.chunks()))
+
+    def stripWildcards(self, path):
+        wildcard = bytes([self.alphabet.WILDCARD_CODE])
+        return self._transformed(path, (codes.replace(wildcard, b"")
+                                        for _, codes in self.chunks()))
+
+    def add(self, cyclicString, path, modulus=None, alphabet=None):
+        """Writes the component-wise sum with the cycle @cyclicString (a
+           MappedCycle or a CyclicString of the same length) to @path and
+           returns it, over @alphabet if given. See CyclicString.add."""
+        assert(cyclicString.length == self.length)
+        size = len((alphabet or self.alphabet).symbols)
+
+        def sums():
+            for index, codes in self.chunks():
+                other = cyclicString.window(index, len(codes))
+                if isinstance(other, CyclicWindow):
+                    other = other.tobytes()
+                yield multiplier.add(codes, other, size, modulus)
+        return self._transformed(path, sums(), alphabet)
+
+    def scalarMultiply(self, factor, path, modulus=None, alphabet=None):
+        size = len((alphabet or self.alphabet).symbols)
+        return self._transformed(path, (
+            multiplier.scale(codes, factor, size, modulus)
+            for _, codes in self.chunks()), alphabet)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+from alphabet import Alphabet
+from debruijngraph import DeBruijnGraph
+
+a2 = Alphabet(["0","1"], "w")
+a3 = Alphabet(["0","1","2"], "w")
+a4 = Alphabet(["0","1","2","3"], "w")
+
+# Test the Graph
+
+g = DeBruijnGraph(a2, 3)
+assert(g.vertexCount == 4 and g.edgeCount() == 8)
+assert(g.source(6) == 3 and g.target(6) == 2) # 110 goes from 11 to 10.
+assert(g.inDegree(1) == g.outDegree(1) == 2)
+assert(g.isBalanced())
+
+g.removeWord("011")
+assert(g.edgeCount() == 7 and not g.isBalanced())
+try:
+    g.removeWord("011")
+    assert(False)
+except ValueError:
+    pass
+
+# Test Eulerian Circuits
+
+for alphabet, n in [(a2, 1), (a2, 4), (a2, 9), (a3, 3), (a4, 4)]:
+    cycle = alphabet.decode(DeBruijnGraph(alphabet, n).eulerianCircuit())
+    assert(len(cycle) == len(alphabet.symbols) ** n)
+    assert(alphabet.isDeBruijnCycle(cycle, n))
+
+g = DeBruijnGraph(a2, 3)
+g.removeCovered("0011")
+assert(g.edgeCount() == 4)
+try:
+    g.eulerianCircuit() # 000 and 111 are loops on their own.
+    assert(False)
+except ValueError:
+    pass
+cycles = g.cycleDecomposition()
+assert(sorted(a2.decode(c) for c in cycles) == ["0", "01", "1"])
+
+# Test Families
+
+f = DeBruijnGraph(a2, 4).family(["001w110w"])
+assert(len(f.values) == 1 and f.isUniversalPartialFamily(4))
+
+# The first member of the upfamily in cyclicfamily-test.py, completed by
+# the cycles of the rest of the graph.
+f = DeBruijnGraph(a4, 4).family(["001w110w003w112w021w130w023w132w"])
+assert(f.isUniversalPartialFamily(4))
+
+g = DeBruijnGraph(a3, 3)
+f = g.family(["01w"])
+assert(g.edgeCount() == 27) # The graph itself is unchanged.
+assert(len(f.values) == 2 and f.values[1].length == 18)
+assert(f.isUniversalPartialFamily(3))
+
+# Members covering a word twice, or a word that is gone, are rejected.
+g = DeBruijnGraph(a2, 3)
+for members in (["0w0w"], ["0011", "0110"]):
+    try:
+        g.family(members)
+        assert(False)
+    except ValueError:
+        pass
+g.removeCovered("0011")
+try:
+    g.removeCovered("0110")
+    assert(False)
+except ValueError:
+    pass
+
+# A decomposition that leaves out edges or covers them twice fails the
+# coverage check of the family.
+decompose = DeBruijnGraph.cycleDecomposition
+for broken in (lambda graph: decompose(graph)[1:],
+               lambda graph: decompose(graph) * 2):
+    DeBruijnGraph.cycleDecomposition = broken
+    try:
+        DeBruijnGraph(a2, 3).family(["01w"])
+        assert(False)
+    except ValueError:
+        pass
+    finally:
+        DeBruijnGraph.cycleDecomposition = decompose
+assert(DeBruijnGraph(a2, 3).family(["01w"]).isUniversalPartialFamily(3))
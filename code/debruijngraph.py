@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+"""
+The de Bruijn graph B(a, n): its vertices are the words of length n - 1 and
+its edges the words of length n, the edge x_1...x_n going from x_1...x_{n-1}
+to x_2...x_n. Both are identified by their integer codes (see
+Alphabet.wordCode), so the edge with code e leaves vertex e // a and enters
+vertex e mod a^(n-1), and the out-edges of vertex v are v·a, ..., v·a + a - 1.
+The adjacency is therefore implicit and the graph is a single bytearray
+marking which edges are present.
+
+A closed walk spells a cyclic string whose windows of length n are exactly
+the edges it uses, so the de Bruijn cycles are the Eulerian circuits of
+B(a, n) and the de Bruijn families are its decompositions into
+edge-disjoint cycles. Upcycles and upfamilies are handled by removing the
+words covered by the members with wildcards first and decomposing the rest.
+"""
+
+from cyclicfamily import CyclicFamily
+
+class DeBruijnGraph(object):
+    """A DeBruijnGraph is a subgraph of the de Bruijn graph for words of
+       length @subwordLength over @alphabet, initially the whole graph.
+       @edges[e] is 1 if the word with code e is an edge of the subgraph.
+    """
+
+    def __init__(self, alphabet, subwordLength):
+        assert(subwordLength >= 1)
+        self.alphabet = alphabet
+        self.subwordLength = subwordLength
+        self.base = len(alphabet.symbols)
+        self.vertexCount = self.base ** (subwordLength - 1)
+        self.edges = bytearray([1]) * (self.vertexCount * self.base)
+
+    def __str__(self):
+        return "B(%s, %s) with %s of %s edges." % (
+            self.base, self.subwordLength, self.edgeCount(), len(self.edges))
+
+# Edges and Vertices -------------------------------------------------------- #
+
+    def edgeCount(self):
+        return self.edges.count(1)
+
+    def source(self, edge):
+        return edge // self.base
+
+    def target(self, edge):
+        return edge % self.vertexCount
+
+    def outDegree(self, vertex):
+        a = self.base
+        return self.edges[vertex * a:(vertex + 1) * a].count(1)
+
+    def inDegree(self, vertex):
+        return self.edges[vertex::self.vertexCount].count(1)
+
+    def isBalanced(self):
+        """Returns true if every vertex has as many in-edges as out-edges,
+           i.e. if the edges can be decomposed into cycles."""
+        return all(self.inDegree(v) == self.outDegree(v)
+                   for v in range(self.vertexCount))
+
+    def removeWord(self, word):
+        """Removes the edge spelled by the word @word (a string without
+           wildcards)."""
+        code = self.alphabet.universe(self.subwordLength).codeOf(word)
+        if not self.edges[code]:
+            raise ValueError("%s is not an edge" % word)
+        self.edges[code] = 0
+
+    def removeCovered(self, cycle):
+        """Removes every word covered by a cyclic window of length n of the
+           string @cycle, whose wildcards cover every word they can stand
+           for. Raises a ValueError, leaving the graph unchanged, if a word
+           is covered twice or is not an edge any more.
+        """
+        coverage = self.alphabet.coverage(cycle, self.subwordLength,
+                                          cyclic=True)
+        if coverage.doubled:
+            raise ValueError("%s covers %s twice" % (
+                cycle, coverage.doubledWords()[0]))
+        covered = [c for c, count in enumerate(coverage.counts) if count]
+        for c in covered:
+            if not self.edges[c]:
+                raise ValueError("%s covers %s, which is not an edge" % (
+                    cycle, coverage.wordOf(c)))
+        for c in covered:
+            self.edges[c] = 0
+
+# Circuits ------------------------------------------------------------------ #
+
+    def _circuit(self, start, edges, nextSymbol):
+        # Hierholzer's algorithm: walks from @start, consuming the @edges
+        # it takes, and splices in the detours found on the way back. Each
+        # vertex tries its out-edges in the order given by @nextSymbol, so
+        # every edge is looked at once. Returns the last symbol of each edge
+        # of the circuit, in order.
+        a = self.base
+        vertexCount = self.vertexCount
+        stack = [(start, None)]
+        circuit = bytearray()
+        while stack:
+            v = stack[-1][0]
+            s = nextSymbol[v]
+            while s < a and not edges[v * a + s]:
+                s += 1
+            if s < a:
+                nextSymbol[v] = s + 1
+                edges[v * a + s] = 0
+                stack.append(((v * a + s) % vertexCount, s))
+            else:
+                nextSymbol[v] = a
+                _, s = stack.pop()
+                if s is not None:
+                    circuit.append(s)
+        circuit.reverse()
+        return circuit
+
+    def cycleDecomposition(self):
+        """Returns the edges decomposed into as few edge-disjoint cycles as
+           possible, one Eulerian circuit per connected component, each as
+           a bytearray of symbol codes whose cyclic windows of length n are
+           the edges of the cycle. Takes O(a^n) time. Raises a ValueError if
+           the graph is not balanced.
+        """
+        if not self.isBalanced():
+            raise ValueError("the edges do not decompose into cycles")
+        a = self.base
+        edges = bytearray(self.edges)
+        nextSymbol = bytearray(self.vertexCount)
+        cycles = []
+        for v in range(self.vertexCount):
+            if edges[v * a:(v + 1) * a].count(1):
+                cycles.append(self._circuit(v, edges, nextSymbol))
+        return cycles
+
+    def eulerianCircuit(self):
+        """Returns an Eulerian circuit of the graph as in
+           cycleDecomposition(). For the whole graph this is a de Bruijn
+           cycle. Raises a ValueError if there is no Eulerian circuit."""
+        cycles = self.cycleDecomposition()
+        if len(cycles) != 1:
+            raise ValueError("the edges form %s components" % len(cycles))
+        return cycles[0]
+
+# Families ------------------------------------------------------------------ #
+
+    def family(self, members=()):
+        """Returns a CyclicFamily made of the strings @members (e.g. cycles
+           with wildcards) followed by the cycles of the decomposition of the
+           edges they do not cover. The graph itself is left unchanged.
+           Before it is returned the family is checked to cover every edge
+           exactly once, so for a whole graph it is a de Bruijn family, and
+           an upfamily as soon as a member has a wildcard. Raises a
+           ValueError if a member covers a word twice or a word that is not
+           an edge, or if the check fails.
+        """
+        graph = DeBruijnGraph(self.alphabet, self.subwordLength)
+        graph.edges = bytearray(self.edges)
+        family = CyclicFamily(self.alphabet)
+        for member in members:
+            graph.removeCovered(member)
+            family.addCyclicString(member)
+        for cycle in graph.cycleDecomposition():
+            family.addCyclicString(self.alphabet.decode(cycle))
+        coverage = family.coverage(self.subwordLength)
+        if coverage.doubled or coverage.covered != self.edgeCount():
+            raise ValueError("the family does not cover every edge exactly "
+                             "once: %s" % coverage)
+        return family
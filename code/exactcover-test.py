@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+from itertools import product
+from exactcover import ExactCover
+
+# Knuth's example without colors: options (c e) (a d g) (b c f) (a d f) (b g)
+# (d e g), whose only solution is (a d f) (b g) (c e).
+
+e = ExactCover("abcdefg")
+for option in ["ce", "adg", "bcf", "adf", "bg", "deg"]:
+    e.addOption(list(option))
+assert(list(e.solutions()) == [[0, 3, 4]])
+assert(e.firstSolution() == [0, 3, 4])
+assert(e.countSolutions() == 1)
+assert(e.randomSolution(seed=1) == [0, 3, 4])
+
+# Knuth's example with colors: primary items p q r, secondary items x y.
+
+e = ExactCover("pqr", "xy")
+e.addOption(["p", "q", "x", ("y", "A")])
+e.addOption(["p", "r", ("x", "A"), "y"])
+e.addOption(["p", ("x", "B")])
+e.addOption(["q", ("x", "A")])
+e.addOption(["r", ("y", "B")])
+assert(list(e.solutions()) == [[1, 3]])
+
+# Options sharing a secondary item must give it the same color
+
+e = ExactCover([1, 2], ["s"])
+e.addOption([1, ("s", "red")])
+e.addOption([2, ("s", "red")])
+e.addOption([2, ("s", "blue")])
+assert(list(e.solutions()) == [[0, 1]])
+
+# No solution
+
+e = ExactCover("ab")
+e.addOption(["a", "b"])
+e.addOption(["a"])
+assert(e.countSolutions() == 1)
+e = ExactCover("ab")
+e.addOption(["a"])
+assert(e.firstSolution() is None)
+assert(e.randomSolution(seed=1) is None)
+assert(not e.aborted)
+
+# Counting: the 2 by n domino tilings are counted by the Fibonacci numbers
+
+def dominoes(n):
+    e = ExactCover([(r, c) for r in range(2) for c in range(n)])
+    for c in range(n):
+        e.addOption([(0, c), (1, c)])
+    for r, c in product(range(2), range(n - 1)):
+        e.addOption([(r, c), (r, c + 1)])
+    return e
+
+assert([dominoes(n).countSolutions() for n in range(1, 10)] ==
+       [1, 2, 3, 5, 8, 13, 21, 34, 55])
+
+# Stopping early restores the links, so the problem can be searched again
+
+e = dominoes(8)
+assert(len(list(e.solutions(5))) == 5)
+search = e.solutions()
+next(search)
+search.close()
+assert(e.countSolutions() == 34)
+
+# Randomized restarts find solutions with tiny node limits, and different
+# seeds find different ones
+
+e = dominoes(12)
+found = set()
+for seed in range(10):
+    solution = e.randomSolution(seed, restarts=50, nodeLimit=5)
+    assert(solution is not None)
+    found.add(tuple(solution))
+assert(len(found) > 1)
+assert(e.countSolutions() == 233)
+
+# The search gives up when the attempts run out
+
+e = dominoes(30)
+e.addOption([(0, 0), (1, 29)])
+assert(e.randomSolution(1, restarts=1, nodeLimit=3) is None)
+assert(e.aborted)
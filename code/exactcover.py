@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+"""
+A Dancing Links solver for exact cover problems with colors (Knuth's
+Algorithm C, TAOCP 7.2.2.1). Each option is a set of items. A solution is a
+set of options that contains every primary item exactly once and every
+secondary item at most once, except that options may share a secondary item
+if they give it the same color.
+
+The links live in flat Python lists, as in Knuth's array layout: nodes 1..N
+are the item headers and each option is a run of nodes followed by a spacer.
+"""
+
+import random
+
+class ExactCover(object):
+    """An exact cover problem over the @primary items, which every solution
+       must cover exactly once, and the @secondary items, which it may cover
+       at most once or with a single color. Items can be any hashable
+       values.
+    """
+
+    def __init__(self, primary, secondary=()):
+        self.items = list(primary) + list(secondary)
+        self.primaryCount = len(self.items) - len(secondary)
+        self.itemIndex = {item: i + 1 for i, item in enumerate(self.items)}
+        assert(len(self.itemIndex) == len(self.items))
+        self.options = []
+        self.colors = {}
+        self.nodes = 0
+        self.aborted = False
+
+        # Items 1..primaryCount form the active list headed by 0; the
+        # secondary items a separate one headed by N + 1.
+        n = len(self.items)
+        m = self.primaryCount
+        self._llink = [i - 1 for i in range(n + 2)]
+        self._rlink = [i + 1 for i in range(n + 2)]
+        self._llink[0] = m
+        self._rlink[m] = 0
+        if n > m:
+            self._llink[m + 1] = n + 1
+            self._rlink[n] = n + 1
+            self._llink[n + 1] = n
+            self._rlink[n + 1] = m + 1
+        else:
+            self._llink[n + 1] = self._rlink[n + 1] = n + 1
+
+        # Node 0 is unused, nodes 1..N are the item headers (TOP holds the
+        # length of the item list there) and node N + 1 the first spacer.
+        self._top = [0] * (n + 1) + [0]
+        self._ulink = list(range(n + 1)) + [0]
+        self._dlink = list(range(n + 1)) + [0]
+        self._color = [0] * (n + 2)
+
+    def __str__(self):
+        return "%s primary and %s secondary items, %s options." % (
+            self.primaryCount, len(self.items) - self.primaryCount,
+            len(self.options))
+
+# Building the Problem ------------------------------------------------------ #
+
+    def addOption(self, items):
+        """Adds an option covering @items, where a secondary item can be
+           given as an (item, color) pair. Options without primary items
+           are never chosen. Returns the index of the option.
+        """
+        top, ulink, dlink, color = self._top, self._ulink, self._dlink, \
+                                   self._color
+        spacer = len(top) - 1
+        first = spacer + 1
+        for entry in items:
+            c = 0
+            if entry not in self.itemIndex:
+                entry, c = entry
+                c = self.colors.setdefault(c, len(self.colors) + 1)
+            i = self.itemIndex[entry]
+            assert(c == 0 or i > self.primaryCount)
+            node = len(top)
+            top.append(i)
+            ulink.append(ulink[i])
+            dlink.append(i)
+            color.append(c)
+            dlink[ulink[i]] = node
+            ulink[i] = node
+            top[i] += 1
+        last = len(top) - 1
+        dlink[spacer] = last
+        top.append(-len(self.options) - 1)
+        ulink.append(first)
+        dlink.append(0)
+        color.append(0)
+        self.options.append(list(items))
+        return len(self.options) - 1
+
+    def _optionOf(self, node):
+        while self._top[node] > 0:
+            node += 1
+        return -self._top[node] - 1
+
+# Dancing Links ------------------------------------------------------------- #
+
+    def _hide(self, p):
+        top, ulink, dlink, color = self._top, self._ulink, self._dlink, \
+                                   self._color
+        q = p + 1
+        while q != p:
+            x = top[q]
+            if x <= 0:
+                q = ulink[q]
+            elif color[q] < 0:
+                q += 1
+            else:
+                u, d = ulink[q], dlink[q]
+                dlink[u] = d
+                ulink[d] = u
+                top[x] -= 1
+                q += 1
+
+    def _unhide(self, p):
+        top, ulink, dlink, color = self._top, self._ulink, self._dlink, \
+                                   self._color
+        q = p - 1
+        while q != p:
+            x = top[q]
+            if x <= 0:
+                q = dlink[q]
+            elif color[q] < 0:
+                q -= 1
+            else:
+                u, d = ulink[q], dlink[q]
+                dlink[u] = q
+                ulink[d] = q
+                top[x] += 1
+                q -= 1
+
+    def _cover(self, i):
+        dlink = self._dlink
+        p = dlink[i]
+        while p != i:
+            self._hide(p)
+            p = dlink[p]
+        l, r = self._llink[i], self._rlink[i]
+        self._rlink[l] = r
+        self._llink[r] = l
+
+    def _uncover(self, i):
+        l, r = self._llink[i], self._rlink[i]
+        self._rlink[l] = i
+        self._llink[r] = i
+        ulink = self._ulink
+        p = ulink[i]
+        while p != i:
+            self._unhide(p)
+            p = ulink[p]
+
+    def _purify(self, p):
+        color, dlink = self._color, self._dlink
+        c = color[p]
+        i = self._top[p]
+        q = dlink[i]
+        while q != i:
+            if color[q] == c:
+                color[q] = -1
+            else:
+                self._hide(q)
+            q = dlink[q]
+
+    def _unpurify(self, p):
+        color, ulink = self._color, self._ulink
+        c = color[p]
+        i = self._top[p]
+        q = ulink[i]
+        while q != i:
+            if color[q] < 0:
+                color[q] = c
+            else:
+                self._unhide(q)
+            q = ulink[q]
+
+    def _commit(self, p):
+        if self._color[p] == 0:
+            self._cover(self._top[p])
+        elif self._color[p] > 0:
+            self._purify(p)
+
+    def _uncommit(self, p):
+        if self._color[p] == 0:
+            self._uncover(self._top[p])
+        elif self._color[p] > 0:
+            self._unpurify(p)
+
+# Search -------------------------------------------------------------------- #
+
+    def _choose(self, rng):
+        # The active primary item with the fewest options left, ties broken
+        # at random when searching randomly.
+        top, rlink = self._top, self._rlink
+        best = None
+        ties = 0
+        i = rlink[0]
+        while i != 0:
+            if best is None or top[i] < top[best]:
+                best = i
+                ties = 1
+            elif top[i] == top[best] and rng is not None:
+                ties += 1
+                if rng.randrange(ties) == 0:
+                    best = i
+            i = rlink[i]
+        return best
+
+    def _search(self, chosen, rng, nodeLimit):
+        if self._rlink[0] == 0:
+            yield [self._optionOf(x) for x in chosen]
+            return
+        self.nodes += 1
+        if nodeLimit is not None and self.nodes > nodeLimit:
+            self.aborted = True
+            return
+        i = self._choose(rng)
+        if self._top[i] == 0:
+            return
+        self._cover(i)
+        try:
+            choices = []
+            x = self._dlink[i]
+            while x != i:
+                choices.append(x)
+                x = self._dlink[x]
+            if rng is not None:
+                rng.shuffle(choices)
+            for x in choices:
+                p = x + 1
+                while p != x:
+                    if self._top[p] <= 0:
+                        p = self._ulink[p]
+                    else:
+                        self._commit(p)
+                        p += 1
+                chosen.append(x)
+                try:
+                    yield from self._search(chosen, rng, nodeLimit)
+                finally:
+                    chosen.pop()
+                    p = x - 1
+                    while p != x:
+                        if self._top[p] <= 0:
+                            p = self._dlink[p]
+                        else:
+                            self._uncommit(p)
+                            p -= 1
+                if self.aborted:
+                    return
+        finally:
+            self._uncover(i)
+
+    def solutions(self, limit=None):
+        """Yields every solution as a sorted list of option indices, at most
+           @limit of them. The search state is restored when the generator
+           is closed early."""
+        self.nodes = 0
+        self.aborted = False
+        search = self._search([], None, None)
+        try:
+            for count, solution in enumerate(search, 1):
+                yield sorted(solution)
+                if limit is not None and count >= limit:
+                    return
+        finally:
+            search.close()
+
+    def firstSolution(self):
+        """Returns the first solution found, or None if there is none."""
+        for solution in self.solutions(1):
+            return solution
+        return None
+
+    def countSolutions(self):
+        """Returns the number of solutions."""
+        return sum(1 for _ in self.solutions())
+
+    def randomSolution(self, seed=None, restarts=100, nodeLimit=10000):
+        """Searches for a solution with the options of each item tried in
+           random order, giving up on an attempt after @nodeLimit search
+           nodes and starting over with fresh random choices, at most
+           @restarts times. The limit grows by half after each attempt, so
+           hard problems are eventually searched completely. Returns a
+           solution, or None if there is none or the attempts ran out (in
+           which case @aborted is true).
+        """
+        rng = random.Random(seed)
+        for attempt in range(restarts):
+            self.nodes = 0
+            self.aborted = False
+            search = self._search([], rng, nodeLimit)
+            try:
+                for solution in search:
+                    return sorted(solution)
+            finally:
+                search.close()
+            if not self.aborted:
+                return None
+            nodeLimit += nodeLimit // 2
+        return None
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+import random
+from alphabet import Alphabet
+from localsearch import LocalSearch, findArray
+
+a2 = Alphabet(["0","1"], "w")
+a3 = Alphabet(["0","1","2"], "w")
+
+# Test Costs
+
+s = LocalSearch(a2, 3, 4, 2, 2)
+assert(s.cost == 12 - 1 + 15)        # 0000 twelve times, the rest missing
+s.setValues([2, 0, 0, 1,
+             1, 1, 0, 0,
+             1, 1, 0, 0])            # uptorus-2-2-2.txt
+assert(s.cost == 0)
+assert(str(s.toArray()) == "w001\n1100\n1100")
+assert(s.toArray().isUptorus(2, 2))
+
+assert(s.delta(0, 0) == 4)           # each of the 4 windows loses a word
+s.setValue(0, 0)
+assert(s.cost == 4)
+s.setValue(0, 2)
+assert(s.cost == 0)
+
+# The cost changes from the windows around a cell agree with a recount
+
+rng = random.Random(1)
+for alphabet, rows, columns, r, c, cyclic in [(a2, 4, 5, 2, 2, True),
+                                              (a3, 3, 4, 2, 2, False),
+                                              (a2, 2, 3, 2, 3, True),
+                                              (a2, 1, 2, 1, 3, True)]:
+    s = LocalSearch(alphabet, rows, columns, r, c, cyclic)
+    s.randomize(rng)
+    for _ in range(100):
+        cell = rng.randrange(rows * columns)
+        value = rng.randrange(len(alphabet.symbols) + 1)
+        cost = s.cost + s.delta(cell, value)
+        s.setValue(cell, value)
+        assert(s.cost == cost)
+        t = LocalSearch(alphabet, rows, columns, r, c, cyclic)
+        t.setValues(s.values)
+        assert(t.cost == s.cost and t.counts == s.counts)
+
+# Wildcard density
+
+assert(LocalSearch(a2, 4, 4, 2, 2).balancedDensity() == 0.0)
+assert(abs(LocalSearch(a2, 3, 4, 2, 2).balancedDensity() - 0.0746) < 1e-4)
+
+# Test Search
+
+t = findArray(a2, 4, 4, 2, 2, seed=1)
+assert(t.isDeBruijnTorus(2, 2))
+
+t = findArray(a2, 3, 4, 2, 2, seed=1, tenure=3)
+assert(t.isUptorus(2, 2))
+
+t = findArray(a2, 3, 5, 2, 2, cyclic=False, seed=2)
+assert(t.isUpmatrix(2, 2))
+
+assert(findArray(a2, 4, 6, 2, 2, seed=1, restarts=2, steps=1000) is None)
+
+if __name__ == "__main__":
+    # Walkers on a process pool
+    t = findArray(a3, 3, 3, 2, 1, seed=3, walkers=4, processes=2)
+    assert(t.isDeBruijnTorus(2, 1))
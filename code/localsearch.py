@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+"""
+Stochastic local search for uptori (and upmatrices) that are too large to
+find by exhaustive search. A candidate array is scored by its number of
+conflicts: for every word covered k times the cost is |k - 1|, so the cost
+counts both the doubled and the missing words and is zero exactly for
+arrays whose subarrays cover every word once.
+
+The walk changes one cell at a time (to another symbol or to the wildcard)
+and accepts changes by simulated annealing, with an optional tabu list of
+recently changed cells. Only the r·c windows containing the changed cell
+are rescored, so each step costs O(r·c·a^k) for windows with k wildcards,
+whatever the size of the array.
+"""
+
+import math
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from coverage import wildcardOffsets
+from cyclicarray import CyclicArray
+
+class LocalSearch(object):
+    """A LocalSearch keeps a candidate @rows by @columns array over
+       @alphabet together with the count of every word covered by its
+       @subarrayRows by @subarrayColumns subarrays (wrapping around if
+       @cyclic is true). Cell values are symbol numbers, with a (the
+       alphabet size) standing for the wildcard.
+    """
+
+    def __init__(self, alphabet, rows, columns, subarrayRows, subarrayColumns,
+                 cyclic=True):
+        self.alphabet = alphabet
+        self.rows = rows
+        self.columns = columns
+        self.subarrayRows = subarrayRows
+        self.subarrayColumns = subarrayColumns
+        self.cyclic = cyclic
+        a = self.base = len(alphabet.symbols)
+        size = subarrayRows * subarrayColumns
+        self.counts = [0] * a ** size
+
+        self.windows = []
+        startRows = rows if cyclic else rows - subarrayRows + 1
+        startColumns = columns if cyclic else columns - subarrayColumns + 1
+        for i in range(startRows):
+            for j in range(startColumns):
+                self.windows.append([(i + k) % rows * columns + (j + m) % columns
+                                     for k in range(subarrayRows)
+                                     for m in range(subarrayColumns)])
+        # For each cell, the windows containing it, each with the sum of
+        # the weights a^t of the digits of the window code the cell is and
+        # the mask of those digits (more than one if the window wraps all
+        # the way around the array).
+        self.containing = [{} for _ in range(rows * columns)]
+        for x, window in enumerate(self.windows):
+            for t, cell in enumerate(reversed(window)):
+                weight, digits = self.containing[cell].get(x, (0, 0))
+                self.containing[cell][x] = (weight + a ** t, digits | 1 << t)
+        self.containing = [list((x, weight, digits)
+                                for x, (weight, digits) in windows.items())
+                           for windows in self.containing]
+
+        self.values = [0] * (rows * columns)
+        self.codes = [0] * len(self.windows)
+        self.masks = [0] * len(self.windows)
+        self.cost = len(self.counts)
+        self.setValues(self.values)
+
+# Candidates ---------------------------------------------------------------- #
+
+    def setValues(self, values):
+        """Replaces the candidate by the row-major list of symbol numbers
+           @values and recounts every word."""
+        a = self.base
+        self.values = list(values)
+        self.counts = [0] * len(self.counts)
+        for x, window in enumerate(self.windows):
+            code = 0
+            wildcardMask = 0
+            for cell in window:
+                v = self.values[cell]
+                code = code * a + (0 if v == a else v)
+                wildcardMask = wildcardMask << 1 | (v == a)
+            self.codes[x] = code
+            self.masks[x] = wildcardMask
+            for o in wildcardOffsets(a, wildcardMask):
+                self.counts[code + o] += 1
+        self.cost = sum(abs(k - 1) for k in self.counts)
+
+    def randomize(self, rng, wildcardDensity=None):
+        """Fills the candidate with random symbols, each cell being a
+           wildcard with probability @wildcardDensity. By default the
+           density is chosen so that the windows cover a^(r·c) words on
+           average, as they must in a solution."""
+        a = self.base
+        if wildcardDensity is None:
+            wildcardDensity = self.balancedDensity()
+        self.setValues([a if rng.random() < wildcardDensity else
+                        rng.randrange(a) for _ in self.values])
+
+    def balancedDensity(self):
+        """Returns the wildcard density p for which a window covers
+           (1 - p + p·a)^(r·c) words, the average a solution needs."""
+        a = self.base
+        size = self.subarrayRows * self.subarrayColumns
+        if a < 2 or not self.windows:
+            return 0.0
+        perWindow = len(self.counts) / len(self.windows)
+        return min(1.0, max(0.0, (perWindow ** (1 / size) - 1) / (a - 1)))
+
+    def toArray(self):
+        """Returns the candidate as a CyclicArray."""
+        a = self.base
+        array = CyclicArray(self.alphabet, self.rows, self.columns)
+        array.setCodes([self.alphabet.WILDCARD_CODE if v == a else v
+                        for v in self.values])
+        return array
+
+# Moves --------------------------------------------------------------------- #
+
+    def _changes(self, cell, value):
+        # The change of the count of every word affected by setting @cell
+        # to @value, and the new code and mask of each window containing it.
+        a = self.base
+        old = self.values[cell]
+        changes = {}
+        windows = []
+        for x, weight, digits in self.containing[cell]:
+            code, wildcardMask = self.codes[x], self.masks[x]
+            for o in wildcardOffsets(a, wildcardMask):
+                changes[code + o] = changes.get(code + o, 0) - 1
+            code += ((0 if value == a else value) -
+                     (0 if old == a else old)) * weight
+            if (old == a) != (value == a):
+                wildcardMask ^= digits
+            for o in wildcardOffsets(a, wildcardMask):
+                changes[code + o] = changes.get(code + o, 0) + 1
+            windows.append((x, code, wildcardMask))
+        return changes, windows
+
+    def delta(self, cell, value):
+        """Returns the change of the cost if @cell were set to @value."""
+        counts = self.counts
+        changes, _ = self._changes(cell, value)
+        return sum(abs(counts[c] + d - 1) - abs(counts[c] - 1)
+                   for c, d in changes.items() if d)
+
+    def setValue(self, cell, value):
+        """Sets @cell to @value, updating the counts and the cost."""
+        counts = self.counts
+        changes, windows = self._changes(cell, value)
+        for c, d in changes.items():
+            self.cost += abs(counts[c] + d - 1) - abs(counts[c] - 1)
+            counts[c] += d
+        for x, code, wildcardMask in windows:
+            self.codes[x] = code
+            self.masks[x] = wildcardMask
+        self.values[cell] = value
+
+# Search -------------------------------------------------------------------- #
+
+    def anneal(self, rng, steps, temperature=2.0, finalTemperature=0.05,
+               tenure=0):
+        """Runs @steps steps of simulated annealing from the current
+           candidate, cooling geometrically from @temperature to
+           @finalTemperature. Each step proposes a random new value for a
+           random cell; moves that do not increase the cost are always
+           taken, others with probability exp(-delta/T). A cell changed in
+           the last @tenure steps is tabu unless changing it gives a new
+           best cost. Returns true if the cost reached zero.
+        """
+        a = self.base
+        cells = len(self.values)
+        cooling = (finalTemperature / temperature) ** (1 / max(1, steps))
+        tabu = [-1] * cells
+        best = self.cost
+        for step in range(steps):
+            if self.cost == 0:
+                return True
+            cell = rng.randrange(cells)
+            value = rng.randrange(a)
+            if value >= self.values[cell]:
+                value += 1
+            d = self.delta(cell, value)
+            if tabu[cell] >= step and self.cost + d >= best:
+                continue
+            if d <= 0 or rng.random() < math.exp(-d / temperature):
+                self.setValue(cell, value)
+                tabu[cell] = step + tenure
+                best = min(best, self.cost)
+            temperature *= cooling
+        return self.cost == 0
+
+    def walk(self, rng, restarts, steps, **kwargs):
+        """Anneals from up to @restarts random candidates, @steps steps
+           each (see anneal). Returns true if a solution was found."""
+        for _ in range(restarts):
+            self.randomize(rng)
+            if self.anneal(rng, steps, **kwargs):
+                return True
+        return False
+
+def _walker(alphabet, rows, columns, subarrayRows, subarrayColumns, cyclic,
+            seed, steps, kwargs):
+    # Worker for findArray: one annealing run from a random candidate.
+    # Returns the values of the solution found or None.
+    search = LocalSearch(alphabet, rows, columns, subarrayRows,
+                         subarrayColumns, cyclic)
+    if search.walk(random.Random(seed), 1, steps, **kwargs):
+        return search.values
+    return None
+
+def findArray(alphabet, rows, columns, subarrayRows, subarrayColumns,
+              cyclic=True, seed=None, walkers=1, processes=None, restarts=10,
+              steps=100000, **kwargs):
+    """Searches for a @rows by @columns array over @alphabet whose
+       @subarrayRows by @subarrayColumns subarrays (wrapped if @cyclic is
+       true) cover every word exactly once, with @walkers independent walks
+       of @restarts annealing runs each, seeded from @seed (see
+       LocalSearch.walk). The runs go one after the other, or on a pool of
+       @processes worker processes, in which case the first solution found
+       wins and the runs not started yet are cancelled. Returns the
+       solution as a CyclicArray, or None if no run found one. Every
+       solution is confirmed with CyclicArray.coverage first, and a
+       RuntimeError is raised if it disagrees with the counts of the
+       search. Further keyword arguments are passed to LocalSearch.anneal.
+    """
+    seeds = random.Random(seed).sample(range(2 ** 32), walkers * restarts)
+    arguments = [(alphabet, rows, columns, subarrayRows, subarrayColumns,
+                  cyclic, s, steps, kwargs) for s in seeds]
+    values = None
+    if processes is None:
+        for args in arguments:
+            values = _walker(*args)
+            if values is not None:
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            pending = {executor.submit(_walker, *args) for args in arguments}
+            while pending and values is None:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.result() is not None:
+                        values = future.result()
+                        break
+            executor.shutdown(cancel_futures=True)
+    if values is None:
+        return None
+
+    search = LocalSearch(alphabet, rows, columns, subarrayRows,
+                         subarrayColumns, cyclic)
+    search.setValues(values)
+    array = search.toArray()
+    if not array.coverage(subarrayRows, subarrayColumns,
+                          cyclic).isExactCover():
+        raise RuntimeError("the local search accepted an array that is not "
+                           "an exact cover")
+    return array
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+from alphabet import Alphabet
+from matcher import WildcardMatcher
+
+a2 = Alphabet(["0","1"], "w")
+a3 = Alphabet(["0","1","2"], "w")
+
+# Test Single Patterns
+
+m = WildcardMatcher(a2, ["010"])
+assert(m.count(a2.encode("01010")) == 2) # Overlapping occurrences count.
+assert(m.count(a2.encode("0w1w0")) == 1) # Only w1w.
+assert(m.count(a2.encode("1000")) == 0)
+assert(m.count(a2.encode("1000"), cyclic=True) == 1) # 0|10 wraps around.
+assert(m.count(a2.encode("0"), cyclic=True) == 0)
+assert(WildcardMatcher(a2, ["0w0"]).count(a2.encode("0"), cyclic=True) == 1)
+assert(WildcardMatcher(a2, ["w"]).count(a2.encode("011")) == 3)
+assert(WildcardMatcher(a2, [""]).count(a2.encode("011"), cyclic=True) == 3)
+
+# Patterns longer than 64 symbols span several machine words.
+text = a2.encode("01" * 100)
+assert(WildcardMatcher(a2, ["01" * 40]).count(text) == 61)
+assert(WildcardMatcher(a2, ["01" * 40]).count(text, cyclic=True) == 100)
+assert(WildcardMatcher(a2, ["0" + "w" * 78 + "1"]).count(text) == 61)
+
+# Test Batches
+
+words = list(a3.universe(2)) + ["w2", "2w", "ww"]
+cycle = a3.encode("001122102")
+assert(WildcardMatcher(a3, words).counts(cycle, cyclic=True) ==
+       [1] * 9 + [3, 3, 9])
+assert(WildcardMatcher(a3, words).counts(cycle) ==
+       [1] * 6 + [0] + [1, 1] + [3, 2, 8]) # 20 only wraps around.
+
+patterns = ["0", "012", "w1", "1020w", "11111", "0w1w"]
+text = a3.encode("012w1020w0121")
+counts = WildcardMatcher(a3, patterns).counts(text, cyclic=True)
+for p, count in zip(patterns, counts):
+    assert(count == WildcardMatcher(a3, [p]).count(text, cyclic=True))
+    doubled = text * 2
+    assert(count == sum(1 for j in range(len(text)) if
+                        a3.areEqualWords(p, a3.decode(doubled[j:j + len(p)]))))
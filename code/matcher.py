@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+"""
+Bit-parallel (Shift-And) matching of words with wildcards against sequences
+of symbol codes (see Alphabet.encode).
+
+The state is one integer whose bit j is set while the last j + 1 codes read
+match the first j + 1 symbols of the pattern. Reading a code shifts the state
+and masks it with the bits of the pattern positions that the code matches,
+so each code costs a few operations on an integer of m bits, i.e. O(m/64)
+machine words. Several patterns are matched at once by laying them side by
+side in one integer, each in its own lane of bits.
+
+Matching follows Alphabet.areEqualSymbols: a wildcard matches every symbol,
+in the pattern and in the text alike.
+"""
+
+class WildcardMatcher(object):
+    """A WildcardMatcher counts the occurrences of each of the strings
+       @patterns over @alphabet in sequences of symbol codes.
+    """
+
+    def __init__(self, alphabet, patterns):
+        self.alphabet = alphabet
+        self.patterns = list(patterns)
+        self.lengths = [len(p) for p in self.patterns]
+        wildcard = alphabet.WILDCARD_CODE
+
+        # Lane k holds pattern k in bits shift_k..shift_k + m_k - 1; the
+        # start bits are set before every step so that every lane can begin
+        # a match at every position.
+        masks = [0] * 256
+        wildcardBits = 0
+        self._starts = 0
+        self._ends = 0
+        self._laneOf = {}
+        shift = 0
+        for k, codes in enumerate(alphabet.encode(p) for p in self.patterns):
+            for j, c in enumerate(codes):
+                if c == wildcard:
+                    wildcardBits |= 1 << (shift + j)
+                else:
+                    masks[c] |= 1 << (shift + j)
+            if codes:
+                self._starts |= 1 << shift
+                self._ends |= 1 << (shift + len(codes) - 1)
+                self._laneOf[shift + len(codes) - 1] = k
+            shift += len(codes)
+        self._masks = [m | wildcardBits for m in masks]
+        self._masks[wildcard] = (1 << shift) - 1
+
+    def __str__(self):
+        return "Matcher for %s patterns over %s" % (len(self.patterns),
+                                                   self.alphabet)
+
+    def counts(self, codes, cyclic=False):
+        """Returns the number of occurrences of each pattern in the sequence
+           of symbol codes @codes, counting overlapping occurrences. If
+           @cyclic is true the occurrences may wrap around the end of
+           @codes (more than once for patterns longer than @codes), so
+           there is one candidate occurrence per starting position.
+        """
+        counts = [len(codes) if m == 0 else 0 for m in self.lengths]
+        length = len(codes)
+        if not length or not self._starts:
+            return counts
+        masks, starts, ends = self._masks, self._starts, self._ends
+        state = 0
+        for c in bytes(codes):
+            state = ((state << 1) | starts) & masks[c]
+            if state & ends:
+                self._tally(state & ends, counts)
+        if not cyclic:
+            return counts
+
+        # The occurrences that wrap around end at most m_k - 1 codes after
+        # the end, so the lanes of shorter patterns are dropped as the text
+        # is read again from the start.
+        longest = max(self.lengths)
+        extra = bytes(codes) * (-(-(longest - 1) // length))
+        for i, c in enumerate(extra[:longest - 1], 2):
+            ends &= ~self._shorterEnds(i)
+            if not ends:
+                break
+            state = ((state << 1) | starts) & masks[c]
+            if state & ends:
+                self._tally(state & ends, counts)
+        return counts
+
+    def _shorterEnds(self, length):
+        # The end bits of the lanes of patterns shorter than @length.
+        return sum(1 << bit for bit, k in self._laneOf.items()
+                   if self.lengths[k] < length)
+
+    def _tally(self, hits, counts):
+        laneOf = self._laneOf
+        while hits:
+            low = hits & -hits
+            counts[laneOf[low.bit_length() - 1]] += 1
+            hits ^= low
+
+    def count(self, codes, cyclic=False):
+        """Returns the number of occurrences of the first pattern."""
+        return self.counts(codes, cyclic)[0]
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+import multiplier
+from alphabet import Alphabet
+
+W = Alphabet.WILDCARD_CODE
+a6 = Alphabet(["0","1","2","3","4","5"], "w")
+
+# Test component-wise operations, with the wildcard absorbing
+
+assert(multiplier.add(bytes([0, W, 1, 2]), bytes([1, 0, W, 3]), 6) == bytes([1, W, W, 5]))
+assert(multiplier.multiply(bytes([0, W, 1, 2]), bytes([1, 0, W, 2]), 6) == bytes([0, W, W, 4]))
+assert(multiplier.scale(bytes([0, W, 1, 2]), 2, 6) == bytes([0, W, 2, 4]))
+assert(multiplier.lift(a6.encode("001w110w"), a6.encode("0w120w12"), 2, 6) == a6.encode("0w3w1w2w"))
+
+# Test modular reduction
+
+assert(multiplier.add(bytes([3, 4]), bytes([3, 1]), 6, modulus=6) == bytes([0, 5]))
+assert(multiplier.scale(bytes([3, W]), 3, 6, modulus=4) == bytes([1, W]))
+
+try:
+    multiplier.add(bytes([3, 4]), bytes([3, 2]), 6)
+    assert(False)
+except ValueError:
+    pass
+
+# Test large alphabets, which do not fit the packed form
+
+assert(multiplier.add(bytes([20, W, 100]), bytes([30, 1, 100]), 201) == bytes([50, W, 200]))
+
+# Test batches
+
+us = [bytes([0, 1]), bytes([1, W, 1])]
+vs = [bytes([1, 1]), bytes([0, 1, 1])]
+assert(multiplier.batch(multiplier.add, us, vs, 3) == [bytes([1, 2]), bytes([1, W, 2])])
+assert(multiplier.batch(multiplier.lift, us, vs, 2, 4, modulus=4) == [bytes([2, 3]), bytes([1, W, 3])])
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+"""
+Component-wise arithmetic on sequences of symbol codes (see Alphabet.encode),
+as used by the alphabet multiplier theorem to build u + a·v. A symbol's value
+is its code, i.e. its position in the alphabet, and the wildcard absorbs:
+x + w = w + x = w (likewise for products). Results must be symbols of an
+alphabet with @size symbols, optionally after reduction modulo @modulus;
+anything else raises a ValueError.
+
+Every operation is a lookup table applied to whole buffers at once. When all
+the codes fit in four bits the two operands are packed into one byte per
+cell with big-integer arithmetic and the table is applied with
+bytes.translate, so no Python code runs per cell. Larger alphabets fall back
+to a 16-bit table.
+"""
+
+import sys
+from functools import lru_cache
+from alphabet import Alphabet
+
+WILDCARD = Alphabet.WILDCARD_CODE
+UNKNOWN = Alphabet.UNKNOWN_CODE
+
+# In the packed form a cell holds one operand per nibble: symbols 0..13 as
+# themselves, 15 for the wildcard and 14 for anything else.
+_NIBBLE_WILDCARD = 15
+_NIBBLE_UNKNOWN = 14
+_LOW_NIBBLE = bytes(min(i, _NIBBLE_UNKNOWN) for i in range(WILDCARD)) + \
+              bytes([_NIBBLE_WILDCARD])
+_HIGH_NIBBLE = bytes(c << 4 for c in _LOW_NIBBLE)
+_WITHOUT_WILDCARD = bytes(range(WILDCARD)) + b"\0"
+
+def _evaluate(operation, parameter, x, y):
+    if operation == "add":
+        return x + y
+    if operation == "multiply":
+        return x * y
+    if operation == "lift":
+        return x + parameter * y
+    raise ValueError("unknown operation %s" % operation)
+
+def _result(value, size, modulus):
+    if modulus is not None:
+        value %= modulus
+    return value if value < size else UNKNOWN
+
+@lru_cache(maxsize=32)
+def _packedTable(operation, parameter, size, modulus):
+    table = bytearray([UNKNOWN]) * 256
+    for x in range(16):
+        for y in range(16):
+            if _NIBBLE_UNKNOWN in (x, y):
+                continue
+            if _NIBBLE_WILDCARD in (x, y):
+                table[x << 4 | y] = WILDCARD
+            else:
+                table[x << 4 | y] = _result(
+                    _evaluate(operation, parameter, x, y), size, modulus)
+    return bytes(table)
+
+@lru_cache(maxsize=8)
+def _wideTable(operation, parameter, size, modulus):
+    table = bytearray([UNKNOWN]) * 65536
+    for x in range(256):
+        for y in range(256):
+            if UNKNOWN in (x, y):
+                continue
+            if WILDCARD in (x, y):
+                table[x << 8 | y] = WILDCARD
+            else:
+                table[x << 8 | y] = _result(
+                    _evaluate(operation, parameter, x, y), size, modulus)
+    return bytes(table)
+
+@lru_cache(maxsize=32)
+def _scaleTable(multiplier, size, modulus):
+    table = bytearray([UNKNOWN]) * 256
+    table[WILDCARD] = WILDCARD
+    for x in range(UNKNOWN):
+        table[x] = _result(x * multiplier, size, modulus)
+    return bytes(table)
+
+def _checked(result):
+    if UNKNOWN in result:
+        raise ValueError("result at cell %s is not a symbol of the alphabet"
+                         % result.index(UNKNOWN))
+    return result
+
+def _combine(operation, parameter, u, v, size, modulus):
+    if len(u) != len(v):
+        raise ValueError("operands have lengths %s and %s"
+                         % (len(u), len(v)))
+    if not u:
+        return bytearray()
+    if max(bytes(u).translate(_WITHOUT_WILDCARD)) < _NIBBLE_UNKNOWN and \
+       max(bytes(v).translate(_WITHOUT_WILDCARD)) < _NIBBLE_UNKNOWN:
+        high = bytes(u).translate(_HIGH_NIBBLE)
+        low = bytes(v).translate(_LOW_NIBBLE)
+        packed = (int.from_bytes(high, "little") |
+                  int.from_bytes(low, "little")).to_bytes(len(u), "little")
+        table = _packedTable(operation, parameter, size, modulus)
+        return _checked(bytearray(packed.translate(table)))
+
+    wide = bytearray(2 * len(u))
+    if sys.byteorder == "little":
+        wide[0::2], wide[1::2] = v, u
+    else:
+        wide[0::2], wide[1::2] = u, v
+    table = _wideTable(operation, parameter, size, modulus)
+    return _checked(bytearray(map(table.__getitem__,
+                                  memoryview(wide).cast("H"))))
+
+# Operations ---------------------------------------------------------------- #
+
+def add(u, v, size, modulus=None):
+    """Returns the component-wise sum of the code sequences @u and @v."""
+    return _combine("add", None, u, v, size, modulus)
+
+def multiply(u, v, size, modulus=None):
+    """Returns the component-wise product of the code sequences @u and
+       @v."""
+    return _combine("multiply", None, u, v, size, modulus)
+
+def lift(u, v, multiplier, size, modulus=None):
+    """Returns u + @multiplier·v in one pass, as in the alphabet multiplier
+       theorem."""
+    return _combine("lift", multiplier, u, v, size, modulus)
+
+def scale(u, multiplier, size, modulus=None):
+    """Returns @multiplier·u for the code sequence @u."""
+    return _checked(bytearray(bytes(u).translate(
+        _scaleTable(multiplier, size, modulus))))
+
+def batch(operation, us, vs, *args, **kwargs):
+    """Applies the binary @operation (e.g. add or lift) to each pair of
+       code sequences from @us and @vs with a single pass over all of them.
+       Returns the list of results."""
+    us = [bytes(u) for u in us]
+    vs = [bytes(v) for v in vs]
+    if [len(u) for u in us] != [len(v) for v in vs]:
+        raise ValueError("operands have different lengths")
+    combined = operation(b"".join(us), b"".join(vs), *args, **kwargs)
+    results = []
+    start = 0
+    for u in us:
+        results.append(combined[start:start + len(u)])
+        start += len(u)
+    return results
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+from itertools import product
+from alphabet import Alphabet
+from necklacesearch import NecklaceSearch, findCycles, findUpfamilies, symmetryKey
+
+a2 = Alphabet(["0","1"], "w")
+a3 = Alphabet(["0","1","2"], "w")
+
+def bruteForce(alphabet, subwordLength, length, complete):
+    # Every least rotation of a string of @length symbols that passes the
+    # same checks, found without any pruning.
+    found = []
+    for t in product(alphabet.symbols + [alphabet.wildcard], repeat=length):
+        s = "".join(t)
+        codes = alphabet.encode(s)
+        if any(codes[i:] + codes[:i] <= codes for i in range(1, length)):
+            continue
+        c = alphabet.coverage(s, subwordLength, cyclic=True)
+        if (length >= subwordLength and alphabet.wildcard in s and
+            c.isExactCover()) if complete else not c.doubled:
+            found.append(s)
+    return found
+
+# Test Upcycles
+
+assert(findCycles(a2, 4, range(1, 17)) == ["001w110w", "00w011w1"])
+assert(findCycles(a2, 3, range(1, 9)) == [])
+# The one window of "w" covers every word, but it is not an upcycle.
+assert(findCycles(a2, 4, [1]) == [])
+assert(findCycles(a2, 4, [1], complete=False) == ["0", "1", "w"])
+assert(findCycles(a2, 4, range(1, 17), processes=2) ==
+       findCycles(a2, 4, range(1, 17)))
+
+for alphabet, n, lengths in [(a2, 2, 7), (a2, 3, 7), (a2, 4, 8), (a3, 2, 5)]:
+    for length in range(1, lengths + 1):
+        for complete in (True, False):
+            assert(findCycles(alphabet, n, [length], complete) ==
+                   bruteForce(alphabet, n, length, complete))
+
+# Test Prefixes
+
+search = NecklaceSearch(a2, 4, 8)
+prefixes = search.prefixes(3)
+assert(prefixes[0] == (0, 0, 0) and (1, 0, 0) not in prefixes)
+assert([c for p in prefixes for c in search.cycles(p)] == list(search.cycles()))
+assert(list(search.cycles((1, 0))) == []) # Not a prenecklace.
+assert(search.covered == 0 and not any(search.counts))
+
+# Test Upfamilies
+
+families = list(findUpfamilies(a2, 3, 4))
+assert(families == [["0", "1", "01w"], ["0", "1", "0w1"]])
+
+# Test Symmetry
+
+assert(symmetryKey(a2, ["001w110w"]) == symmetryKey(a2, ["00w011w1"]))
+assert(symmetryKey(a2, ["0", "1", "01w"]) == symmetryKey(a2, ["1", "0", "w01"]))
+# 0w1 is a rotation of 10w, which is 01w with its symbols swapped.
+assert(symmetryKey(a2, ["0", "1", "01w"]) == symmetryKey(a2, ["0", "1", "0w1"]))
+assert(symmetryKey(a2, ["0", "1", "01w"]) != symmetryKey(a2, ["w"]))
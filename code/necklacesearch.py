@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+"""
+Exhaustive enumeration of upcycles and upfamilies for small alphabets and
+subword lengths.
+
+Cycles are generated as necklaces, i.e. as their least rotation, with the
+wildcard ordered after every symbol as in CyclicString.canonicalRotation.
+The generation is the recursive algorithm of Ruskey, Savage and Wang, which
+extends a prenecklace one symbol at a time, so every cycle is generated
+once instead of once per rotation. A cycle that covers a word twice is
+periodic or has two windows covering the same word, so only the aperiodic
+necklaces (Lyndon words) can be upcycles.
+
+Every appended symbol completes one window, whose words are marked in a
+counter table as in WindowCoverage; a prefix is abandoned as soon as a
+window covers a word that is already covered, or when the remaining
+windows, which cover at least one word each, would cover too many.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+from coverage import wildcardOffsets
+from cyclicstring import leastRotation
+from exactcover import ExactCover
+
+class NecklaceSearch(object):
+    """A NecklaceSearch enumerates the cycles of length @length over
+       @alphabet and its wildcard whose cyclic windows of length
+       @subwordLength cover no word twice. Digits are symbol numbers, with
+       a (the alphabet size) standing for the wildcard.
+    """
+
+    def __init__(self, alphabet, subwordLength, length):
+        self.alphabet = alphabet
+        self.subwordLength = subwordLength
+        self.length = length
+        self.base = len(alphabet.symbols)
+        self.counts = bytearray(self.base ** subwordLength)
+        self.covered = 0
+        self.nodes = 0
+        # 1-indexed as in Ruskey, Savage and Wang: digit 0 is the sentinel
+        # the first symbol is compared with.
+        self._digits = [0] * (length + 1)
+        self._codes = [0] * (length + 1)
+        self._masks = [0] * (length + 1)
+
+    def __str__(self):
+        return "Necklaces of length %s over %s for subwords of length %s." % (
+            self.length, self.alphabet, self.subwordLength)
+
+# Windows ------------------------------------------------------------------- #
+
+    def _push(self, t, complete):
+        # Appends the window ending at position @t (if there is one) to the
+        # counter table. Returns false, leaving the table unchanged, if it
+        # covers a word twice or (if @complete) leaves too many words for
+        # the windows that remain.
+        a = self.base
+        n = self.subwordLength
+        d = self._digits[t]
+        wildcard = d == a
+        self._codes[t] = (self._codes[t - 1] * a + (0 if wildcard else d)) % \
+                         len(self.counts)
+        self._masks[t] = ((self._masks[t - 1] << 1) | wildcard) & \
+                         ((1 << n) - 1)
+        if t < n:
+            return True
+        code = self._codes[t]
+        counts = self.counts
+        if not self._masks[t]:
+            offsets = (0,)
+            if counts[code]:
+                return False
+        else:
+            offsets = wildcardOffsets(a, self._masks[t])
+            if any(counts[code + o] for o in offsets):
+                return False
+        remaining = self.length - (t - n + 1)
+        if complete and self.covered + len(offsets) + remaining > len(counts):
+            return False
+        for o in offsets:
+            counts[code + o] = 1
+        self.covered += len(offsets)
+        return True
+
+    def _pop(self, t):
+        if t < self.subwordLength:
+            return
+        if not self._masks[t]:
+            self.counts[self._codes[t]] = 0
+            self.covered -= 1
+            return
+        offsets = wildcardOffsets(self.base, self._masks[t])
+        for o in offsets:
+            self.counts[self._codes[t] + o] = 0
+        self.covered -= len(offsets)
+
+    def _cycle(self):
+        return self.alphabet.decode(self.alphabet.WILDCARD_CODE
+                                    if d == self.base else d
+                                    for d in self._digits[1:])
+
+    def _isValid(self, complete):
+        # The check of a whole cycle, including the windows that wrap
+        # around, done by WindowCoverage. Upcycles are at least as long as
+        # the subwords (see cycles()).
+        cycle = self._cycle()
+        coverage = self.alphabet.coverage(cycle, self.subwordLength,
+                                          cyclic=True)
+        if complete:
+            return self.alphabet.wildcard in cycle and coverage.isExactCover()
+        return not coverage.doubled
+
+# Search -------------------------------------------------------------------- #
+
+    def _search(self, t, p, depth, complete):
+        # Extends the prenecklace digits[1..t-1], whose longest Lyndon
+        # prefix has length @p, up to length @depth.
+        digits = self._digits
+        self.nodes += 1
+        if t > depth:
+            if depth < self.length:
+                yield tuple(digits[1:t])
+            elif p == self.length and self._isValid(complete):
+                yield self._cycle()
+            return
+        for d in range(digits[t - p], self.base + 1):
+            digits[t] = d
+            if self._push(t, complete):
+                try:
+                    yield from self._search(t + 1, p if d == digits[t - p]
+                                            else t, depth, complete)
+                finally:
+                    self._pop(t)
+
+    def _replay(self, prefix, complete):
+        # Pushes the digits of @prefix as _search would have. Returns the
+        # length of its longest Lyndon prefix, or None (with nothing
+        # pushed) if it is not a prenecklace or covers a word twice.
+        p = 1
+        for t, d in enumerate(prefix, 1):
+            if d < self._digits[t - p]:
+                self._unwind(t - 1)
+                return None
+            if d > self._digits[t - p]:
+                p = t
+            self._digits[t] = d
+            if not self._push(t, complete):
+                self._unwind(t - 1)
+                return None
+        return p
+
+    def _unwind(self, t):
+        for s in range(t, 0, -1):
+            self._pop(s)
+
+    def cycles(self, prefix=(), complete=True):
+        """Yields the cycles as strings in lexicographic order, those that
+           begin with the digits @prefix only. If @complete is true these
+           are the upcycles (at least n symbols, every word covered exactly
+           once, with at least one wildcard), otherwise every Lyndon word
+           that covers no word twice.
+        """
+        # A cycle shorter than the subwords is not an upcycle, as in
+        # CyclicString.isDeBruijnCycle, even if its windows wrap around to
+        # cover every word once (e.g. "w").
+        if complete and self.length < self.subwordLength:
+            return
+        p = self._replay(prefix, complete)
+        if p is None:
+            return
+        try:
+            yield from self._search(len(prefix) + 1, p, self.length, complete)
+        finally:
+            self._unwind(len(prefix))
+
+    def prefixes(self, depth, complete=True):
+        """Returns the prefixes of length @depth (tuples of digits) that
+           survive the pruning, in order. Searching them one by one with
+           cycles() gives the same cycles as searching from the start."""
+        return list(self._search(1, 1, min(depth, self.length - 1), complete))
+
+def _searchPrefix(alphabet, subwordLength, length, prefix, complete):
+    # Worker for findCycles: the cycles beginning with one prefix.
+    return list(NecklaceSearch(alphabet, subwordLength, length).cycles(
+        prefix, complete))
+
+def findCycles(alphabet, subwordLength, lengths, complete=True,
+               processes=None, depth=3):
+    """Returns the cycles of NecklaceSearch.cycles() for every length in
+       @lengths, ordered by length and then lexicographically. If
+       @processes is given the search is split on the prefixes of @depth
+       symbols, which run on a pool of that many worker processes.
+    """
+    if processes is None:
+        return [c for length in lengths for c in
+                NecklaceSearch(alphabet, subwordLength, length).cycles(
+                    complete=complete)]
+    tasks = []
+    for length in lengths:
+        search = NecklaceSearch(alphabet, subwordLength, length)
+        tasks += [(length, prefix) for prefix in
+                  search.prefixes(depth, complete)]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = executor.map(_searchPrefix,
+                               [alphabet] * len(tasks),
+                               [subwordLength] * len(tasks),
+                               [length for length, _ in tasks],
+                               [prefix for _, prefix in tasks],
+                               [complete] * len(tasks))
+        return [c for found in results for c in found]
+
+def findUpfamilies(alphabet, subwordLength, maxLength, processes=None):
+    """Yields the upfamilies whose members have at most @maxLength symbols,
+       each as a list of members (necklaces, in the order of findCycles),
+       by solving the exact cover problem whose items are the words and
+       whose options are the words covered by each candidate member.
+    """
+    members = findCycles(alphabet, subwordLength, range(1, maxLength + 1),
+                         complete=False, processes=processes)
+    problem = ExactCover(range(len(alphabet.symbols) ** subwordLength))
+    for member in members:
+        counts = alphabet.coverage(member, subwordLength, cyclic=True).counts
+        problem.addOption([c for c, count in enumerate(counts) if count])
+    for solution in problem.solutions():
+        family = [members[i] for i in solution]
+        if not any(alphabet.wildcard in m for m in family):
+            continue
+        # A family of one member is an upcycle, so it must be as long as
+        # the subwords.
+        if len(family) == 1 and len(family[0]) < subwordLength:
+            continue
+        yield family
+
+# Symmetry ------------------------------------------------------------------ #
+
+def symmetryKey(alphabet, members):
+    """Returns a key shared by the cycles or families @members (a list of
+       strings) that are equal up to rotating the members, reversing all of
+       them, and permuting the symbols of the alphabet. It is the least
+       sorted tuple of least rotations over all these maps.
+    """
+    a = len(alphabet.symbols)
+    encoded = [bytes(alphabet.encode(m)) for m in members]
+    best = None
+    for permutation in permutations(range(a)):
+        table = bytearray(range(256))
+        table[:a] = permutation
+        for reverse in (False, True):
+            key = []
+            for codes in encoded:
+                codes = codes.translate(table)
+                if reverse:
+                    codes = codes[::-1]
+                k = leastRotation(codes)
+                key.append(codes[k:] + codes[:k])
+            key = tuple(sorted(key))
+            if best is None or key < best:
+                best = key
+    return best
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+from alphabet import Alphabet
+from perfectnecklace import PerfectNecklace
+
+a2 = Alphabet(["0","1"], "w")
+a3 = Alphabet(["0","1","2"], "w")
+a6 = Alphabet(["0","1","2","3","4","5"], "w")
+
+# Test Values
+
+pn = PerfectNecklace(a2, 2, 2)
+assert(pn.values == "00011011")
+assert(len(pn) == pn.length == 8)
+
+pn = PerfectNecklace(a2, 2, 4)
+assert(pn.values == "0000010110101111")
+
+pn = PerfectNecklace(a3, 3, 6)
+pn.addDiamondicity(4)
+assert(pn.values[:16] == "000w000w001w001w")
+assert(len(pn) == len(pn.values) == 27 * 6 // 3 * 4)
+
+pn = PerfectNecklace(a2, 3, 3)
+pn.addDiamondicity(5)
+assert(pn.values == "0000w0101w0011w1001w0111w0111w")
+pn.addDiamondicity(3)
+assert(pn.values == "00w00ww0w10w1ww00w11ww1w00w1ww01w11ww0w11w1ww")
+
+# Test Random Access
+
+pn = PerfectNecklace(a3, 3, 6)
+pn.addDiamondicity(4)
+values = pn.values
+for i in range(len(values)):
+    assert(pn[i] == values[i] == pn.valueAt(i))
+    assert(pn.codeAt(i) == a3.encode(values[i])[0])
+assert(pn[-1] == values[-1])
+assert(pn.valueAt(len(pn) + 5) == values[5])
+assert(pn[10:50] == values[10:50])
+assert(pn[::7] == values[::7])
+assert(pn.codes(3, 9) == a3.encode(values[3:9]))
+
+try:
+    pn[len(pn)]
+    assert(False)
+except IndexError:
+    pass
+
+# Test Windows and Chunks
+
+assert(pn.valuesAt(len(pn) - 3, 6) == values[-3:] + values[:3])
+assert(pn.window(2, 2 * len(pn)) == a3.encode((values * 3)[2:2 + 2 * len(pn)]))
+assert(b"".join(pn.chunks(17)) == pn.codes())
+assert("".join(pn) == values)
+assert(pn.containsWildcard())
+assert(not PerfectNecklace(a3, 3, 6).containsWildcard())
+
+# Long necklaces are never built as a whole
+
+pn = PerfectNecklace(a6, 6, 216)
+pn.addDiamondicity(4)
+assert(len(pn) == 6 ** 6 * 216 // 3 * 4)
+assert(pn.valuesAt(12345678, 12) == "2w530w242w53")
+assert(pn[-5:] == "w555w")
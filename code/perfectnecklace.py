@@ -17,18 +17,141 @@
 #  SPDX-License-Identifier: MIT
 #
 
+from alphabet import Alphabet
+
 class PerfectNecklace(object):
+    """The necklace made of every word of length @wordLength over @alphabet,
+       in order of their codes, each repeated @modularLength / @wordLength
+       times, with wildcards inserted by addDiamondicity().
+
+       The symbols are never stored: the symbol at any index is computed
+       from the word, the position in the word and the wildcard intervals,
+       so windows, slices and chunks of the necklace cost only their own
+       length. The buffer interface (codes, codeAt, window, ...) follows
+       CyclicString, with indices taken modulo the length where CyclicString
+       does so.
+    """
     def __init__(self, alphabet, wordLength, modularLength):
         self.alphabet = alphabet
         self.wordLength = wordLength
         self.modularLength = modularLength
-        words = self.alphabet.wordsOfLength(wordLength)
-        self.values = ""
-        for w in words:
-            self.values += str(w * (int(modularLength / wordLength)))
-            
+        self.repetitions = int(modularLength / wordLength)
+        self.intervals = []
+        self._base = len(alphabet.symbols)
+        self._block = wordLength * self.repetitions
+        self._length = self._base ** wordLength * self._block
+
+    def __str__(self):
+        return self.values
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._length)
+            if step == 1:
+                return self.alphabet.decode(self.codes(start, max(start, stop)))
+            return "".join(self[j] for j in range(start, stop, step))
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("necklace index out of range")
+        return self.valueAt(i)
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            yield from map(self.alphabet.symbolOf, chunk)
+
+    @property
+    def length(self):
+        return self._length
+
+    @property
+    def values(self):
+        """The whole necklace as a string. This builds all of it, so prefer
+           indexing, slicing, window() or chunks() for long necklaces."""
+        return self.alphabet.decode(self.codes())
+
     def addDiamondicity(self, interval):
-        newValues = ""
-        for n in range(0, int(len(self.values) / (interval-1))):
-            newValues += self.values[n*(interval-1):n*(interval-1)+(interval-1)] + self.alphabet.wildcard
-        self.values = newValues
+        """Inserts a wildcard after every @interval - 1 symbols, dropping an
+           incomplete group at the end."""
+        self._length = self._length // (interval - 1) * interval
+        self.intervals.append(interval)
+
+# Symbols ------------------------------------------------------------------- #
+
+    def codeAt(self, index):
+        """Returns the symbol code at @index (modulo the length)."""
+        index %= self._length
+        for interval in reversed(self.intervals):
+            q, r = divmod(index, interval)
+            if r == interval - 1:
+                return Alphabet.WILDCARD_CODE
+            index = q * (interval - 1) + r
+        word, position = divmod(index, self._block)
+        position %= self.wordLength
+        return word // self._base ** (self.wordLength - 1 - position) % self._base
+
+    def valueAt(self, index):
+        return self.alphabet.symbolOf(self.codeAt(index))
+
+    def _baseCodes(self, start, stop):
+        # The codes at indices start..stop-1 of the necklace without wildcards.
+        k, a = self.wordLength, self._base
+        first = start // self._block
+        last = -(-stop // self._block)
+        codes = bytearray()
+        for word in range(first, last):
+            digits = bytes(word // a ** (k - 1 - p) % a for p in range(k))
+            codes += digits * self.repetitions
+        offset = first * self._block
+        return codes[start - offset:stop - offset]
+
+    def _codes(self, level, start, stop):
+        # The codes at indices start..stop-1 after the first @level
+        # wildcard insertions: each group of interval - 1 symbols below is
+        # spread out over a group of interval symbols ending in a wildcard.
+        if level == 0:
+            return self._baseCodes(start, stop)
+        interval = self.intervals[level - 1]
+        first = start // interval
+        last = -(-stop // interval)
+        below = self._codes(level - 1, first * (interval - 1),
+                            last * (interval - 1))
+        codes = bytearray([Alphabet.WILDCARD_CODE]) * ((last - first) * interval)
+        for r in range(interval - 1):
+            codes[r::interval] = below[r::interval - 1]
+        offset = first * interval
+        return codes[start - offset:stop - offset]
+
+    def codes(self, start=0, stop=None):
+        """Returns a bytearray of the symbol codes at indices @start to
+           @stop - 1 (by default the whole necklace)."""
+        stop = self._length if stop is None else min(stop, self._length)
+        start = max(0, start)
+        if start >= stop:
+            return bytearray()
+        return self._codes(len(self.intervals), start, stop)
+
+    def chunks(self, size=65536):
+        """Yields the codes of the necklace in bytearrays of @size codes."""
+        for start in range(0, self._length, size):
+            yield self.codes(start, start + size)
+
+    def window(self, index, length):
+        """Returns a bytearray of the @length codes starting at @index,
+           wrapping around the end of the necklace."""
+        codes = bytearray()
+        index %= self._length
+        while len(codes) < length:
+            stop = min(self._length, index + length - len(codes))
+            codes += self.codes(index, stop)
+            index = 0
+        return codes
+
+    def valuesAt(self, index, length):
+        return self.alphabet.decode(self.window(index, length))
+
+    def containsWildcard(self):
+        return bool(self.intervals) and self._length > 0
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+
+import io
+import os
+from alphabet import Alphabet
+from cyclicstring import CyclicString
+from cyclicfamily import CyclicFamily
+from perfectnecklace import PerfectNecklace
+from producttorus import ProductTorus
+
+a2 = Alphabet(["0","1"], "w")
+a4 = Alphabet(["0","1","2","3"], "w")
+
+data = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+# An upcycle: the rows of data/uptorus-2-3-4.txt are rotations of 001w110w
+
+u = CyclicString(a2, 8)
+u.setValues("001w110w")
+assert(u.isDeBruijnCycle(4))
+
+t = ProductTorus(u, 3)
+assert((t.rows, t.columns) == (64, 8))
+assert(t.steps[:8] == [0, 0, 1, 0, 2, 0, 3, 0])
+rows = list(t.rowValues())
+assert(rows[:3] == ["001w110w", "001w110w", "001w110w"])
+assert(rows[3] == "01w110w0")
+assert(all(row in "001w110w" * 2 for row in rows))
+assert(t.isUptorus(4))
+assert(t.toArray().isUptorus(3, 4))
+
+with open(os.path.join(data, "uptorus-2-3-4.txt")) as f:
+    original = f.read().split()
+assert(set(original) == set(rows))
+
+# Four and five rows: 512 by 8 and 4096 by 8
+
+assert(ProductTorus(u, 4).isUptorus(4))
+assert(ProductTorus(u, 5).rows == 4096)
+
+# An upfamily: the eight cycles that the rows of data/uptorus-4-2-4.txt
+# are rotations of
+
+family = CyclicFamily(a4)
+for member in ["003w110w", "001w332w", "021w112w", "0w223w33",
+               "12w221w3", "03w310w2", "01w132w2", "023w130w"]:
+    family.addCyclicString(member)
+assert(family.isUniversalPartialFamily(4))
+
+t = ProductTorus(family, 2)
+assert((t.rows, t.columns) == (512, 8))
+assert([t.memberAt(i) for i in range(10)] == [0] * 9 + [1])
+assert(t.isUptorus(4))
+
+necklace = PerfectNecklace(Alphabet(list("abcdefgh")), 2, 8)
+assert(ProductTorus(family, 2, necklace).isUptorus(4))
+
+# Writing to files and functions
+
+out = io.StringIO()
+t.write(out)
+assert(out.getvalue().split("\n")[:3] == ["003w110w", "003w110w", "03w110w0"])
+assert(len(out.getvalue()) == 512 * 9)
+
+rows = []
+t.write(rows.append)
+assert(len(rows) == 512 and rows[2] == "03w110w0")
+
+# The verifier notices a torus that is not universal
+
+broken = CyclicFamily(a4)
+for member in ["003w110w", "003w110w", "021w112w", "0w223w33",
+               "12w221w3", "03w310w2", "01w132w2", "023w130w"]:
+    broken.addCyclicString(member)
+assert(not ProductTorus(broken, 2).isUptorus(4))
+
+# Families the construction does not apply to
+
+for args in [(u, 2), (family, 3)]:
+    try:
+        ProductTorus(*args)
+        assert(False)
+    except ValueError:
+        pass
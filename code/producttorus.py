@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+###############################################################################
+#
+#  Project:  MEGL Universal Partial Tori
+#  Authors:  William Carey <wcarey1@gmu.edu>
+#            Matthew Kearney <mkearne@gmu.edu>
+#            Rachel Kirsch <rkirsch4@gmu.edu>
+#            Stefan Popescu <spopesc@gmu.edu>
+#
+#  Acknowledgements: We would like to thank the Mason Experimental Geometry 
+#                    Lab (MEGL) for supporting this project and Charles 
+#                    Landreaux for collaboration in early stages of the 
+#                    research. The third author is supported in part by 
+#                    Simons Foundation Grant MP-TSM-00002688.
+# 
+#  Copyright (c) 2023-2024, William Carey, Matthew Kearney, Rachel Kirsch, Stefan Popescu
+#  SPDX-License-Identifier: MIT
+#
+
+"""
+Builds uptori from one-dimensional objects, one row at a time.
+
+Let U_0, ..., U_{F-1} be an upfamily (an upcycle if F = 1) of cycles of
+length L for words of length c. Every row of the torus is a rotation of a
+member: row i is U_{m_i} rotated left by s_i. An r by c subarray with its
+top left cell in row i then covers one word of each of the members
+m_i, ..., m_{i+r-1}, at positions that differ by the shifts
+s_{i+t} - s_i. So the torus is an uptorus for r by c subarrays as soon as
+every r-tuple of members occurs exactly once together with every
+combination of the r - 1 relative shifts.
+
+Both come from the ingredients in this library:
+  - the members m_i are the symbols of a (r, L^(r-1))-perfect necklace over
+    an alphabet of F symbols (see PerfectNecklace), in which every r-tuple
+    occurs once at each position modulo L^(r-1);
+  - the steps s_{i+1} - s_i repeat a de Bruijn cycle of order r - 1 over
+    Z_L, in which every (r-1)-tuple of steps occurs once, so the relative
+    shifts only depend on i modulo L^(r-1) and take every value once.
+The torus has F^r·L^(r-1) rows and L columns. Its rows close up into a
+torus only if the steps add up to a multiple of L.
+
+For example, the upcycle 001w110w with r = 3 gives the 64 by 8 uptorus in
+data/uptorus-2-3-4.txt, whose steps are a de Bruijn cycle over Z_8.
+"""
+
+from alphabet import Alphabet, deBruijnDigits
+from cyclicarray import CyclicArray, StreamingCoverage
+from cyclicstring import CyclicString
+from perfectnecklace import PerfectNecklace
+
+class ProductTorus(object):
+    """A ProductTorus is the torus built from the upfamily (a CyclicFamily)
+       or upcycle (a CyclicString) @family for subarrays with @subarrayRows
+       rows as described above. @necklace may give the perfect necklace of
+       members; by default it is PerfectNecklace(F symbols, r, L^(r-1)),
+       which needs r to divide L^(r-1) unless F = 1.
+
+       The rows are generated on demand and never stored together.
+    """
+
+    def __init__(self, family, subarrayRows, necklace=None):
+        if isinstance(family, CyclicString):
+            members = [family]
+        else:
+            members = family.values
+        if not members or len(set(m.length for m in members)) != 1:
+            raise ValueError("the members must be nonempty and have the same length")
+        self.alphabet = members[0].alphabet
+        self.subarrayRows = subarrayRows
+        self.members = members
+        self.columns = members[0].length
+        self.period = self.columns ** (subarrayRows - 1)
+        self.rows = len(members) ** subarrayRows * self.period
+
+        if necklace is None and len(members) > 1:
+            if self.period % subarrayRows:
+                raise ValueError("no perfect necklace of %s-tuples modulo %s"
+                                 % (subarrayRows, self.period))
+            necklace = PerfectNecklace(
+                Alphabet([chr(i) for i in range(len(members))]),
+                subarrayRows, self.period)
+        self.necklace = necklace
+        if necklace is not None:
+            if len(necklace) != self.rows or \
+               len(necklace.alphabet.symbols) != len(members):
+                raise ValueError("the necklace does not fit the family")
+
+        self.steps = list(deBruijnDigits(self.columns, subarrayRows - 1))
+        if not self.steps:
+            self.steps = [0]
+        if sum(self.steps) * (self.rows // self.period) % self.columns:
+            raise ValueError("the rows do not close up into a torus")
+
+    def __str__(self):
+        return "\n".join(self.rowValues())
+
+# Rows ---------------------------------------------------------------------- #
+
+    def memberAt(self, row):
+        """Returns the index of the member that row @row is a rotation of."""
+        if self.necklace is None:
+            return 0
+        return self.necklace.codeAt(row)
+
+    def rowCodes(self):
+        """Yields the rows as bytearrays of symbol codes, top to bottom."""
+        doubled = [m.codes() * 2 for m in self.members]
+        shift = 0
+        for i in range(self.rows):
+            yield doubled[self.memberAt(i)][shift:shift + self.columns]
+            shift = (shift + self.steps[i % self.period]) % self.columns
+
+    def rowValues(self):
+        """Yields the rows as strings, top to bottom."""
+        for codes in self.rowCodes():
+            yield self.alphabet.decode(codes)
+
+    def write(self, sink):
+        """Writes the rows to @sink, a file (one row per line, as in /data)
+           or a function that is called with each row."""
+        for row in self.rowValues():
+            if callable(sink):
+                sink(row)
+            else:
+                sink.write(row + "\n")
+
+    def toArray(self):
+        """Returns the torus as a CyclicArray. This holds every cell in
+           memory, unlike the rest of this class."""
+        array = CyclicArray(self.alphabet, self.rows, self.columns)
+        array.setCodes(b"".join(self.rowCodes()))
+        return array
+
+# Verification -------------------------------------------------------------- #
+
+    def coverage(self, subarrayColumns, stopEarly=True):
+        """Streams the rows through a StreamingCoverage for subarrays with
+           @subarrayColumns columns and returns its WindowCoverage."""
+        stream = StreamingCoverage(self.alphabet, self.columns,
+                                   self.subarrayRows, subarrayColumns,
+                                   stopEarly=stopEarly)
+        for codes in self.rowCodes():
+            if not stream.addRow(codes):
+                break
+        return stream.finish()
+
+    def isUptorus(self, subarrayColumns):
+        """Returns true if the torus is an uptorus for subarrays with
+           @subarrayColumns columns, checked without storing it."""
+        if not any(m.containsWildcard() for m in self.members):
+            return False
+        return self.coverage(subarrayColumns).isExactCover()